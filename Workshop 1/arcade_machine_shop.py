@@ -18,15 +18,24 @@ General Public License for more details.
 You should have received a copy of the GNU General Public License 
 along with CatalogArcadeMachines. If not, see <https://www.gnu.org/licenses/>. 
 """
+import sys
 from datetime import datetime
+from name_index import NameIndex
+from pricing import default_rules
+from purchase_journal import PurchaseJournal, default_journal
 
 class Game:
     """
     This class represents a game for the arcade machine.
+    
+    The attributes are declared in __slots__ so the games do not carry
+    a per-instance dictionary, and the category is interned.
     """
+    __slots__ = ("name", "category", "price")
+
     def __init__(self, name: str, category: str, price: float):
         self.name = name
-        self.category = category
+        self.category = sys.intern(category)
         self.price = price
 
 class ArcadeMachine:
@@ -50,16 +59,11 @@ class ArcadeMachine:
     def calculate_price(self):
         """
         This method allows to calculate the price of the arcade machine.
+        
+        Raises:
+            ValueError: If the material is not available.
         """
-        total_price = 0
-        if self.material == "wood":
-            total_price += 500
-        elif self.material == "aluminium":
-            total_price += 1000
-        elif self.material == "carbon fiber":
-            total_price += 2000  
-        else:
-            raise ValueError("The material is not available.")
+        total_price = default_rules().lookup("ArcadeMachine", self.material)[0]
         for game in self.games:
             total_price += game.price
         return total_price
@@ -117,6 +121,31 @@ class GamesCatalog:
     """
     def __init__(self):
         self.games = [mario_bros, pacman, space_invaders, street_fighter]
+        self.__names = NameIndex()
+        self.__names.add_many((i, game.name, game) for i, game in enumerate(self.games))
+
+    def add_game(self, game: Game):
+        """
+        This method allows to add a game to the catalog.
+        
+        Args:
+            game (Game): The game to add.
+        """
+        self.games.append(game)
+        self.__names.add(len(self.games) - 1, game.name, game)
+
+    def search_by_name(self, name: str, limit: int = 5) -> list[Game]:
+        """
+        This method allows to search games by name.
+        
+        The name can be complete, a prefix or have typos, the best
+        candidates are returned first.
+        
+        Args:
+            name (str): The name of the game.
+            limit (int): The maximum number of games to return.
+        """
+        return self.__names.search(name, limit)
     
     def search_by_category(self, category: str) -> list[Game]:
         """
@@ -143,6 +172,8 @@ class Customer:
     """
     This class represents a customer.
     """
+    __slots__ = ("name", "adress", "phone", "email")
+
     def __init__(self, name: str, adress: str, phone: str, email: str):
         self.name = name
         self.adress = adress
@@ -152,25 +183,54 @@ class Customer:
 class PurchaseManager:
     """
     This class represents the purchase manager.
+
+    The purchases are written to a purchase journal, shared by default
+    by all the purchases of purchase.txt, as a single record each. The
+    key identifies the order, so when it is given the journal rejects a
+    purchase that is finalized again, as by a retry.
     """
-    def __init__(self, customer: Customer, arcade_machine: ArcadeMachine):
+    def __init__(self, customer: Customer, arcade_machine: ArcadeMachine, journal: PurchaseJournal = None,
+                 key: str = None):
         self.customer = customer
         self.arcade_machine = arcade_machine
+        self.key = key
+        self.journal = journal if journal is not None else default_journal()
+
+    def build_record(self, total_price: float = None) -> str:
+        """
+        This method builds the text of the purchase in the journal.
+
+        Args:
+            total_price (float): The price already calculated, or None to
+                use the price of the arcade machine.
+
+        Returns:
+            A string with the lines of the purchase.
+        """
+        if total_price is None:
+            total_price = self.arcade_machine.price
+        lines = [
+            f"Date: {datetime.now()}",
+            f"Customer: {self.customer.name}",
+            f"Adress: {self.customer.adress}",
+            f"Phone: {self.customer.phone}",
+            f"Email: {self.customer.email}",
+            f"Arcade machine material: {self.arcade_machine.material}",
+            "Games:",
+        ]
+        for game in self.arcade_machine.games:
+            lines.append(f"Name: {game.name}, Category: {game.category}, Price: {game.price}")
+        lines.append(f"Total price: {total_price}")
+        lines.append("")
+        return "\n".join(lines)
 
     def finalize_purchase(self):
         """
         This method allows to finalize the purchase.
         """
-        with open("purchase.txt", "a") as file:
-            file.write(f"Date: {datetime.now()}\n")
-            file.write(f"Customer: {self.customer.name}\n")
-            file.write(f"Adress: {self.customer.adress}\n")
-            file.write(f"Phone: {self.customer.phone}\n")
-            file.write(f"Email: {self.customer.email}\n")
-            file.write(f"Arcade machine material: {self.arcade_machine.material}\n")
-            file.write("Games:\n")
-            for game in self.arcade_machine.games:
-                file.write(f"Name: {game.name}, Category: {game.category}, Price: {game.price}\n")
-            file.write(f"Total price: {self.arcade_machine.price}\n")
-        
+        try:
+            self.journal.write(self.build_record(), self.key)
+        except ValueError as error:
+            print(error)
+            return
         print("The purchase has been finalized.")
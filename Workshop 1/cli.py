@@ -16,8 +16,12 @@ General Public License for more details.
 You should have received a copy of the GNU General Public License 
 along with Foobar. If not, see <https://www.gnu.org/licenses/>. 
 """
+import uuid
 from datetime import datetime
-from arcade_machine_shop import Game, ArcadeMachine, Customer, Admin, GamesCatalog, PurchaseManager
+from arcade_machine_shop import Game, ArcadeMachine, Customer, Admin, GamesCatalog
+from name_index import normalize
+from pricing import default_rules
+from purchase_pipeline import PurchasePipeline
 
 message = """
 Welcome to Catalog Arcade Machines! 
@@ -49,24 +53,36 @@ def choose_games():
         return choose_games()
     
     
+    games = []
     for i in range(num_games):  
-        
-        print("Please, choose the game for the arcade machine (Enter the name of the game): ")  
-        game_name = input()
-        games = [] 
+        game = None
+        while game is None:
+            print("Please, choose the game for the arcade machine (Enter the name of the game): ")  
+            game_name = input()
+            candidates = games_catalog.search_by_name(game_name)
+            if candidates and normalize(candidates[0].name) == normalize(game_name):
+                game = candidates[0]
+            elif candidates:
+                print("The game is not available. Did you mean: " + ", ".join(c.name for c in candidates) + "?")
+            else:
+                print("The game is not available.")
+        games.append(Game(game.name, game.category, game.price))
+    return games
 
-        for j in range(len(games_catalog.games)):
-            if game_name.lower() == games_catalog.games[j].name.lower():
-                category = games_catalog.games[j].category
-                price = games_catalog.games[j].price
-                game = Game(game_name, category, price)
-                games.append(game) 
 
+def show_receipt(future):
+    """
+    Prints the receipt of a finalized purchase, or the error that stopped it.
 
-        if not games:
-            print("The game is not available.")
-            return choose_games()
-    return games
+    Args:
+        future: The future of the purchase in the pipeline.
+    """
+    error = future.exception()
+    if error:
+        print(error)
+    else:
+        print(future.result())
+        print("Thank you for buying an arcade machine!")
             
 
 def calculate_price(material: str, games: list[Game]) -> int:
@@ -74,56 +90,46 @@ def calculate_price(material: str, games: list[Game]) -> int:
     Calculate the total price of a product based on the material and the list of games.
 
     Args:
-        material (str): The material of the product. Valid options are "wood", "aluminium", or "carbon fiber".
+        material (str): The material of the product. Valid options are the materials of the pricing rules.
         games (list[Game]): A list of Game objects representing the games included in the product.
 
     Returns:
         int: The total price of the product.
+
+    Raises:
+        ValueError: If the material is not available.
     """
-    total_price = 0
-    if material == "wood":
-        total_price += 500
-    elif material == "aluminium":
-        total_price += 1000
-    else: 
-        material == "carbon fiber"
-        total_price += 2000  
+    total_price = default_rules().lookup("ArcadeMachine", material)[0]
     for game in games:
         total_price += game.price
     return total_price
         
 
 games_catalog = GamesCatalog()
+purchase_pipeline = PurchasePipeline()
 option =int(input(message))
 
 while option != 3:
     if option == 1:
         print("Please, enter the following information to buy an arcade machine:")
-        print("""
-            Choose the material of the arcade machine:
-            1. Wood
-            2. Aluminium
-            3. Carbon fiber
-              """)
-        material = ""
+        materials = default_rules().materials
+        print("\n            Choose the material of the arcade machine:")
+        for number, material in enumerate(materials, start=1):
+            print(f"            {number}. {material.capitalize()}")
         material_option = int(input("Material: "))
 
-        while material_option not in [1, 2, 3]:
+        while material_option not in range(1, len(materials) + 1):
             print("Invalid option.")
             material_option = int(input("Material: "))
             
-        if material_option == 1:
-            material = "wood"
-        elif material_option == 2:
-            material = "aluminium"
-        elif material_option == 3:
-            material = "carbon fiber"
+        material = materials[material_option - 1]
 
         print(f"The material of the arcade machine is {material}.")
         games = choose_games()
                 
         price = calculate_price(material, games)
         arcade_machine = ArcadeMachine(material, games, price)
+        order_key = uuid.uuid4().hex  # a retry of this order is not written twice
         
         print("\nNow, please enter the following personal information to buy the arcade machine:")
         name = input("Name: ")
@@ -146,9 +152,13 @@ while option != 3:
         print("Do you want to finalize the purchase?")
         finalize_purchase = int(input("Yes or No(Enter 1 for yes or 2 for no): "))
         if finalize_purchase == 1:
-            print("Thank you for buying an arcade machine!")
-            purchase_manager = PurchaseManager(customer, arcade_machine)
-            purchase_manager.finalize_purchase()
+            try:
+                future = purchase_pipeline.submit(customer, arcade_machine, order_key)
+            except ValueError as error:
+                print(error)
+            else:
+                future.add_done_callback(show_receipt)
+                print("The purchase is being processed.")
         else:
             print("The purchase has been cancelled.")
             break
@@ -169,7 +179,7 @@ while option != 3:
                 category = input("Category: ")
                 price = float(input("Price: "))
                 game = Game(name, category, price)
-                games_catalog.games.append(game)
+                games_catalog.add_game(game)
                 
                 print("The game has been added successfully!")
                 
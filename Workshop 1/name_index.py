@@ -0,0 +1,213 @@
+"""
+This module contains the NameIndex class to search games by name with
+prefix and fuzzy matching.
+
+Author: Cristian Andres Gamez Nuñez <cagamezn@udistrital.edu.co>
+
+This file is part of CatalogArcadeMachines.
+
+CatalogArcadeMachines is free software: you can redistribute it and/or 
+modify it under the terms of the GNU General Public License as 
+published by the Free Software Foundation, either version 3 of 
+the License, or (at your option) any later version.
+
+CatalogArcadeMachines is distributed in the hope that it will be useful, 
+but WITHOUT ANY WARRANTY; without even the implied warranty of 
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU 
+General Public License for more details.
+
+You should have received a copy of the GNU General Public License 
+along with CatalogArcadeMachines. If not, see <https://www.gnu.org/licenses/>. 
+"""
+import re
+import unicodedata
+from bisect import bisect_left, insort
+from collections import Counter
+from heapq import nsmallest
+
+EXACT = 3
+NAME_PREFIX = 2
+WORD_PREFIX = 1
+FUZZY = 0
+
+
+def normalize(name: str) -> str:
+    """This function normalizes a name to be compared.
+
+    Accents are removed, letters are lowercased and every run of
+    characters that are not letters or digits becomes a single space.
+
+    Args:
+        name (str): The name to normalize.
+
+    Returns:
+        A string with the normalized name.
+    """
+    name = unicodedata.normalize("NFKD", name)
+    name = "".join(char for char in name if not unicodedata.combining(char))
+    return re.sub(r"[^a-z0-9]+", " ", name.lower()).strip()
+
+
+def trigrams(normalized: str) -> set[str]:
+    """This function returns the trigrams of a normalized name.
+
+    The name is padded with spaces so the beginning and the end of
+    the name also produce trigrams.
+
+    Args:
+        normalized (str): A normalized name.
+
+    Returns:
+        A set with the trigrams of the name.
+    """
+    padded = f"  {normalized} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class NameIndex:
+    """This class represents a prebuilt index to search values by name.
+
+    Names are kept in a sorted list of normalized names and words to
+    answer prefix searches with a binary search, and in an inverted index
+    of trigrams to rank similar names when the query has a typo.
+    """
+
+    def __init__(self, max_prefix_matches: int = 1000, min_similarity: float = 0.3):
+        self.__entries = {}  # key -> (normalized name, number of trigrams, value)
+        self.__prefixes = []  # sorted (normalized name or word, key)
+        self.__trigrams = {}  # trigram -> set of keys
+        self.__max_prefix_matches = max_prefix_matches
+        self.__min_similarity = min_similarity
+
+    def __len__(self) -> int:
+        return len(self.__entries)
+
+    def add(self, key, name: str, value):
+        """This method adds a value to the index.
+
+        If the key is already in the index its previous name is replaced.
+
+        Args:
+            key: The unique key of the value, e.g. the position of a game.
+            name (str): The name used to search the value.
+            value: The value returned by the searches.
+        """
+        for token in self.__insert(key, name, value):
+            insort(self.__prefixes, (token, key))
+
+    def add_many(self, items):
+        """This method adds several values to the index at once.
+
+        The prefix list is sorted once at the end instead of inserting
+        each name in order, which is much faster to build large indexes.
+
+        Args:
+            items: An iterable of (key, name, value) tuples.
+        """
+        for key, name, value in items:
+            self.__prefixes.extend((token, key) for token in self.__insert(key, name, value))
+        self.__prefixes.sort()
+
+    def __insert(self, key, name: str, value) -> set[str]:
+        """This method stores a value and its trigrams in the index.
+
+        Args:
+            key: The unique key of the value.
+            name (str): The name used to search the value.
+            value: The value returned by the searches.
+
+        Returns:
+            A set with the prefixes that must be added to the sorted list.
+        """
+        if key in self.__entries:
+            self.remove(key)
+        normalized = normalize(name)
+        name_trigrams = trigrams(normalized)
+        self.__entries[key] = (normalized, len(name_trigrams), value)
+        for trigram in name_trigrams:
+            self.__trigrams.setdefault(trigram, set()).add(key)
+        return self.__tokens(normalized)
+
+    def remove(self, key):
+        """This method removes a value from the index.
+
+        Args:
+            key: The unique key of the value.
+        """
+        entry = self.__entries.pop(key, None)
+        if entry is None:
+            return
+        normalized = entry[0]
+        for token in self.__tokens(normalized):
+            position = bisect_left(self.__prefixes, (token, key))
+            if position < len(self.__prefixes) and self.__prefixes[position] == (token, key):
+                del self.__prefixes[position]
+        for trigram in trigrams(normalized):
+            keys = self.__trigrams[trigram]
+            keys.discard(key)
+            if not keys:
+                del self.__trigrams[trigram]
+
+    def search(self, query: str, limit: int = 5) -> list:
+        """This method searches the values whose name best matches a query.
+
+        Exact matches come first, then names starting with the query,
+        then names with a word starting with the query and finally
+        names that are similar enough to the query. Inside each group
+        the values are ranked by trigram similarity.
+
+        Args:
+            query (str): The name, prefix or misspelled name to search.
+            limit (int): The maximum number of values to return.
+
+        Returns:
+            A list with the ranked values.
+        """
+        normalized = normalize(query)
+        if not normalized:
+            return []
+        tiers = {}
+
+        position = bisect_left(self.__prefixes, (normalized,))
+        end = min(len(self.__prefixes), position + self.__max_prefix_matches)
+        while position < end:
+            token, key = self.__prefixes[position]
+            if not token.startswith(normalized):
+                break
+            name = self.__entries[key][0]
+            if name == normalized:
+                tier = EXACT
+            elif token == name:
+                tier = NAME_PREFIX
+            else:
+                tier = WORD_PREFIX
+            tiers[key] = max(tier, tiers.get(key, FUZZY))
+            position += 1
+
+        query_trigrams = trigrams(normalized)
+        shared = Counter()
+        for trigram in query_trigrams:
+            shared.update(self.__trigrams.get(trigram, ()))
+        ranked = []
+        for key, count in shared.items():
+            _, num_trigrams, _ = self.__entries[key]
+            similarity = count / (len(query_trigrams) + num_trigrams - count)
+            tier = tiers.pop(key, FUZZY)
+            if tier > FUZZY or similarity >= self.__min_similarity:
+                ranked.append((-tier, -similarity, key))
+        ranked.extend((-tier, 0.0, key) for key, tier in tiers.items())
+
+        best = nsmallest(limit, ranked, key=lambda item: (item[0], item[1], self.__entries[item[2]][0]))
+        return [self.__entries[key][2] for _, _, key in best]
+
+    @staticmethod
+    def __tokens(normalized: str) -> set[str]:
+        """This method returns the full name and the words used as prefixes.
+
+        Args:
+            normalized (str): A normalized name.
+
+        Returns:
+            A set with the name and its words.
+        """
+        return {normalized, *normalized.split()}
@@ -0,0 +1,453 @@
+"""
+This module contains the PurchaseJournal class to write the purchases
+to a journal file.
+
+Author: Cristian Andres Gamez Nuñez <cagamezn@udistrital.edu.co>
+
+This file is part of CatalogArcadeMachines.
+
+CatalogArcadeMachines is free software: you can redistribute it and/or 
+modify it under the terms of the GNU General Public License as 
+published by the Free Software Foundation, either version 3 of 
+the License, or (at your option) any later version.
+
+CatalogArcadeMachines is distributed in the hope that it will be useful, 
+but WITHOUT ANY WARRANTY; without even the implied warranty of 
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU 
+General Public License for more details.
+
+You should have received a copy of the GNU General Public License 
+along with CatalogArcadeMachines. If not, see <https://www.gnu.org/licenses/>. 
+"""
+import atexit
+import os
+import threading
+import time
+from contextlib import nullcontext
+from bloom_filter import BloomFilter
+from purchase_segments import SegmentRotator
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+DEFAULT_JOURNAL_PATH = "purchase.txt"
+ROTATE_BYTES = int(os.environ.get("PURCHASE_ROTATE_BYTES", 64 * 2 ** 20))
+ROTATE_AGE = float(os.environ.get("PURCHASE_ROTATE_AGE", 24 * 60 * 60))
+RETAIN_SEGMENTS = int(os.environ.get("PURCHASE_RETAIN_SEGMENTS", 30))
+
+SYNC_POLICIES = ("never", "close", "flush")
+
+_default_journals = {}
+
+
+class FileLock:
+    """This class represents an exclusive lock of a file shared by the processes.
+
+    The lock is taken on a lock file next to the file, so it stays the
+    same when the file is rotated. It uses flock on Unix and
+    msvcrt.locking on Windows, and it also excludes the threads of the
+    process that share it.
+    """
+
+    def __init__(self, path: str):
+        self.__path = path + ".lock"
+        self.__fd = os.open(self.__path, os.O_RDWR | os.O_CREAT, 0o666)
+        self.__lock = threading.Lock()  # flock does not exclude the threads of a process
+
+    @property
+    def path(self) -> str:
+        """This property returns the path of the lock file.
+
+        Returns:
+            A string with the path of the lock file.
+        """
+        return self.__path
+
+    def acquire(self):
+        """This method allows to wait until the lock is free and take it."""
+        self.__lock.acquire()
+        try:
+            if fcntl is not None:
+                fcntl.flock(self.__fd, fcntl.LOCK_EX)
+                return
+            os.lseek(self.__fd, 0, os.SEEK_SET)
+            while True:
+                try:
+                    msvcrt.locking(self.__fd, msvcrt.LK_LOCK, 1)
+                    return
+                except OSError:  # LK_LOCK gives up after 10 seconds
+                    continue
+        except BaseException:
+            self.__lock.release()
+            raise
+
+    def release(self):
+        """This method allows to free the lock."""
+        try:
+            if fcntl is not None:
+                fcntl.flock(self.__fd, fcntl.LOCK_UN)
+            else:
+                os.lseek(self.__fd, 0, os.SEEK_SET)
+                msvcrt.locking(self.__fd, msvcrt.LK_UNLCK, 1)
+        finally:
+            self.__lock.release()
+
+    def close(self):
+        """This method allows to close the lock file."""
+        os.close(self.__fd)
+
+    def __enter__(self) -> "FileLock":
+        self.acquire()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.release()
+
+
+class PurchaseJournal:
+    """This class represents a long-lived journal of purchases.
+
+    The file is opened once in append mode. The records are kept in a
+    buffer and written together in a single call when the buffer holds
+    flush_every records or flush_interval seconds passed since the last
+    write. A timer writes the records left in the buffer flush_interval
+    seconds after they were added, so an idle journal does not keep
+    them until it is closed. The sync policy tells when the data is also
+    forced to disk with fsync: never, only when the journal is closed,
+    or on every flush. The journal is flushed and closed when the
+    program exits normally, so no buffered record is lost on a clean
+    shutdown.
+
+    Several processes can share the file. Every write is a single
+    append of whole records made while holding a FileLock of the file,
+    so the records of different processes and threads are never mixed
+    and a record is never split.
+
+    With a segment rotator, the file is rotated into a compressed
+    segment after a write makes it due, so it does not grow forever. The
+    size is checked and the file is rotated while holding the lock, so
+    only one process rotates it and no record is written meanwhile.
+
+    A record may carry the idempotency key of its order, so a retried
+    order is not written twice. The keys of the records written are
+    appended to a keys file next to the file, in the same flush and
+    after the records, so a crash never keeps the key of a record that
+    was not written. The keys are kept in a Bloom filter of
+    key_capacity keys, and a key the filter may have is looked up
+    exactly in the keys files; the keys still in the buffer are checked
+    in memory. The keys file is rotated with the file, and the keys of
+    the previous rotation are still checked, so the keys use bounded
+    memory and disk while a retry is always caught. A buffered record
+    whose key another process wrote meanwhile is dropped at the flush.
+    """
+
+    def __init__(self, path: str = DEFAULT_JOURNAL_PATH, flush_every: int = 100,
+                 flush_interval: float = 1.0, sync: str = "close", rotation: SegmentRotator = None,
+                 lock: bool = True, clock=time.monotonic, key_capacity: int = 100_000):
+        if flush_every < 1:
+            raise ValueError("The journal must flush at least every record.")
+        if sync not in SYNC_POLICIES:
+            raise ValueError(f"The sync policy must be one of {', '.join(SYNC_POLICIES)}.")
+        self.__path = path
+        self.__flush_every = flush_every
+        self.__flush_interval = flush_interval
+        self.__sync = sync
+        self.__rotation = rotation
+        self.__clock = clock
+        self.__buffer = []
+        self.__last_flush = clock()
+        self.__timer = None  # writes the buffer if no other record comes
+        self.__lock = threading.Lock()
+        self.__fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT | getattr(os, "O_BINARY", 0), 0o666)
+        self.__file_lock = FileLock(path) if lock else None
+        self.__key_capacity = key_capacity
+        self.__keys = None  # Bloom filter of the keys files, loaded with the first key
+        self.__keys_fd = None
+        self.__keys_inode = None  # tells when another process rotated the keys file
+        self.__keys_size = 0  # bytes of the keys file loaded
+        self.__buffered_keys = {}  # key -> position of its record in the buffer
+        atexit.register(self.close)
+
+    @property
+    def path(self) -> str:
+        """This property returns the path of the journal file.
+
+        Returns:
+            A string with the path of the file.
+        """
+        return self.__path
+
+    @property
+    def closed(self) -> bool:
+        """This property tells if the journal was closed.
+
+        Returns:
+            True if no more records can be written.
+        """
+        return self.__fd is None
+
+    @property
+    def keys_path(self) -> str:
+        """This property returns the path of the keys file.
+
+        Returns:
+            A string with the path of the keys file.
+        """
+        return self.__path + ".keys"
+
+    def write(self, record: str, key: str = None):
+        """This method allows to add a record to the journal.
+
+        Args:
+            record (str): The complete text of the record, ending in a new line.
+            key (str): The idempotency key of the order, or None.
+
+        Raises:
+            ValueError: If the journal is closed or a record with the
+                same key was already written.
+        """
+        with self.__lock:
+            if self.__fd is None:
+                raise ValueError("The purchase journal is closed.")
+            if key is not None:
+                if "\n" in key:
+                    raise ValueError("The key of a purchase can not have new lines.")
+                if key in self.__buffered_keys or self.__has_key(key):
+                    raise ValueError(f"The purchase {key} has already been made.")
+                self.__buffered_keys[key] = len(self.__buffer)
+            self.__buffer.append(record)
+            if (len(self.__buffer) >= self.__flush_every
+                    or self.__clock() - self.__last_flush >= self.__flush_interval):
+                self.__flush(self.__sync == "flush")
+            elif self.__timer is None:
+                self.__timer = threading.Timer(self.__flush_interval, self.__flush_idle)
+                self.__timer.daemon = True
+                self.__timer.start()
+
+    def has_key(self, key: str) -> bool:
+        """This method tells if a record with an idempotency key was written.
+
+        Args:
+            key (str): The idempotency key of the order.
+
+        Returns:
+            True if a record of this or another process has the key.
+
+        Raises:
+            ValueError: If the journal is closed.
+        """
+        with self.__lock:
+            if self.__fd is None:
+                raise ValueError("The purchase journal is closed.")
+            return key in self.__buffered_keys or self.__has_key(key)
+
+    def flush(self, sync: bool = None):
+        """This method allows to write the buffered records to the file.
+
+        Args:
+            sync (bool): Whether to force the data to disk, or None to
+                follow the sync policy.
+        """
+        with self.__lock:
+            if self.__fd is not None:
+                self.__flush(self.__sync == "flush" if sync is None else sync)
+
+    def close(self):
+        """This method allows to flush the buffered records and close the file."""
+        with self.__lock:
+            if self.__fd is None:
+                return
+            self.__flush(self.__sync != "never")
+            os.close(self.__fd)
+            self.__fd = None
+            if self.__keys_fd is not None:
+                os.close(self.__keys_fd)
+            if self.__file_lock is not None:
+                self.__file_lock.close()
+        atexit.unregister(self.close)
+
+    def __enter__(self) -> "PurchaseJournal":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def __has_key(self, key: str) -> bool:
+        """This method tells if a key is in the keys files; the lock must be held.
+
+        Args:
+            key (str): The idempotency key of the order.
+
+        Returns:
+            True if a record with the key was written.
+        """
+        with self.__file_lock if self.__file_lock is not None else nullcontext():
+            self.__load_keys()
+            return self.__written(key)
+
+    def __written(self, key: str) -> bool:
+        """This method looks a key up in the keys files; the file lock must be held.
+
+        Only a key that the Bloom filter may have is looked up in the files.
+
+        Args:
+            key (str): The idempotency key of the order.
+
+        Returns:
+            True if the key is in the current or the previous keys file.
+        """
+        if key not in self.__keys:
+            return False
+        line = b"\n" + key.encode("utf-8") + b"\n"
+        for path, size in ((self.keys_path + ".1", None), (self.keys_path, self.__keys_size)):
+            if os.path.exists(path):
+                with open(path, "rb") as file:
+                    if line in b"\n" + file.read(size):
+                        return True
+        return False
+
+    def __load_keys(self):
+        """This method loads the keys the other processes added; the file lock must be held.
+
+        When the keys file was rotated, the filter is built again from
+        the previous keys file.
+        """
+        try:
+            inode = os.stat(self.keys_path).st_ino
+        except FileNotFoundError:
+            inode = None
+        if self.__keys_fd is None or inode != self.__keys_inode:
+            if self.__keys_fd is not None:
+                os.close(self.__keys_fd)
+            flags = os.O_RDWR | os.O_APPEND | os.O_CREAT | getattr(os, "O_BINARY", 0)
+            self.__keys_fd = os.open(self.keys_path, flags, 0o666)
+            self.__keys_inode = os.fstat(self.__keys_fd).st_ino
+            self.__keys_size = 0
+            self.__keys = BloomFilter(self.__key_capacity)
+            if os.path.exists(self.keys_path + ".1"):
+                with open(self.keys_path + ".1", "rb") as file:
+                    for line in file:
+                        if line.endswith(b"\n"):
+                            self.__keys.add(line[:-1].decode("utf-8"))
+        size = os.fstat(self.__keys_fd).st_size
+        if size == self.__keys_size:
+            return
+        with open(self.keys_path, "rb") as file:
+            file.seek(self.__keys_size)
+            data = file.read(size - self.__keys_size)
+        complete = data.rfind(b"\n") + 1
+        for key in data[:complete].decode("utf-8").splitlines():
+            self.__keys.add(key)
+        self.__keys_size += complete
+        if complete < len(data):  # a key cut by a crash
+            os.ftruncate(self.__keys_fd, self.__keys_size)
+
+    def __rotate_keys(self):
+        """This method keeps the keys file as the previous one; the file lock must be held."""
+        if os.path.exists(self.keys_path):
+            os.replace(self.keys_path, self.keys_path + ".1")
+        if self.__keys_fd is not None:
+            os.close(self.__keys_fd)
+            self.__keys_fd = None
+
+    @staticmethod
+    def __write(fd: int, data: bytes):
+        """This method writes all the bytes to a file opened in append mode.
+
+        Args:
+            fd (int): The file descriptor of the file.
+            data (bytes): The bytes to write.
+        """
+        view = memoryview(data)
+        while view:
+            view = view[os.write(fd, view):]
+
+    def __flush_idle(self):
+        """This method writes the buffered records when the timer expires."""
+        with self.__lock:
+            self.__timer = None
+            if self.__fd is not None and self.__buffer:
+                self.__flush(self.__sync == "flush")
+
+    def __flush(self, sync: bool):
+        """This method writes the buffer in one call; the lock must be held.
+
+        Args:
+            sync (bool): Whether to force the data to disk.
+        """
+        with self.__file_lock if self.__file_lock is not None else nullcontext():
+            keys = ""
+            if self.__buffered_keys:
+                self.__load_keys()
+                for key, position in self.__buffered_keys.items():
+                    if self.__written(key):  # written by another process meanwhile
+                        self.__buffer[position] = ""
+                    else:
+                        keys += key + "\n"
+            data = "".join(self.__buffer).replace("\n", os.linesep)
+            self.__write(self.__fd, data.encode("utf-8"))
+            if sync:
+                os.fsync(self.__fd)
+            if keys:
+                self.__write(self.__keys_fd, keys.encode("utf-8"))
+                for key in keys.splitlines():
+                    self.__keys.add(key)
+                self.__keys_size += len(keys.encode("utf-8"))
+                if sync:
+                    os.fsync(self.__keys_fd)
+            if self.__rotation is not None and self.__rotation.due(os.fstat(self.__fd).st_size, self.__path):
+                self.__rotation.rotate(self.__path)
+                self.__rotate_keys()
+        self.__buffer.clear()
+        self.__buffered_keys.clear()
+        self.__last_flush = self.__clock()
+        if self.__timer is not None:
+            self.__timer.cancel()
+            self.__timer = None
+
+
+def default_rotation(path: str = DEFAULT_JOURNAL_PATH) -> SegmentRotator:
+    """This function returns the rotation policy of a journal file of the application.
+
+    The segments are kept in a segments directory next to the file. The
+    file is rotated when it reaches the PURCHASE_ROTATE_BYTES environment
+    variable, 64 MiB by default, or when its first purchase is
+    PURCHASE_ROTATE_AGE seconds old, a day by default; 0 turns a limit
+    off. Only the newest PURCHASE_RETAIN_SEGMENTS segments are kept, 30
+    by default; 0 keeps all of them.
+
+    Args:
+        path (str): The path of the journal file.
+
+    Returns:
+        The rotation policy, or None if both limits are off.
+    """
+    if not ROTATE_BYTES and not ROTATE_AGE:
+        return None
+    return SegmentRotator(os.path.join(os.path.dirname(path), "segments"),
+                          max_bytes=ROTATE_BYTES or None, max_age=ROTATE_AGE or None,
+                          max_segments=RETAIN_SEGMENTS or None)
+
+
+def default_journal(path: str = DEFAULT_JOURNAL_PATH, rotation: SegmentRotator = None) -> PurchaseJournal:
+    """This function returns the journal shared by the purchases of a file.
+
+    The journal is opened the first time and again if it was closed.
+
+    Args:
+        path (str): The path of the journal file.
+        rotation (SegmentRotator): The rotation policy used when the
+            journal is opened, or None for the default_rotation of the
+            file.
+
+    Returns:
+        The purchase journal of the file.
+    """
+    journal = _default_journals.get(path)
+    if journal is None or journal.closed:
+        rotation = rotation if rotation is not None else default_rotation(path)
+        journal = _default_journals[path] = PurchaseJournal(path, rotation=rotation)
+    return journal
@@ -0,0 +1,223 @@
+"""
+This module contains the PurchasePipeline class to finalize the
+purchases in the background.
+
+Author: Cristian Andres Gamez Nuñez <cagamezn@udistrital.edu.co>
+
+This file is part of CatalogArcadeMachines.
+
+CatalogArcadeMachines is free software: you can redistribute it and/or 
+modify it under the terms of the GNU General Public License as 
+published by the Free Software Foundation, either version 3 of 
+the License, or (at your option) any later version.
+
+CatalogArcadeMachines is distributed in the hope that it will be useful, 
+but WITHOUT ANY WARRANTY; without even the implied warranty of 
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU 
+General Public License for more details.
+
+You should have received a copy of the GNU General Public License 
+along with CatalogArcadeMachines. If not, see <https://www.gnu.org/licenses/>. 
+"""
+import asyncio
+import atexit
+import concurrent.futures
+import sys
+import threading
+from arcade_machine_shop import ArcadeMachine, Customer, PurchaseManager
+from purchase_journal import PurchaseJournal, default_journal
+
+_STOP = object()
+
+
+def shutting_down() -> bool:
+    """This function tells if the interpreter is exiting.
+
+    The main thread is stopped before the exit handlers run, and no
+    worker thread can be started from then on.
+
+    Returns:
+        True if the interpreter is exiting, False otherwise.
+    """
+    return sys.is_finalizing() or not threading.main_thread().is_alive()
+
+
+class Order:
+    """
+    This class represents a purchase going through the pipeline.
+    """
+    __slots__ = ("customer", "arcade_machine", "key", "total_price", "receipt", "future")
+
+    def __init__(self, customer: Customer, arcade_machine: ArcadeMachine, key: str,
+                 future: concurrent.futures.Future):
+        self.customer = customer
+        self.arcade_machine = arcade_machine
+        self.key = key
+        self.total_price = None
+        self.receipt = None
+        self.future = future
+
+
+class PurchasePipeline:
+    """
+    This class represents a pipeline that finalizes the purchases in the background.
+
+    Submitting a purchase only puts it in a bounded queue and returns a
+    future, so the CLI does not wait for the purchase file. An asyncio
+    loop in a background thread runs four stages connected by bounded
+    queues: validation, pricing, journaling and receipt. When a queue is
+    full the stage before it waits, and when the first queue is full
+    submit waits at most submit_timeout seconds. The future of a
+    purchase gives its receipt, or the error that stopped it, like the
+    ValueError of a purchase whose idempotency key the journal already
+    has.
+    """
+    def __init__(self, journal: PurchaseJournal = None, queue_size: int = 1000,
+                 submit_timeout: float = 5.0, on_receipt=None):
+        if queue_size < 1:
+            raise ValueError("The size of the queues must be greater than 0.")
+        self.journal = journal if journal is not None else default_journal()
+        self.on_receipt = on_receipt
+        self.__queue_size = queue_size
+        self.__submit_timeout = submit_timeout
+        self.__closed = False
+        self.__loop = asyncio.new_event_loop()
+        started = threading.Event()
+        self.__thread = threading.Thread(target=self.__run, args=(started,),
+                                         name="purchase-pipeline", daemon=True)
+        self.__thread.start()
+        started.wait()
+        atexit.register(self.close)
+
+    def submit(self, customer: Customer, arcade_machine: ArcadeMachine,
+               key: str = None) -> concurrent.futures.Future:
+        """
+        This method allows to put a purchase in the pipeline.
+
+        Args:
+            customer (Customer): The customer that buys the machine.
+            arcade_machine (ArcadeMachine): The machine bought.
+            key (str): The idempotency key of the order, or None.
+
+        Returns:
+            A future with the receipt of the purchase.
+
+        Raises:
+            ValueError: If the pipeline is closed or stayed full for the
+                submit timeout.
+        """
+        if self.__closed:
+            raise ValueError("The purchase pipeline is closed.")
+        future = concurrent.futures.Future()
+        queued = asyncio.run_coroutine_threadsafe(
+            self.__queues[0].put(Order(customer, arcade_machine, key, future)), self.__loop)
+        try:
+            queued.result(self.__submit_timeout)
+        except concurrent.futures.TimeoutError:
+            queued.cancel()
+            raise ValueError("The purchase pipeline is full, try again later.") from None
+        return future
+
+    def close(self):
+        """
+        This method allows to finish the queued purchases and stop the pipeline.
+        """
+        if self.__closed:
+            return
+        self.__closed = True
+        asyncio.run_coroutine_threadsafe(self.__queues[0].put(_STOP), self.__loop)
+        self.__thread.join()
+        self.journal.flush()
+        atexit.unregister(self.close)
+
+    def __run(self, started: threading.Event):
+        """
+        This method runs the loop of the stages in the background thread.
+        """
+        asyncio.set_event_loop(self.__loop)
+        stages = [self.__validate, self.__price, self.__write, self.__render]
+        self.__queues = [asyncio.Queue(self.__queue_size) for _ in stages]
+        workers = [self.__stage(stage, self.__queues[index],
+                                self.__queues[index + 1] if index + 1 < len(stages) else None)
+                   for index, stage in enumerate(stages)]
+        started.set()
+        try:
+            self.__loop.run_until_complete(asyncio.gather(*workers))
+        finally:
+            self.__loop.close()
+
+    async def __stage(self, stage, source: asyncio.Queue, target: asyncio.Queue):
+        """
+        This method runs a stage until the pipeline is stopped.
+
+        Args:
+            stage: The coroutine function that processes an order.
+            source (asyncio.Queue): The queue the orders come from.
+            target (asyncio.Queue): The queue of the next stage, or None.
+        """
+        while True:
+            order = await source.get()
+            if order is _STOP:
+                if target is not None:
+                    await target.put(_STOP)
+                return
+            if order.future.done():
+                continue
+            try:
+                await stage(order)
+            except Exception as error:
+                order.future.set_exception(error)
+                continue
+            if target is not None:
+                await target.put(order)
+
+    async def __validate(self, order: Order):
+        """
+        This stage checks that the purchase is complete.
+
+        Raises:
+            ValueError: If the purchase is not valid.
+        """
+        if not order.arcade_machine.games:
+            raise ValueError("The arcade machine has no games.")
+        if not order.customer.name or not order.customer.email:
+            raise ValueError("The customer needs a name and an email.")
+
+    async def __price(self, order: Order):
+        """
+        This stage calculates the price of the arcade machine into the order.
+
+        The arcade machine is not changed, since it belongs to the thread
+        that submitted it.
+
+        Raises:
+            ValueError: If the material is not available.
+        """
+        order.total_price = order.arcade_machine.calculate_price()
+
+    async def __write(self, order: Order):
+        """
+        This stage writes the purchase to the journal in a worker thread.
+
+        While the interpreter exits no thread can be started, so the
+        purchases left are written by the loop itself; any other error
+        of the write fails the purchase.
+        """
+        record = PurchaseManager(order.customer, order.arcade_machine, self.journal).build_record(order.total_price)
+        if shutting_down():
+            self.journal.write(record, order.key)
+        else:
+            await asyncio.to_thread(self.journal.write, record, order.key)
+
+    async def __render(self, order: Order):
+        """
+        This stage renders the receipt of the purchase and completes its future.
+        """
+        lines = ["===== Receipt =====", f"Customer: {order.customer.name}",
+                 f"Arcade machine material: {order.arcade_machine.material}"]
+        lines += [f"  {game.name}: {game.price}" for game in order.arcade_machine.games]
+        lines.append(f"Total price: {order.total_price}")
+        order.receipt = "\n".join(lines)
+        order.future.set_result(order.receipt)
+        if self.on_receipt is not None:
+            self.on_receipt(order.receipt)
@@ -0,0 +1,28 @@
+"""
+Tests for the game search by name.
+
+This file is part of CatalogArcadeMachines.
+
+CatalogArcadeMachines is free software: you can redistribute it and/or 
+modify it under the terms of the GNU General Public License as 
+published by the Free Software Foundation, either version 3 of 
+the License, or (at your option) any later version.
+
+CatalogArcadeMachines is distributed in the hope that it will be useful, 
+but WITHOUT ANY WARRANTY; without even the implied warranty of 
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU 
+General Public License for more details.
+
+You should have received a copy of the GNU General Public License 
+along with CatalogArcadeMachines. If not, see <https://www.gnu.org/licenses/>. 
+"""
+from arcade_machine_shop import Game, GamesCatalog
+
+
+def test_catalog_finds_games_by_prefix_and_typo():
+    catalog = GamesCatalog()
+    galaga = Game("Galaga", "Arcade", 120)
+    catalog.add_game(galaga)
+    assert catalog.search_by_name("gala")[0] is galaga
+    assert catalog.search_by_name("galaag")[0] is galaga
+    assert catalog.search_by_name("fighter")[0].name == "Street Fighter"
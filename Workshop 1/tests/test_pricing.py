@@ -0,0 +1,37 @@
+"""
+Tests for the pricing rules.
+
+This file is part of CatalogArcadeMachines.
+
+CatalogArcadeMachines is free software: you can redistribute it and/or 
+modify it under the terms of the GNU General Public License as 
+published by the Free Software Foundation, either version 3 of 
+the License, or (at your option) any later version.
+
+CatalogArcadeMachines is distributed in the hope that it will be useful, 
+but WITHOUT ANY WARRANTY; without even the implied warranty of 
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU 
+General Public License for more details.
+
+You should have received a copy of the GNU General Public License 
+along with CatalogArcadeMachines. If not, see <https://www.gnu.org/licenses/>. 
+"""
+import pytest
+
+from arcade_machine_shop import ArcadeMachine, Game
+from pricing import PricingRules, default_rules
+
+
+def test_machine_price_uses_the_material_surcharge():
+    games = [Game("Pacman", "Arcade", 100), Game("Galaga", "Arcade", 120)]
+    assert ArcadeMachine("wood", games, 0).calculate_price() == 720
+    assert ArcadeMachine("aluminum", games, 0).calculate_price() == 1220
+    with pytest.raises(ValueError):
+        ArcadeMachine("gold", games, 0).calculate_price()
+
+
+def test_aliases_and_duplicated_materials():
+    assert default_rules().material("aluminum") == "aluminium"
+    with pytest.raises(ValueError):
+        PricingRules({"materials": {"wood": {}, "oak": {"aliases": ["wood"]}},
+                      "machines": {"ArcadeMachine": {}}})
@@ -0,0 +1,94 @@
+"""
+Tests for the buffered purchase journal.
+
+This file is part of CatalogArcadeMachines.
+
+CatalogArcadeMachines is free software: you can redistribute it and/or 
+modify it under the terms of the GNU General Public License as 
+published by the Free Software Foundation, either version 3 of 
+the License, or (at your option) any later version.
+
+CatalogArcadeMachines is distributed in the hope that it will be useful, 
+but WITHOUT ANY WARRANTY; without even the implied warranty of 
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU 
+General Public License for more details.
+
+You should have received a copy of the GNU General Public License 
+along with CatalogArcadeMachines. If not, see <https://www.gnu.org/licenses/>. 
+"""
+import multiprocessing
+import os
+import time
+
+import pytest
+
+from purchase_journal import PurchaseJournal
+
+
+def read(path):
+    with open(path, "rb") as file:
+        return file.read().decode("utf-8")
+
+
+def test_records_are_buffered_until_flushed_or_closed(tmp_path):
+    path = str(tmp_path / "purchase.txt")
+    journal = PurchaseJournal(path, flush_every=2, flush_interval=60)
+    journal.write("a\n")
+    assert read(path) == ""
+    journal.write("b\n")
+    assert read(path) == f"a{os.linesep}b{os.linesep}"
+    journal.write("c\n")
+    journal.close()
+    assert read(path).count(os.linesep) == 3
+
+
+def test_idle_journal_is_flushed_by_its_timer(tmp_path):
+    path = str(tmp_path / "purchase.txt")
+    journal = PurchaseJournal(path, flush_every=100, flush_interval=0.05)
+    journal.write("a\n")
+    deadline = time.monotonic() + 5
+    while not read(path) and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert read(path) == f"a{os.linesep}"
+    journal.close()
+
+
+def test_keys_are_accepted_once_by_all_the_journals_of_a_file(tmp_path):
+    path = str(tmp_path / "purchase.txt")
+    first, second = PurchaseJournal(path), PurchaseJournal(path)
+    first.write("a\n", "order-1")
+    second.write("b\n", "order-1")  # dropped at the flush, the first journal writes it before
+    first.flush()
+    with pytest.raises(ValueError):
+        second.write("b\n", "order-1")
+    second.write("c\n", "order-2")
+    second.flush()
+    assert first.has_key("order-2")
+    first.close()
+    second.close()
+    assert read(path).count(os.linesep) == 2
+    with open(path + ".keys", "ab") as file:
+        file.write(b"order-cut")
+    with PurchaseJournal(path) as journal:
+        journal.write("d\n", "order-3")
+        assert not journal.has_key("order-cut") and journal.has_key("order-3")
+
+
+def write_and_crash(path):
+    journal = PurchaseJournal(path, flush_every=10, flush_interval=60)
+    journal.write("order-1\n", "order-1")
+    os._exit(0)  # the record is still in the buffer
+
+
+def test_crash_before_flush_keeps_no_key(tmp_path):
+    path = str(tmp_path / "purchase.txt")
+    context = multiprocessing.get_context("fork" if hasattr(os, "fork") else "spawn")
+    process = context.Process(target=write_and_crash, args=(path,))
+    process.start()
+    process.join()
+    with PurchaseJournal(path) as journal:
+        assert not journal.has_key("order-1")
+        journal.write("order-1\n", "order-1")
+        with pytest.raises(ValueError):
+            journal.write("again\n", "order-1")
+    assert read(path) == f"order-1{os.linesep}"
@@ -0,0 +1,75 @@
+"""
+Tests for the background purchase pipeline.
+
+This file is part of CatalogArcadeMachines.
+
+CatalogArcadeMachines is free software: you can redistribute it and/or 
+modify it under the terms of the GNU General Public License as 
+published by the Free Software Foundation, either version 3 of 
+the License, or (at your option) any later version.
+
+CatalogArcadeMachines is distributed in the hope that it will be useful, 
+but WITHOUT ANY WARRANTY; without even the implied warranty of 
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU 
+General Public License for more details.
+
+You should have received a copy of the GNU General Public License 
+along with CatalogArcadeMachines. If not, see <https://www.gnu.org/licenses/>. 
+"""
+from arcade_machine_shop import ArcadeMachine, Customer, Game
+from purchase_journal import PurchaseJournal
+from purchase_pipeline import PurchasePipeline
+
+
+def test_price_goes_to_the_order_and_not_to_the_machine(tmp_path):
+    journal = PurchaseJournal(str(tmp_path / "purchase.txt"), flush_every=1)
+    pipeline = PurchasePipeline(journal=journal)
+    machine = ArcadeMachine("wood", [Game("Galaga", "Arcade", 25.0)], 0)
+    receipt = pipeline.submit(Customer("Ana", "Street 1", "300", "ana@mail.com"), machine).result(5)
+    pipeline.close()
+    journal.close()
+    total = machine.calculate_price()
+    assert machine.price == 0
+    assert receipt.endswith(f"Total price: {total}")
+    with open(tmp_path / "purchase.txt", encoding="utf-8") as file:
+        assert f"Total price: {total}" in file.read()
+
+
+def test_invalid_purchase_fails_its_future(tmp_path):
+    pipeline = PurchasePipeline(journal=PurchaseJournal(str(tmp_path / "purchase.txt")))
+    future = pipeline.submit(Customer("Ana", "Street 1", "300", "ana@mail.com"), ArcadeMachine("wood", [], 0))
+    assert isinstance(future.exception(5), ValueError)
+    pipeline.close()
+
+
+def test_retried_order_fails_its_future(tmp_path):
+    journal = PurchaseJournal(str(tmp_path / "purchase.txt"))
+    pipeline = PurchasePipeline(journal=journal)
+    customer = Customer("Ana", "Street 1", "300", "ana@mail.com")
+    machine = ArcadeMachine("wood", [Game("Galaga", "Arcade", 25.0)], 0)
+    assert pipeline.submit(customer, machine, "order-1").result(5)
+    assert isinstance(pipeline.submit(customer, machine, "order-1").exception(5), ValueError)
+    pipeline.close()
+    journal.close()
+
+
+class FailingJournal:
+    def __init__(self):
+        self.writes = 0
+
+    def write(self, record, key=None):
+        self.writes += 1
+        raise RuntimeError("The disk is gone.")
+
+    def flush(self):
+        pass
+
+
+def test_failed_write_fails_its_future_and_is_not_retried():
+    journal = FailingJournal()
+    pipeline = PurchasePipeline(journal=journal)
+    machine = ArcadeMachine("wood", [Game("Galaga", "Arcade", 25.0)], 0)
+    future = pipeline.submit(Customer("Ana", "Street 1", "300", "ana@mail.com"), machine, "order-1")
+    assert isinstance(future.exception(5), RuntimeError)
+    pipeline.close()
+    assert journal.writes == 1
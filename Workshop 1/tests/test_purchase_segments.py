@@ -0,0 +1,63 @@
+"""
+Tests for the rotation of the purchase journal.
+
+This file is part of CatalogArcadeMachines.
+
+CatalogArcadeMachines is free software: you can redistribute it and/or 
+modify it under the terms of the GNU General Public License as 
+published by the Free Software Foundation, either version 3 of 
+the License, or (at your option) any later version.
+
+CatalogArcadeMachines is distributed in the hope that it will be useful, 
+but WITHOUT ANY WARRANTY; without even the implied warranty of 
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU 
+General Public License for more details.
+
+You should have received a copy of the GNU General Public License 
+along with CatalogArcadeMachines. If not, see <https://www.gnu.org/licenses/>. 
+"""
+import os
+from datetime import datetime
+
+from purchase_journal import PurchaseJournal, default_rotation
+from purchase_segments import SegmentRotator, list_segments, read_footer
+
+
+def record_text(date):
+    return f"Date: {date}\nCustomer: Ana\nAdress: Street 1\nTotal price: 110.0\n"
+
+
+def test_journal_rotates_into_segments_with_the_dates_of_the_purchases(tmp_path):
+    rotator = SegmentRotator(str(tmp_path / "segments"), max_bytes=150)
+    with PurchaseJournal(str(tmp_path / "purchase.txt"), flush_every=2, rotation=rotator) as journal:
+        for date in ("2024-03-05 10:00:00", "2024-03-01 10:00:00", "2024-03-09 10:00:00"):
+            journal.write(record_text(date))
+    segments = list_segments(str(tmp_path / "segments"))
+    assert len(segments) == 1
+    assert read_footer(segments[0])[:3] == ("2024-03-01 10:00:00", "2024-03-05 10:00:00", 2)
+
+
+def test_age_counts_from_the_first_purchase_of_the_journal(tmp_path):
+    path = tmp_path / "purchase.txt"
+    path.write_text(record_text("2024-03-01 10:00:00"))
+    started = datetime(2024, 3, 1, 10).timestamp()
+    rotator = SegmentRotator(str(tmp_path / "segments"), max_bytes=None, max_age=60, clock=lambda: started + 59)
+    assert not rotator.due(10, str(path))
+    rotator = SegmentRotator(str(tmp_path / "segments"), max_bytes=None, max_age=60, clock=lambda: started + 60)
+    assert rotator.due(10, str(path))
+
+
+def test_default_rotation_keeps_segments_next_to_the_journal(tmp_path):
+    rotator = default_rotation(str(tmp_path / "purchase.txt"))
+    assert rotator.directory == str(tmp_path / "segments")
+    assert not os.path.exists(rotator.directory)  # created by the first rotation
+
+
+def test_rotator_keeps_the_newest_segments(tmp_path):
+    path = tmp_path / "purchase.txt"
+    rotator = SegmentRotator(str(tmp_path / "segments"), max_segments=2)
+    for day in range(1, 5):
+        path.write_text(record_text(f"2024-03-0{day} 10:00:00"))
+        rotator.rotate(str(path))
+    assert [os.path.basename(segment) for segment in list_segments(rotator.directory)] == [
+        "purchases-000003.seg", "purchases-000004.seg"]
@@ -0,0 +1,135 @@
+"""
+This module measures the client directory with millions of clients.
+
+A CSV file with the clients is written, imported into the directory
+and then the clients are searched by email, phone and name prefix. The
+memory of the directory is compared against keeping the Client objects
+in a dictionary by email.
+
+Usage:
+    python client_directory_benchmark.py [--count 1000000] [--lookups 100000]
+
+Author: Cristian Andres Gamez Nuñez <cagamezn@udistrital.edu.co>
+
+This file is part of Workshop-SM-UD.
+
+Workshop-SM-UD is free software: you can redistribute it and/or
+modify it under the terms of the GNU General Public License as
+published by the Free Software Foundation, either version 3 of
+the License, or (at your option) any later version.
+
+Workshop-SM-UD is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with Workshop-SM-UD. If not, see <https://www.gnu.org/licenses/>.
+"""
+import argparse
+import csv
+import gc
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from clientdirectory import CSV_FIELDS, ClientDirectory
+from users import Address, Client
+
+FIRST_NAMES = ("Ana", "Luis", "Sofia", "Liam", "Camila", "Mateo", "Valentina", "Homer", "Marge", "Lisa")
+LAST_NAMES = ("Gamez", "Rodriguez", "Simpson", "Lopez", "Martinez", "Garcia", "Perez", "Gomez")
+CITIES = ("Bogota", "Medellin", "Cali", "Springfield")
+
+
+def write_clients(path: str, count: int):
+    """This function writes a CSV file with generated clients.
+
+    One client in ten has a second row with another phone and address.
+
+    Args:
+        path (str): The path of the CSV file.
+        count (int): The number of clients.
+    """
+    generator = random.Random(0)
+    with open(path, "w", encoding="utf-8", newline="") as file:
+        writer = csv.writer(file)
+        writer.writerow(CSV_FIELDS)
+        for number in range(count):
+            name = f"{generator.choice(FIRST_NAMES)} {generator.choice(LAST_NAMES)} {number}"
+            row = [name, f"client{number}@shop.com", f"3{number:09d}", f"Street {number}",
+                   110000 + number % 1000, generator.choice(CITIES), "Colombia"]
+            writer.writerow(row)
+            if number % 10 == 0:
+                writer.writerow(row[:2] + [f"6{number:09d}", f"Avenue {number}"] + row[4:])
+
+
+def measure(function) -> tuple:
+    """This function runs a function and measures its time and the memory it keeps.
+
+    Args:
+        function: The function to run without arguments.
+
+    Returns:
+        A tuple with the result, the seconds and the megabytes kept.
+    """
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = function()
+    elapsed = time.perf_counter() - start
+    used = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, elapsed, used / 2 ** 20
+
+
+def run(count: int, lookups: int):
+    """This function runs the benchmark and prints the results.
+
+    Args:
+        count (int): The number of clients.
+        lookups (int): The number of searches of every kind.
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "clients.csv")
+        write_clients(path, count)
+        clients = ClientDirectory()
+        _, elapsed, used = measure(lambda: clients.import_csv(path))
+    print(f"Import of {count:,} clients: {elapsed:.2f} s, {used:.1f} MB, {used * 2 ** 20 / count:.0f} bytes per client")
+
+    def objects():
+        by_email = {}
+        for number in range(count):
+            client = Client(f"Client {number}", f"client{number}@shop.com", f"3{number:09d}",
+                            Address(f"Street {number}", 110000 + number % 1000, "Bogota"))
+            by_email[client._email] = client
+        return by_email
+    by_email, _, used_objects = measure(objects)
+    del by_email
+    print(f"Client objects by email: {used_objects:.1f} MB, {used_objects * 2 ** 20 / count:.0f} bytes per client")
+
+    generator = random.Random(1)
+    numbers = [generator.randrange(count) for _ in range(lookups)]
+    cases = [
+        ("email", lambda: [clients.get_by_email(f"client{number}@shop.com") for number in numbers]),
+        ("phone", lambda: [clients.get_by_phone(f"3{number:09d}") for number in numbers]),
+        ("name prefix", lambda: [clients.search_by_name(f"{FIRST_NAMES[number % 10]} {LAST_NAMES[number % 8]} {number % 100}")
+                                 for number in numbers]),
+    ]
+    for name, function in cases:
+        start = time.perf_counter()
+        function()
+        elapsed = time.perf_counter() - start
+        print(f"Lookup by {name}: {elapsed / lookups * 1e6:.1f} us")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure the client directory with millions of clients.")
+    parser.add_argument("--count", type=int, default=1_000_000, help="clients in the directory")
+    parser.add_argument("--lookups", type=int, default=100_000, help="searches of every kind")
+    arguments = parser.parse_args()
+    run(arguments.count, arguments.lookups)
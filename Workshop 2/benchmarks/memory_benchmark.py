@@ -0,0 +1,185 @@
+"""
+This module measures the memory used by the domain objects.
+
+Each slotted class is compared against an equivalent class that keeps
+its attributes in a per-instance dictionary, as the classes did before.
+
+Usage:
+    python memory_benchmark.py [--count 1000000]
+
+Author: Cristian Andres Gamez Nuñez <cagamezn@udistrital.edu.co>
+
+This file is part of Workshop-SM-UD.
+
+Workshop-SM-UD is free software: you can redistribute it and/or
+modify it under the terms of the GNU General Public License as
+published by the Free Software Foundation, either version 3 of
+the License, or (at your option) any later version.
+
+Workshop-SM-UD is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with Workshop-SM-UD. If not, see <https://www.gnu.org/licenses/>.
+"""
+import argparse
+import gc
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from videogames import VideoGame
+from users import Address, Client
+from machines import ClasicArcadeMachine, DanceRevolutionMachine
+
+
+class DictVideoGame:
+    """This class represents a videogame with a per-instance dictionary."""
+
+    def __init__(self, code, name, description, price, category, definition,
+                 storytelling_creator, graphics_creator, year):
+        self.code = code
+        self.name = name
+        self.description = description
+        self.price = price
+        self.category = category
+        self.definition = definition
+        self.storytelling_creator = storytelling_creator
+        self.graphics_creator = graphics_creator
+        self.year = year
+
+
+class DictAddress:
+    """This class represents an address with a per-instance dictionary."""
+
+    def __init__(self, street, zip_code, city, country):
+        self.street = street
+        self.zip_code = zip_code
+        self.city = city
+        self.country = country
+
+
+class DictClient:
+    """This class represents a client with a per-instance dictionary."""
+
+    def __init__(self, name, email, phone, address):
+        self.name = name
+        self.email = email
+        self.grants = {
+            "add_videogames": False,
+            "remove_videogames": False,
+            "add_machine_material": True,
+            "buy_machine": True,
+        }
+        self.phones = [phone]
+        self.addresses = [address]
+
+
+class DictDanceRevolutionMachine:
+    """This class represents a Dance Revolution machine with a per-instance dictionary."""
+
+    def __init__(self, material, videogames):
+        self.material = material
+        self.videogames = videogames
+        self.dimensions = (150, 150, 250)
+        self.weight = 80
+        self.energy_consumption = 1000
+        self.memory = 64
+        self.processor = "Intel Core i3"
+        self.base_price = 7000
+        self.dificulties = ['easy', 'medium', 'hard']
+        self.arrow_cardinalities = ['up', 'down', 'left', 'right']
+        self.control_price = 1000
+
+
+class DictClasicArcadeMachine:
+    """This class represents a clasic arcade machine with a per-instance dictionary."""
+
+    def __init__(self, material, videogames):
+        self.material = material
+        self.videogames = videogames
+        self.dimensions = (180, 70, 60)
+        self.weight = 15
+        self.energy_consumption = 200
+        self.memory = 16
+        self.processor = "Raspberry Pi 4"
+        self.base_price = 3000
+
+
+def fresh(text: str) -> str:
+    """This function returns a new copy of a string, as if it was read from input.
+
+    Args:
+        text (str): The string to copy.
+
+    Returns:
+        A new string object equal to the text.
+    """
+    return text.encode().decode()
+
+
+def measure(factory, count: int) -> float:
+    """This function measures the memory used by the objects of a factory.
+
+    Args:
+        factory: A function that receives an index and returns a new object.
+        count (int): The number of objects to create.
+
+    Returns:
+        A float with the number of bytes used per object.
+    """
+    gc.collect()
+    tracemalloc.start()
+    objects = [factory(i) for i in range(count)]
+    used = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del objects
+    return used / count
+
+
+def run(count: int):
+    """This function runs the benchmark and prints a table with the results.
+
+    Args:
+        count (int): The number of objects to create of every class.
+    """
+    categories = ["Classic", "Racing", "Dance", "Shooter", "Virtual"]
+    cities = ["Bogota", "Medellin", "Cali"]
+    materials = ["wood", "aluminium", "carbon fiber"]
+
+    cases = [
+        ("VideoGame",
+         lambda i: DictVideoGame(i, "Game", "", 10.0, fresh(categories[i % 5]), "HD", "Sofia", "Liam", 2023),
+         lambda i: VideoGame(i, "Game", "", 10.0, fresh(categories[i % 5]), "HD", "Sofia", "Liam", 2023)),
+        ("Address",
+         lambda i: DictAddress("St. 1", i, fresh(cities[i % 3]), fresh("Colombia")),
+         lambda i: Address("St. 1", i, fresh(cities[i % 3]), fresh("Colombia"))),
+        ("Client",
+         lambda i: DictClient("Homer", "homer@springfield.com", "1234567", None),
+         lambda i: Client("Homer", "homer@springfield.com", "1234567", None)),
+        ("DanceRevolutionMachine",
+         lambda i: DictDanceRevolutionMachine(fresh(materials[i % 3]), []),
+         lambda i: DanceRevolutionMachine(fresh(materials[i % 3]), [])),
+        ("ClasicArcadeMachine",
+         lambda i: DictClasicArcadeMachine(fresh(materials[i % 3]), []),
+         lambda i: ClasicArcadeMachine(fresh(materials[i % 3]), [])),
+    ]
+
+    print(f"{'Class':<24}{'dict (B/obj)':>14}{'slots (B/obj)':>15}{'saved':>8}"
+          f"{f'saved at {count:,}':>20}")
+    for name, dict_factory, slots_factory in cases:
+        dict_size = measure(dict_factory, count)
+        slots_size = measure(slots_factory, count)
+        saved = dict_size - slots_size
+        print(f"{name:<24}{dict_size:>14.1f}{slots_size:>15.1f}{saved / dict_size:>8.0%}"
+              f"{saved * count / 2 ** 20:>16.1f} MiB")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure the memory used by the domain objects.")
+    parser.add_argument("--count", type=int, default=1_000_000, help="objects created of every class")
+    run(parser.parse_args().count)
@@ -0,0 +1,95 @@
+"""
+This module measures the time to create machines from prototypes.
+
+Creating machines with the constructor of the factory is compared
+against copying a registered prototype and adjusting its material and
+videogames, as the orders of near-identical configurations do.
+
+Usage:
+    python prototype_benchmark.py [--count 100000] [--repeat 3]
+
+Author: Cristian Andres Gamez Nuñez <cagamezn@udistrital.edu.co>
+
+This file is part of Workshop-SM-UD.
+
+Workshop-SM-UD is free software: you can redistribute it and/or
+modify it under the terms of the GNU General Public License as
+published by the Free Software Foundation, either version 3 of
+the License, or (at your option) any later version.
+
+Workshop-SM-UD is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with Workshop-SM-UD. If not, see <https://www.gnu.org/licenses/>.
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from videogamescatalog import VideoGamesCatalog
+from machines import ClasicArcadeFactory, VirtualRealityFactory
+
+
+def best_time(function, repeat: int) -> float:
+    """This function returns the best time of some runs of a function.
+
+    Args:
+        function: The function to run without arguments.
+        repeat (int): The number of runs.
+
+    Returns:
+        A float with the best time in seconds.
+    """
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def run(count: int, repeat: int):
+    """This function runs the benchmark and prints a table with the results.
+
+    Args:
+        count (int): The number of machines to create in every run.
+        repeat (int): The number of runs of every case.
+    """
+    catalog = VideoGamesCatalog()
+    bundle = [catalog.search_by_code(code) for code in (1, 2, 3, 4)]
+    extra = [catalog.search_by_code(5)]
+    glasses = ("Oculus", (1920, 1080), 500.0)
+
+    clasic = ClasicArcadeFactory()
+    clasic.register_prototype("bundle", clasic.MACHINE("wood", bundle))
+    virtual = VirtualRealityFactory()
+    virtual.register_prototype("bundle", virtual.MACHINE("wood", bundle, *glasses))
+
+    cases = [
+        ("ClasicArcadeMachine",
+         lambda: [clasic.create_machine("aluminium", bundle + extra) for _ in range(count)],
+         lambda: [clasic.create_from_prototype("bundle", "aluminium", extra) for _ in range(count)]),
+        ("VirtualRealityMachine",
+         lambda: [virtual.create_machine("aluminium", bundle + extra, *glasses) for _ in range(count)],
+         lambda: [virtual.create_from_prototype("bundle", "aluminium", extra) for _ in range(count)]),
+    ]
+
+    print(f"{'Class':<24}{'constructor (s)':>17}{'prototype (s)':>15}{'speedup':>9}")
+    for name, construct, clone in cases:
+        construct_time = best_time(construct, repeat)
+        clone_time = best_time(clone, repeat)
+        print(f"{name:<24}{construct_time:>17.3f}{clone_time:>15.3f}{construct_time / clone_time:>8.2f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure the time to create machines from prototypes.")
+    parser.add_argument("--count", type=int, default=100_000, help="machines created in every run")
+    parser.add_argument("--repeat", type=int, default=3, help="runs of every case")
+    arguments = parser.parse_args()
+    run(arguments.count, arguments.repeat)
@@ -0,0 +1,211 @@
+"""
+This module stresses the purchase log with several processes writing at once.
+
+Every process plays a shop terminal that writes purchases of different
+sizes to the same log, some larger than the write buffers of the
+system, at the same time as the others. Then the log, and its segments
+when it is rotated, are read back to check that every purchase is
+there exactly once, whole, and in the order of its terminal.
+
+Usage:
+    python stress_purchase_log.py [--processes 8] [--records 2000] [--mode locked]
+                                  [--rotate-bytes 1000000]
+
+The modes are locked, the purchase journal; unlocked, the journal
+without its file lock; and naive, opening the file in append mode for
+every purchase as the purchase manager used to do.
+
+Author: Cristian Andres Gamez Nuñez <cagamezn@udistrital.edu.co>
+
+This file is part of Workshop-SM-UD.
+
+Workshop-SM-UD is free software: you can redistribute it and/or
+modify it under the terms of the GNU General Public License as
+published by the Free Software Foundation, either version 3 of
+the License, or (at your option) any later version.
+
+Workshop-SM-UD is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with Workshop-SM-UD. If not, see <https://www.gnu.org/licenses/>.
+"""
+import argparse
+import multiprocessing
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from purchasejournal import PurchaseJournal
+from purchaselog import RECORD_START, parse_record
+from purchasesegments import SegmentRotator, iter_segment, list_segments
+
+MODES = ("locked", "unlocked", "naive")
+
+
+def build_record(terminal: int, number: int, games: int) -> str:
+    """This function builds the text of a purchase of a terminal.
+
+    The email tells the terminal and the number of the purchase, and the
+    total price is the number of games, so a purchase mixed with another
+    one can be detected.
+
+    Args:
+        terminal (int): The number of the terminal.
+        number (int): The number of the purchase in the terminal.
+        games (int): The number of games of the purchase.
+
+    Returns:
+        A string with the lines of the purchase.
+    """
+    lines = [
+        f"Date: 2024-01-01 00:00:{number % 60:02d}.{terminal:06d}",
+        f"Client: Terminal {terminal}",
+        "Adress: St. Evergreen 123, 110783, Springfield, USA",
+        "Phone: 1234567",
+        f"Email: t{terminal}-{number}@shop.com",
+        "Arcade machine material: wood",
+        "Games:",
+    ]
+    lines += [f"Name: Game {game}, Category: Classic, Price: 1.0" for game in range(games)]
+    lines.append(f"Total price: {float(games)}")
+    lines.append("")
+    return "\n".join(lines)
+
+
+def write_purchases(terminal: int, path: str, records: int, flush_every: int, mode: str,
+                    segments: str, rotate_bytes: int, start):
+    """This function writes the purchases of a terminal; it runs in its own process.
+
+    Args:
+        terminal (int): The number of the terminal.
+        path (str): The path of the log.
+        records (int): The number of purchases to write.
+        flush_every (int): The purchases buffered by the journal.
+        mode (str): The way the log is written, one of MODES.
+        segments (str): The directory of the segments, or None to not rotate.
+        rotate_bytes (int): The size of the log that makes it rotate.
+        start: The event that starts all the terminals at once.
+    """
+    generator = random.Random(terminal)
+    texts = [build_record(terminal, number, generator.choice((1, 2, 5, 50, 2000)))
+             for number in range(records)]
+    start.wait()
+    if mode == "naive":
+        for text in texts:
+            with open(path, "a", encoding="utf-8") as file:
+                file.write(text)
+        return
+    rotation = SegmentRotator(segments, rotate_bytes) if segments else None
+    with PurchaseJournal(path, flush_every=flush_every, flush_interval=0.01, sync="never",
+                         rotation=rotation, lock=mode == "locked") as journal:
+        for text in texts:
+            journal.write(text)
+
+
+def verify(path: str, segments: str, processes: int, records: int) -> dict:
+    """This function checks the purchases written by the terminals.
+
+    Args:
+        path (str): The path of the log.
+        segments (str): The directory of the segments, or None.
+        processes (int): The number of terminals.
+        records (int): The purchases written by every terminal.
+
+    Returns:
+        A dictionary with the purchases found, torn, missing, repeated
+        and out of order.
+    """
+    texts = []
+    if segments:
+        for segment in list_segments(segments):
+            texts += [record for record in iter_segment(segment)]
+    with open(path, "rb") as file:
+        blocks = ("\n" + file.read().decode("utf-8", errors="replace")).split(RECORD_START.decode())[1:]
+    torn = 0
+    found = list(texts)
+    for block in blocks:
+        try:
+            found.append(parse_record("Date: " + block))
+        except ValueError:
+            torn += 1
+
+    last = [-1] * processes
+    seen = set()
+    repeated = out_of_order = 0
+    for record in found:
+        terminal, number = record.email[1:-len("@shop.com")].split("-")
+        terminal, number = int(terminal), int(number)
+        if len(record.games) != record.total_price:
+            torn += 1
+            continue
+        if (terminal, number) in seen:
+            repeated += 1
+        seen.add((terminal, number))
+        if number < last[terminal]:
+            out_of_order += 1
+        last[terminal] = number
+    return {"found": len(seen), "torn": torn, "missing": processes * records - len(seen),
+            "repeated": repeated, "out of order": out_of_order}
+
+
+def run(processes: int, records: int, flush_every: int, mode: str, rotate_bytes: int) -> bool:
+    """This function runs the stress test and prints its results.
+
+    Args:
+        processes (int): The number of terminals writing at once.
+        records (int): The purchases written by every terminal.
+        flush_every (int): The purchases buffered by every journal.
+        mode (str): The way the log is written, one of MODES.
+        rotate_bytes (int): The size of the log that makes it rotate, or
+            None to not rotate it.
+
+    Returns:
+        True if every terminal ended and every purchase was found whole
+        exactly once and in order.
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "purchase.txt")
+        segments = os.path.join(directory, "segments") if rotate_bytes else None
+        start = multiprocessing.Event()
+        terminals = [multiprocessing.Process(target=write_purchases,
+                                             args=(terminal, path, records, flush_every, mode,
+                                                   segments, rotate_bytes, start))
+                     for terminal in range(processes)]
+        for terminal in terminals:
+            terminal.start()
+        began = time.perf_counter()
+        start.set()
+        for terminal in terminals:
+            terminal.join()
+        elapsed = time.perf_counter() - began
+        results = verify(path, segments, processes, records)
+        results["failed terminals"] = sum(terminal.exitcode != 0 for terminal in terminals)
+
+    print(f"{processes} processes x {records} purchases, mode {mode}: {elapsed:.2f} s, "
+          f"{processes * records / elapsed:,.0f} purchases/s")
+    for name, value in results.items():
+        print(f"  {name}: {value}")
+    ok = results["found"] == processes * records and not any(
+        results[name] for name in ("torn", "missing", "repeated", "out of order", "failed terminals"))
+    print("  OK" if ok else "  FAILED")
+    return ok
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Stress the purchase log with several processes.")
+    parser.add_argument("--processes", type=int, default=8, help="terminals writing at once")
+    parser.add_argument("--records", type=int, default=2000, help="purchases of every terminal")
+    parser.add_argument("--flush-every", type=int, default=10, help="purchases buffered by every journal")
+    parser.add_argument("--mode", choices=MODES, default="locked", help="way the log is written")
+    parser.add_argument("--rotate-bytes", type=int, default=None, help="size that rotates the log")
+    arguments = parser.parse_args()
+    ok = run(arguments.processes, arguments.records, arguments.flush_every, arguments.mode,
+             arguments.rotate_bytes)
+    sys.exit(0 if ok else 1)
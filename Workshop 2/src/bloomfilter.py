@@ -0,0 +1,114 @@
+"""
+This module has a class to define a Bloom filter of keys.
+
+Author: Cristian Andres Gamez Nuñez <cagamezn@udistrital.edu.co>
+
+This file is part of Workshop-SM-UD.
+
+Workshop-SM-UD is free software: you can redistribute it and/or
+modify it under the terms of the GNU General Public License as
+published by the Free Software Foundation, either version 3 of
+the License, or (at your option) any later version.
+
+Workshop-SM-UD is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with Workshop-SM-UD. If not, see <https://www.gnu.org/licenses/>.
+"""
+import math
+from hashlib import blake2b
+
+
+class BloomFilter:
+    """This class represents a set of keys that only tells if a key may be in it.
+
+    The keys are not stored: every key sets some bits of a bit array,
+    found with two halves of its blake2b digest. A key that was added is
+    always found, and a key that was not added is found with a small
+    probability, the error rate. The memory is fixed by the capacity and
+    the error rate; adding more keys than the capacity only makes the
+    error rate grow.
+    """
+
+    def __init__(self, capacity: int = 1_000_000, error_rate: float = 0.01):
+        if capacity < 1:
+            raise ValueError("The capacity of the filter must be greater than 0.")
+        if not 0 < error_rate < 1:
+            raise ValueError("The error rate of the filter must be between 0 and 1.")
+        self.__size = math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)
+        self.__hashes = max(1, round(self.__size / capacity * math.log(2)))
+        self.__bits = bytearray((self.__size + 7) // 8)
+        self.__capacity = capacity
+        self.__count = 0
+
+    def __len__(self) -> int:
+        return self.__count
+
+    def __contains__(self, key: str) -> bool:
+        bits = self.__bits
+        return all(bits[position >> 3] & (1 << (position & 7)) for position in self.__positions(key))
+
+    @property
+    def capacity(self) -> int:
+        """This property returns the keys the filter was sized for.
+
+        Returns:
+            An integer with the capacity of the filter.
+        """
+        return self.__capacity
+
+    @property
+    def memory(self) -> int:
+        """This property returns the bytes of the bit array.
+
+        Returns:
+            An integer with the size of the bit array in bytes.
+        """
+        return len(self.__bits)
+
+    def add(self, key: str) -> bool:
+        """This method allows to add a key to the filter.
+
+        Args:
+            key (str): The key to add.
+
+        Returns:
+            True if the key was not in the filter before, as far as the
+            filter can tell.
+        """
+        bits = self.__bits
+        new = False
+        for position in self.__positions(key):
+            mask = 1 << (position & 7)
+            if not bits[position >> 3] & mask:
+                bits[position >> 3] |= mask
+                new = True
+        if new:
+            self.__count += 1
+        return new
+
+    def error_rate(self) -> float:
+        """This method estimates the probability that a missing key is found.
+
+        Returns:
+            A float with the expected error rate for the keys added.
+        """
+        return (1 - math.exp(-self.__hashes * self.__count / self.__size)) ** self.__hashes
+
+    def __positions(self, key: str):
+        """This method returns the positions of the bits of a key.
+
+        Args:
+            key (str): The key.
+
+        Returns:
+            A generator of the positions in the bit array.
+        """
+        digest = blake2b(key.encode("utf-8"), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], "little")
+        step = int.from_bytes(digest[8:], "little") | 1
+        size = self.__size
+        return ((first + index * step) % size for index in range(self.__hashes))
@@ -0,0 +1,462 @@
+"""
+This module has a class to define an indexed directory of clients.
+
+Author: Cristian Andres Gamez Nuñez <cagamezn@udistrital.edu.co>
+
+This file is part of Workshop-SM-UD.
+
+Workshop-SM-UD is free software: you can redistribute it and/or
+modify it under the terms of the GNU General Public License as
+published by the Free Software Foundation, either version 3 of
+the License, or (at your option) any later version.
+
+Workshop-SM-UD is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with Workshop-SM-UD. If not, see <https://www.gnu.org/licenses/>.
+"""
+import csv
+import os
+import re
+from array import array
+from nameindex import normalize
+from users import Address, Client
+
+CLIENTS_CSV = os.environ.get("CLIENTS_CSV")
+CSV_FIELDS = ("name", "email", "phone", "street", "zip_code", "city", "country")
+
+FIELD = "\x1f"  # separates the name, email, phones and addresses of a record
+ITEM = "\x1e"  # separates the phones and the addresses
+PART = "\x1d"  # separates the fields of an address
+SEPARATORS = re.compile("[\x1d-\x1f]")
+MAX_WORD_OFFSET = 255
+
+
+def encode(name: str, email: str, phones, addresses) -> str:
+    """This function packs the fields of a client into a record.
+
+    Args:
+        name (str): The name of the client.
+        email (str): The email of the client.
+        phones: The phones of the client.
+        addresses: The addresses of the client, as tuples of street, zip
+            code, city and country.
+
+    Returns:
+        A string with the record.
+
+    Raises:
+        ValueError: If a field has one of the separators of the records.
+    """
+    parts = [str(part) for address in addresses for part in address]
+    if SEPARATORS.search("".join([name, email, *phones, *parts])):
+        raise ValueError(f"The client {email} has a control character.")
+    return FIELD.join((name, email, ITEM.join(phones),
+                       ITEM.join(PART.join(map(str, address)) for address in addresses)))
+
+
+def decode(record: str) -> tuple:
+    """This function unpacks the fields of a record.
+
+    Args:
+        record (str): The record of a client.
+
+    Returns:
+        A tuple with the name, email, list of phones and list of
+        addresses as tuples of street, zip code, city and country.
+    """
+    name, email, phones, addresses = record.split(FIELD)
+    unpacked = []
+    for address in addresses.split(ITEM):
+        street, zip_code, city, country = address.split(PART)
+        unpacked.append((street, int(zip_code), city, country))
+    return name, email, phones.split(ITEM), unpacked
+
+
+class ClientDirectory:
+    """This class represents a directory of clients indexed to find them fast.
+
+    Every client is kept as a compact record: a single string with its
+    name, email, phones and addresses joined by control characters, so a
+    client costs one object instead of a Client with its lists and
+    Address objects. A Client is only created when a search returns it.
+    Hash indexes map every email and every phone to the position of its
+    record, so finding a client by email or phone takes constant time
+    however many clients there are.
+
+    For the name searches an array keeps, sorted by name, a reference
+    to every word of every name: the position of the record and where
+    the word starts in the normalized name. A binary search over it
+    finds the names with a word starting with a prefix without storing
+    the normalized names. After a bulk import the array is sorted once.
+    """
+
+    def __init__(self):
+        self.__records = []  # position -> record, None if removed
+        self.__by_email = {}  # email -> position
+        self.__by_phone = {}  # phone -> position, or tuple of positions if shared
+        self.__names = array("q")  # position << 8 | word offset, sorted by the words
+        self.__sorted = True
+        self.__size = 0
+
+    def __len__(self) -> int:
+        return self.__size
+
+    def __contains__(self, email: str) -> bool:
+        return email in self.__by_email
+
+    def __iter__(self):
+        for record in self.__records:
+            if record is not None:
+                yield self.__client(record)
+
+    def add(self, client: Client) -> int:
+        """This method allows to add a client to the directory.
+
+        Args:
+            client (Client): The client to add.
+
+        Returns:
+            An integer with the position of the client in the directory.
+
+        Raises:
+            ValueError: If a client with the same email is in the directory.
+        """
+        if client._email in self.__by_email:
+            raise ValueError(f"A client with email {client._email} is already in the directory.")
+        return self.__append(client._name, client._email, client.get_phones(),
+                             [address.parts() for address in client.get_addresses()])
+
+    def add_phone(self, email: str, phone: str):
+        """This method allows to add a phone to a client of the directory.
+
+        Args:
+            email (str): The email of the client.
+            phone (str): The phone to add.
+
+        Raises:
+            ValueError: If the client is not in the directory.
+        """
+        position = self.__position(email)
+        name, email, phones, addresses = decode(self.__records[position])
+        if phone not in phones:
+            self.__records[position] = encode(name, email, phones + [phone], addresses)
+            self.__index_phone(phone, position)
+
+    def add_address(self, email: str, street: str, zip_code: int, city: str, country: str = "Colombia"):
+        """This method allows to add an address to a client of the directory.
+
+        Args:
+            email (str): The email of the client.
+            street (str): Street of the address.
+            zip_code (int): Zip code of the address.
+            city (str): City of the address.
+            country (str): Country of the address.
+
+        Raises:
+            ValueError: If the client is not in the directory.
+        """
+        position = self.__position(email)
+        name, email, phones, addresses = decode(self.__records[position])
+        address = (street, zip_code, city, country)
+        if address not in addresses:
+            self.__records[position] = encode(name, email, phones, addresses + [address])
+
+    def remove(self, email: str) -> Client:
+        """This method allows to remove a client from the directory.
+
+        Args:
+            email (str): The email of the client.
+
+        Returns:
+            The removed client or None if the email is not in the directory.
+        """
+        position = self.__by_email.pop(email, None)
+        if position is None:
+            return None
+        record = self.__records[position]
+        name, _, phones, _ = decode(record)
+        for phone in phones:
+            positions = tuple(other for other in self.__positions(phone) if other != position)
+            if not positions:
+                del self.__by_phone[phone]
+            else:
+                self.__by_phone[phone] = positions[0] if len(positions) == 1 else positions
+        self.__sort_names()
+        normalized = normalize(name)
+        for offset in self.__word_offsets(normalized):
+            index = self.__bisect(normalized[offset:])
+            reference = position << 8 | offset
+            while self.__names[index] != reference:
+                index += 1
+            del self.__names[index]
+        self.__records[position] = None
+        self.__size -= 1
+        return self.__client(record)
+
+    def get_by_email(self, email: str) -> Client:
+        """This method allows to find a client by its email.
+
+        Args:
+            email (str): The email of the client.
+
+        Returns:
+            The client or None if the email is not in the directory.
+        """
+        position = self.__by_email.get(email)
+        return None if position is None else self.__client(self.__records[position])
+
+    def get_by_phone(self, phone: str) -> list[Client]:
+        """This method allows to find the clients with a phone.
+
+        Args:
+            phone (str): The phone of the clients.
+
+        Returns:
+            A list with the clients that have the phone.
+        """
+        return [self.__client(self.__records[position]) for position in self.__positions(phone)]
+
+    def search_by_name(self, prefix: str, limit: int = 10) -> list[Client]:
+        """This method allows to find the clients whose name starts with a prefix.
+
+        The prefix may also start a later word of the name, like the last
+        name. The names are compared without accents, case or punctuation.
+
+        Args:
+            prefix (str): The start of the name.
+            limit (int): The maximum number of clients to return.
+
+        Returns:
+            A list with the clients ordered by the words that match.
+        """
+        key = normalize(prefix)
+        self.__sort_names()
+        positions = {}
+        index = self.__bisect(key)
+        while (index < len(self.__names) and len(positions) < limit
+               and self.__name_key(self.__names[index]).startswith(key)):
+            positions.setdefault(self.__names[index] >> 8, None)
+            index += 1
+        return [self.__client(self.__records[position]) for position in positions]
+
+    def add_many(self, clients) -> int:
+        """This method allows to add several clients at once, like the ones of a client store.
+
+        A client whose email is already in the directory adds its phones
+        and addresses to that client. The names are sorted once at the end.
+
+        Args:
+            clients: An iterable of clients, read one by one.
+
+        Returns:
+            An integer with the number of clients added.
+        """
+        added = 0
+        self.__sorted = False
+        try:
+            for client in clients:
+                added += self.__merge(client._name, client._email, client.get_phones(),
+                                      [address.parts() for address in client.get_addresses()])
+        finally:
+            self.__sort_names()
+        return added
+
+    def import_csv(self, path: str, strict: bool = False) -> int:
+        """This method allows to add the clients of a CSV file.
+
+        The file is read row by row, so its size is not limited by the
+        memory. The columns are the ones of CSV_FIELDS; the country may
+        be missing. A row whose email is already in the directory adds
+        its phone and address to that client, so a client with several
+        phones or addresses has a row for each one.
+
+        Args:
+            path (str): The path of the CSV file, with a header row.
+            strict (bool): Whether to raise an error for a malformed row
+                instead of skipping it.
+
+        Returns:
+            An integer with the number of clients added.
+
+        Raises:
+            ValueError: If strict and a row is malformed.
+        """
+        added = 0
+        self.__sorted = False  # the names are sorted once at the end
+        try:
+            with open(path, encoding="utf-8", newline="") as file:
+                reader = csv.DictReader(file)
+                for row in reader:
+                    try:
+                        name, email, phone, street, city = (row[field].strip() for field in
+                                                            ("name", "email", "phone", "street", "city"))
+                        zip_code = int(row["zip_code"])
+                        country = (row.get("country") or "").strip() or "Colombia"
+                        if not (name and email and phone and street and city):
+                            raise ValueError("a field is empty")
+                        added += self.__merge(name, email, [phone], [(street, zip_code, city, country)])
+                    except (KeyError, AttributeError, ValueError) as error:
+                        if strict:
+                            raise ValueError(f"The client of line {reader.line_num} is malformed: {error}") from None
+        finally:
+            self.__sort_names()
+        return added
+
+    def __append(self, name: str, email: str, phones, addresses) -> int:
+        """This method stores a record and indexes its email, phones and name.
+
+        Returns:
+            An integer with the position of the record.
+        """
+        record = encode(name, email, phones, addresses)
+        position = len(self.__records)
+        self.__records.append(record)
+        self.__by_email[email] = position
+        for phone in phones:
+            self.__index_phone(phone, position)
+        self.__size += 1
+        normalized = normalize(name)
+        for offset in self.__word_offsets(normalized):
+            if self.__sorted:
+                self.__names.insert(self.__bisect(normalized[offset:]), position << 8 | offset)
+            else:
+                self.__names.append(position << 8 | offset)
+        return position
+
+    def __merge(self, name: str, email: str, phones, addresses) -> bool:
+        """This method stores a new client or adds the phones and addresses of a known one.
+
+        Returns:
+            True if the client was added.
+        """
+        if email not in self.__by_email:
+            self.__append(name, email, phones, addresses)
+            return True
+        for phone in phones:
+            self.add_phone(email, phone)
+        for address in addresses:
+            self.add_address(email, *address)
+        return False
+
+    @staticmethod
+    def __word_offsets(normalized: str) -> list[int]:
+        """This method returns where the words of a normalized name start.
+
+        Args:
+            normalized (str): The normalized name.
+
+        Returns:
+            A list with the offsets, up to MAX_WORD_OFFSET.
+        """
+        offsets = [0] + [match.start() + 1 for match in re.finditer(" ", normalized)]
+        return [offset for offset in offsets if offset <= MAX_WORD_OFFSET]
+
+    def __name_key(self, reference: int) -> str:
+        """This method returns the normalized name from a word of a name reference.
+
+        Args:
+            reference (int): The position of the record and the offset of the word.
+
+        Returns:
+            A string with the name from the word on.
+        """
+        name = self.__records[reference >> 8].split(FIELD, 1)[0]
+        return normalize(name)[reference & 0xFF:]
+
+    def __bisect(self, key: str) -> int:
+        """This method finds where a key goes in the sorted names.
+
+        Args:
+            key (str): The normalized name or word.
+
+        Returns:
+            An integer with the first index whose name is not lower than the key.
+        """
+        low, high = 0, len(self.__names)
+        while low < high:
+            middle = (low + high) // 2
+            if self.__name_key(self.__names[middle]) < key:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def __sort_names(self):
+        """This method sorts the names if records were added without sorting them.
+
+        The references of a record are next to each other before the
+        sort, so every name is normalized once.
+        """
+        if self.__sorted:
+            return
+        last = [-1, ""]
+
+        def key(reference: int) -> str:
+            position = reference >> 8
+            if position != last[0]:
+                last[0] = position
+                last[1] = normalize(self.__records[position].split(FIELD, 1)[0])
+            return last[1][reference & 0xFF:]
+
+        self.__names = array("q", sorted(self.__names, key=key))
+        self.__sorted = True
+
+    def __index_phone(self, phone: str, position: int):
+        """This method adds a phone of a record to the phone index.
+
+        Args:
+            phone (str): The phone.
+            position (int): The position of the record.
+        """
+        current = self.__by_phone.get(phone)
+        if current is None:
+            self.__by_phone[phone] = position
+        elif current != position and not (isinstance(current, tuple) and position in current):
+            self.__by_phone[phone] = (current if isinstance(current, tuple) else (current,)) + (position,)
+
+    def __positions(self, phone: str) -> tuple:
+        """This method returns the positions of the records with a phone.
+
+        Args:
+            phone (str): The phone.
+
+        Returns:
+            A tuple with the positions.
+        """
+        current = self.__by_phone.get(phone)
+        if current is None:
+            return ()
+        return current if isinstance(current, tuple) else (current,)
+
+    def __position(self, email: str) -> int:
+        """This method returns the position of the record of an email.
+
+        Raises:
+            ValueError: If the client is not in the directory.
+        """
+        position = self.__by_email.get(email)
+        if position is None:
+            raise ValueError(f"The client with email {email} is not in the directory.")
+        return position
+
+    @staticmethod
+    def __client(record: str) -> Client:
+        """This method creates the client of a record.
+
+        Args:
+            record (str): The record of the client.
+
+        Returns:
+            The client.
+        """
+        name, email, phones, addresses = decode(record)
+        client = Client(name, email, phones[0], Address(*addresses[0]))
+        for phone in phones[1:]:
+            client.add_phone(phone)
+        for address in addresses[1:]:
+            client.add_address(*address)
+        return client
@@ -0,0 +1,536 @@
+"""
+This module has a class to define a videogame catalog stored by columns.
+
+Author: Cristian Andres Gamez Nuñez <cagamezn@udistrital.edu.co>
+
+This file is part of Workshop-SM-UD.
+
+Workshop-SM-UD is free software: you can redistribute it and/or
+modify it under the terms of the GNU General Public License as
+published by the Free Software Foundation, either version 3 of
+the License, or (at your option) any later version.
+
+Workshop-SM-UD is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with Workshop-SM-UD. If not, see <https://www.gnu.org/licenses/>.
+"""
+import sys
+from array import array
+from videogames import VideoGame
+from nameindex import NameIndex
+
+
+class StringDictionary:
+    """This class represents a dictionary encoding of repeated strings.
+
+    Every different string is interned and stored once, and the columns
+    only keep its integer identifier.
+    """
+
+    def __init__(self):
+        self.__values = []
+        self.__ids = {}
+
+    def __len__(self) -> int:
+        return len(self.__values)
+
+    def encode(self, value: str) -> int:
+        """This method returns the identifier of a string, adding it if needed.
+
+        Args:
+            value (str): The string to encode.
+
+        Returns:
+            An integer with the identifier of the string.
+        """
+        identifier = self.__ids.get(value)
+        if identifier is None:
+            identifier = len(self.__values)
+            value = sys.intern(value)
+            self.__values.append(value)
+            self.__ids[value] = identifier
+        return identifier
+
+    def lookup(self, value: str) -> int:
+        """This method returns the identifier of a string without adding it.
+
+        Args:
+            value (str): The string to look up.
+
+        Returns:
+            An integer with the identifier or -1 if the string is unknown.
+        """
+        return self.__ids.get(value, -1)
+
+    def decode(self, identifier: int) -> str:
+        """This method returns the string of an identifier.
+
+        Args:
+            identifier (int): The identifier of the string.
+
+        Returns:
+            The encoded string.
+        """
+        return self.__values[identifier]
+
+
+class StringColumn:
+    """This class represents a column of strings stored in a single buffer.
+
+    The strings are encoded in UTF-8 one after the other, and the column
+    only keeps where each one starts and its length, so no str object is
+    kept per row. Strings of removed rows are not reclaimed from the buffer.
+    """
+
+    def __init__(self):
+        self.__buffer = bytearray()
+        self.__starts = array("Q")
+        self.__lengths = array("I")
+
+    def __len__(self) -> int:
+        return len(self.__starts)
+
+    def __getitem__(self, row: int) -> str:
+        start = self.__starts[row]
+        return self.__buffer[start:start + self.__lengths[row]].decode("utf-8")
+
+    def append(self, value: str):
+        """This method appends a string at the end of the column.
+
+        Args:
+            value (str): The string to append.
+        """
+        encoded = value.encode("utf-8")
+        self.__starts.append(len(self.__buffer))
+        self.__lengths.append(len(encoded))
+        self.__buffer += encoded
+
+    def move(self, source: int, target: int):
+        """This method makes a row point to the string of another row.
+
+        Args:
+            source (int): The row whose string is copied.
+            target (int): The row that is overwritten.
+        """
+        self.__starts[target] = self.__starts[source]
+        self.__lengths[target] = self.__lengths[source]
+
+    def pop(self):
+        """This method removes the last row of the column."""
+        self.__starts.pop()
+        self.__lengths.pop()
+
+
+class CodeIndex:
+    """This class represents a hash index from videogame codes to rows.
+
+    It is an open addressing table with linear probing that only stores
+    row numbers in a typed array; the codes are read from the codes
+    column, so each videogame costs a few bytes instead of a dict entry.
+    """
+
+    EMPTY = -1
+
+    def __init__(self, codes: array):
+        self.__codes = codes
+        self.__slots = array("q", [CodeIndex.EMPTY]) * 8
+        self.__size = 0
+
+    def __len__(self) -> int:
+        return self.__size
+
+    def get(self, code: int) -> int:
+        """This method returns the row of a code.
+
+        Args:
+            code (int): The code of the videogame.
+
+        Returns:
+            An integer with the row or None if the code is not indexed.
+        """
+        row = self.__slots[self.__find(code)]
+        return None if row == CodeIndex.EMPTY else row
+
+    def set(self, code: int, row: int):
+        """This method adds a code or changes the row of an indexed code.
+
+        The codes column must already hold the code at the given row.
+
+        Args:
+            code (int): The code of the videogame.
+            row (int): The row of the videogame.
+        """
+        slot = self.__find(code)
+        if self.__slots[slot] == CodeIndex.EMPTY:
+            if (self.__size + 1) * 2 > len(self.__slots):
+                self.__grow()
+                slot = self.__find(code)
+            self.__size += 1
+        self.__slots[slot] = row
+
+    def remove(self, code: int):
+        """This method removes a code from the index.
+
+        The following entries of the probing run are shifted back so
+        the lookups of the other codes keep working without tombstones.
+
+        Args:
+            code (int): The code of the videogame.
+        """
+        slots = self.__slots
+        mask = len(slots) - 1
+        hole = self.__find(code)
+        if slots[hole] == CodeIndex.EMPTY:
+            return
+        slots[hole] = CodeIndex.EMPTY
+        self.__size -= 1
+        slot = hole
+        while True:
+            slot = (slot + 1) & mask
+            row = slots[slot]
+            if row == CodeIndex.EMPTY:
+                return
+            home = hash(self.__codes[row]) & mask
+            if (slot > hole and (home <= hole or home > slot)) or \
+                    (slot < hole and home <= hole and home > slot):
+                slots[hole] = row
+                slots[slot] = CodeIndex.EMPTY
+                hole = slot
+
+    def __find(self, code: int) -> int:
+        """This method finds the slot of a code or the empty slot for it.
+
+        Args:
+            code (int): The code of the videogame.
+
+        Returns:
+            An integer with the slot.
+        """
+        slots = self.__slots
+        codes = self.__codes
+        mask = len(slots) - 1
+        slot = hash(code) & mask
+        while True:
+            row = slots[slot]
+            if row == CodeIndex.EMPTY or codes[row] == code:
+                return slot
+            slot = (slot + 1) & mask
+
+    def __grow(self):
+        """This method doubles the number of slots and reinserts the rows."""
+        rows = [row for row in self.__slots if row != CodeIndex.EMPTY]
+        self.__slots = array("q", [CodeIndex.EMPTY]) * (len(self.__slots) * 2)
+        mask = len(self.__slots) - 1
+        for row in rows:
+            slot = hash(self.__codes[row]) & mask
+            while self.__slots[slot] != CodeIndex.EMPTY:
+                slot = (slot + 1) & mask
+            self.__slots[slot] = row
+
+
+class ColumnarVideoGamesCatalog:
+    """
+    This class represents a catalog of games stored by columns.
+
+    Codes, prices and years are kept in typed arrays and the categorical
+    fields (category, definition, creators and description) are dictionary
+    encoded. Names are stored in a single buffer, so a catalog with
+    millions of videogames does not keep millions of VideoGame objects
+    alive. VideoGame objects are only created when a videogame is
+    returned; they are copies and changing them does not change the
+    catalog.
+
+    Listeners registered with add_listener are called with the code of
+    a videogame every time it is added or removed.
+    """
+
+    def __init__(self, videogames: list[VideoGame] = None):
+        self.__codes = array("q")
+        self.__prices = array("d")
+        self.__years = array("i")
+        self.__categories = array("I")
+        self.__definitions = array("I")
+        self.__storytelling_creators = array("I")
+        self.__graphics_creators = array("I")
+        self.__descriptions = array("I")
+        self.__names = StringColumn()
+        self.__rows = CodeIndex(self.__codes)
+        self.__categories_dictionary = StringDictionary()
+        self.__definitions_dictionary = StringDictionary()
+        self.__creators_dictionary = StringDictionary()
+        self.__descriptions_dictionary = StringDictionary()
+        self.__name_index = None  # built on the first search by name
+        self.__listeners = []
+        if videogames:
+            self.add_videogames(videogames)
+
+    def __len__(self) -> int:
+        return len(self.__codes)
+
+    def add_listener(self, listener):
+        """This method registers a function called when a videogame changes.
+
+        Args:
+            listener: A function that receives the code of the videogame.
+        """
+        self.__listeners.append(listener)
+
+    @property
+    def videogames(self) -> list[VideoGame]:
+        """This property returns the videogames of the catalog.
+
+        Returns:
+            A list with a VideoGame created for every row.
+        """
+        return [self.__view(row) for row in range(len(self.__codes))]
+
+    def add_videogame(self, videogame: VideoGame):
+        """
+        This method allows to add a videogame to the catalog.
+
+        Args:
+            videogame (VideoGame): The videogame to add.
+
+        Raises:
+            ValueError: If a videogame with the same code is already in the catalog.
+        """
+        code = videogame.get_code()
+        if self.__rows.get(code) is not None:
+            raise ValueError(f"A videogame with code {code} is already in the catalog.")
+        self.__append(videogame)
+
+    def add_videogames(self, videogames: list[VideoGame]):
+        """
+        This method allows to add several videogames to the catalog at once.
+
+        Args:
+            videogames (list[VideoGame]): The videogames to add.
+
+        Raises:
+            ValueError: If a code is repeated or already in the catalog.
+                In that case no videogame is added.
+        """
+        codes = set()
+        for videogame in videogames:
+            code = videogame.get_code()
+            if self.__rows.get(code) is not None or code in codes:
+                raise ValueError(f"A videogame with code {code} is already in the catalog.")
+            codes.add(code)
+        for videogame in videogames:
+            self.__append(videogame)
+
+    def remove_videogame(self, code: int) -> VideoGame:
+        """
+        This method allows to remove a videogame from the catalog.
+
+        The last row is moved to the place of the removed one, so the
+        removal takes constant time but does not keep the order.
+
+        Args:
+            code (int): The code of the VideoGame.
+
+        Returns:
+            The removed videogame or None if the code is not in the catalog.
+        """
+        row = self.__rows.get(code)
+        if row is None:
+            return None
+        if self.__name_index is not None:
+            self.__name_index.remove(code)
+        videogame = self.__view(row)
+        self.__rows.remove(code)
+        last = len(self.__codes) - 1
+        if row != last:
+            self.__rows.set(self.__codes[last], row)
+            for column in self.__columns():
+                column[row] = column[last]
+            self.__names.move(last, row)
+        for column in self.__columns():
+            column.pop()
+        self.__names.pop()
+        for listener in self.__listeners:
+            listener(code)
+        return videogame
+
+    def search_by_code(self, code: int) -> VideoGame:
+        """
+        This method allows to search a videogame by code.
+
+        Args:
+            code (int): The code of the VideoGame.
+        """
+        row = self.__rows.get(code)
+        return None if row is None else self.__view(row)
+
+    def search_by_name(self, name: str, limit: int = 5) -> list[VideoGame]:
+        """
+        This method allows to search videogames by name.
+
+        The name index is only built the first time this method is
+        called, so catalogs that never search by name do not pay for it.
+
+        Args:
+            name (str): The name of the VideoGame.
+            limit (int): The maximum number of videogames to return.
+
+        Returns:
+            A list with the videogames ranked by similarity.
+        """
+        if self.__name_index is None:
+            self.__name_index = NameIndex()
+            self.__name_index.add_many((self.__codes[row], self.__names[row], self.__codes[row])
+                                       for row in range(len(self.__codes)))
+        return [self.__view(self.__rows.get(code)) for code in self.__name_index.search(name, limit)]
+
+    def search_by_category(self, category: str) -> list[VideoGame]:
+        """
+        This method allows to search a videogame by category.
+
+        Args:
+            category (str): The category of the VideoGame.
+        """
+        return self.search(category=category)
+
+    def search(self, category: str = None, definition: str = None, creator: str = None,
+               min_price: float = None, max_price: float = None,
+               min_year: int = None, max_year: int = None) -> list[VideoGame]:
+        """
+        This method allows to search videogames matching all the given filters.
+
+        Each filter compares the cells of a single column with the value
+        of the filter directly, without calling a function per cell, and
+        the following filters only check the rows that passed the
+        previous ones. Ranges are inclusive.
+
+        Args:
+            category (str): The category of the VideoGame.
+            definition (str): The definition of the VideoGame (HD or Standard).
+            creator (str): The storytelling or graphics creator of the VideoGame.
+            min_price (float): The minimum price of the VideoGame.
+            max_price (float): The maximum price of the VideoGame.
+            min_year (int): The minimum year of the VideoGame.
+            max_year (int): The maximum year of the VideoGame.
+
+        Returns:
+            A list with the matching videogames ordered by code.
+        """
+        rows = None
+        for column, dictionary, value in ((self.__categories, self.__categories_dictionary, category),
+                                          (self.__definitions, self.__definitions_dictionary, definition)):
+            if value is not None:
+                rows = self.__equal(rows, column, dictionary.lookup(value))
+        if creator is not None:
+            identifier = self.__creators_dictionary.lookup(creator)
+            storytelling = self.__storytelling_creators
+            graphics = self.__graphics_creators
+            candidates = range(len(self.__codes)) if rows is None else rows
+            rows = [row for row in candidates
+                    if storytelling[row] == identifier or graphics[row] == identifier]
+        for column, low, high in ((self.__prices, min_price, max_price),
+                                  (self.__years, min_year, max_year)):
+            if low is not None or high is not None:
+                rows = self.__between(rows, column,
+                                      float("-inf") if low is None else low,
+                                      float("inf") if high is None else high)
+        if rows is None:
+            rows = range(len(self.__codes))
+
+        codes = self.__codes
+        return [self.__view(row) for row in sorted(rows, key=codes.__getitem__)]
+
+    def show_games(self):
+        """
+        This method allows to show the games.
+        """
+        categories = self.__categories_dictionary
+        for row in range(len(self.__codes)):
+            print(f"code: {self.__codes[row]}, Name: {self.__names[row]}, "
+                  f"Category: {categories.decode(self.__categories[row])}, Price: {self.__prices[row]}")
+
+    @staticmethod
+    def __equal(rows, column, value) -> list[int]:
+        """This method keeps the rows whose cell in a column is equal to a value.
+
+        Args:
+            rows: The rows to check or None to check the whole column.
+            column: The column with the cells.
+            value: The value the cells must be equal to.
+
+        Returns:
+            A list with the matching rows.
+        """
+        if rows is None:
+            return [row for row, cell in enumerate(column) if cell == value]
+        return [row for row in rows if column[row] == value]
+
+    @staticmethod
+    def __between(rows, column, low, high) -> list[int]:
+        """This method keeps the rows whose cell in a column is inside a range.
+
+        Args:
+            rows: The rows to check or None to check the whole column.
+            column: The column with the cells.
+            low: The inclusive lower bound.
+            high: The inclusive upper bound.
+
+        Returns:
+            A list with the matching rows.
+        """
+        if rows is None:
+            return [row for row, cell in enumerate(column) if low <= cell <= high]
+        return [row for row in rows if low <= column[row] <= high]
+
+    def __append(self, videogame: VideoGame):
+        """This method appends a videogame as a new row.
+
+        Args:
+            videogame (VideoGame): The videogame to append.
+        """
+        code = videogame.get_code()
+        self.__codes.append(code)
+        self.__rows.set(code, len(self.__codes) - 1)
+        self.__prices.append(videogame.price)
+        self.__years.append(videogame.year)
+        self.__categories.append(self.__categories_dictionary.encode(videogame.category))
+        self.__definitions.append(self.__definitions_dictionary.encode(videogame.definition))
+        self.__storytelling_creators.append(self.__creators_dictionary.encode(videogame.storytelling_creator))
+        self.__graphics_creators.append(self.__creators_dictionary.encode(videogame.graphics_creator))
+        self.__names.append(videogame.name)
+        self.__descriptions.append(self.__descriptions_dictionary.encode(videogame.description))
+        if self.__name_index is not None:
+            self.__name_index.add(code, videogame.name, code)
+        for listener in self.__listeners:
+            listener(code)
+
+    def __columns(self) -> tuple:
+        """This method returns the typed array columns of the catalog.
+
+        Returns:
+            A tuple with the columns.
+        """
+        return (self.__codes, self.__prices, self.__years, self.__categories,
+                self.__definitions, self.__storytelling_creators,
+                self.__graphics_creators, self.__descriptions)
+
+    def __view(self, row: int) -> VideoGame:
+        """This method creates a VideoGame from a row.
+
+        Args:
+            row (int): The row of the videogame.
+
+        Returns:
+            A new VideoGame with the values of the row.
+        """
+        creators = self.__creators_dictionary
+        return VideoGame(self.__codes[row], self.__names[row],
+                         self.__descriptions_dictionary.decode(self.__descriptions[row]),
+                         self.__prices[row],
+                         self.__categories_dictionary.decode(self.__categories[row]),
+                         self.__definitions_dictionary.decode(self.__definitions[row]),
+                         creators.decode(self.__storytelling_creators[row]),
+                         creators.decode(self.__graphics_creators[row]),
+                         self.__years[row])
@@ -0,0 +1,221 @@
+"""
+This module has classes to simulate the power drawn by a fleet of machines.
+
+Author: Cristian Andres Gamez Nuñez <cagamezn@udistrital.edu.co>
+
+This file is part of Workshop-SM-UD.
+
+Workshop-SM-UD is free software: you can redistribute it and/or
+modify it under the terms of the GNU General Public License as
+published by the Free Software Foundation, either version 3 of
+the License, or (at your option) any later version.
+
+Workshop-SM-UD is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with Workshop-SM-UD. If not, see <https://www.gnu.org/licenses/>.
+"""
+from array import array
+
+MINUTES_PER_DAY = 24 * 60
+DAYS = ("Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday")
+
+
+class UsageProfile:
+    """This class represents how much a machine is used along a week.
+
+    The usage is the fraction of its energy consumption a machine draws
+    at every minute of the day, multiplied by a factor for every day of
+    the week.
+    """
+
+    def __init__(self, name: str, daily: list[float], weekly: list[float] = None):
+        if len(daily) != MINUTES_PER_DAY:
+            raise ValueError(f"The daily usage needs {MINUTES_PER_DAY} values.")
+        weekly = weekly if weekly is not None else [1.0] * 7
+        if len(weekly) != 7:
+            raise ValueError("The weekly usage needs 7 values.")
+        if min(daily) < 0 or min(weekly) < 0:
+            raise ValueError("The usage can not be negative.")
+        self.name = name
+        self.daily = array("d", daily)
+        self.weekly = tuple(weekly)
+
+    @classmethod
+    def from_hours(cls, name: str, hours: dict, weekly: list[float] = None) -> "UsageProfile":
+        """This method allows to create a profile from the usage of every hour.
+
+        Args:
+            name (str): The name of the profile.
+            hours (dict): The usage of the hours of the day (0 to 23);
+                the missing hours are not used.
+            weekly (list[float]): The factor of every day from Monday.
+
+        Returns:
+            The usage profile.
+        """
+        daily = []
+        for hour in range(24):
+            daily.extend([hours.get(hour, 0.0)] * 60)
+        return cls(name, daily, weekly)
+
+    def __str__(self) -> str:
+        return f"UsageProfile(name={self.name}, weekly={self.weekly})"
+
+
+class LoadResult:
+    """This class represents the power drawn by a fleet along the simulated time."""
+
+    def __init__(self, power: array, step: int, start_weekday: int):
+        self.power = power  # watts at every step
+        self.step = step  # minutes per step
+        self.start_weekday = start_weekday
+
+    def peak(self) -> tuple:
+        """This method returns the peak load of the simulation.
+
+        Returns:
+            A tuple with the power in watts and the step where it happens.
+        """
+        power = max(self.power)
+        return power, self.power.index(power)
+
+    def time_of(self, step: int) -> str:
+        """This method returns the day and hour of a step.
+
+        Args:
+            step (int): The index of the step.
+
+        Returns:
+            A string with the day number, the day of the week and the hour.
+        """
+        day, minute = divmod(step * self.step, MINUTES_PER_DAY)
+        weekday = DAYS[(day + self.start_weekday) % 7]
+        return f"day {day + 1} ({weekday}) {minute // 60:02d}:{minute % 60:02d}"
+
+    def average(self) -> float:
+        """This method returns the average power of the simulation in watts."""
+        return sum(self.power) / len(self.power)
+
+    def energy(self) -> float:
+        """This method returns the energy drawn along the simulation in kWh."""
+        return sum(self.power) * self.step / 60 / 1000
+
+    def __str__(self) -> str:
+        power, step = self.peak()
+        return (f"Peak load: {power / 1000:.2f} kW at {self.time_of(step)}\n"
+                f"Average load: {self.average() / 1000:.2f} kW\n"
+                f"Energy: {self.energy():.2f} kWh")
+
+
+class EnergySimulation:
+    """This class represents a simulation of the power drawn by a fleet.
+
+    The power of a machine at a time is its energy consumption times its
+    standby fraction plus the rest times the usage of its profile, so
+    the power of the fleet is a sum per profile:
+
+        power(t) = sum over profiles of energy(profile) * load(profile, t)
+
+    The energy consumptions are summed once per profile, the load of
+    every profile is computed once for every day of the week, and the
+    simulated days are copies of the weekdays. The cost depends on the
+    number of profiles and steps, not on the number of machines.
+    """
+
+    def __init__(self, profiles: list[UsageProfile], standby: float = 0.0):
+        if not 0 <= standby <= 1:
+            raise ValueError("The standby fraction must be between 0 and 1.")
+        self.__profiles = {profile.name: profile for profile in profiles}
+        self.__standby = standby
+
+    def group(self, machines, assignment: dict, default: str = None) -> dict:
+        """This method allows to sum the energy consumption of the machines by profile.
+
+        Args:
+            machines: An iterable of machines, like a fleet registry.
+            assignment (dict): The profile name of every machine type name.
+            default (str): The profile of the types not in the assignment.
+
+        Returns:
+            A dictionary with the energy consumption in watts of every profile.
+
+        Raises:
+            ValueError: If a machine has no profile or its profile is not
+                available.
+        """
+        totals = {}
+        for machine in machines:
+            machine_type = type(machine).__name__
+            name = assignment.get(machine_type, default)
+            if name is None:
+                raise ValueError(f"The machine type {machine_type} has no usage profile.")
+            totals[name] = totals.get(name, 0.0) + machine.energy_consumption
+        for name in totals:
+            if name not in self.__profiles:
+                raise ValueError(f"The usage profile {name} is not available.")
+        return totals
+
+    def run(self, machines, assignment: dict, default: str = None, days: int = 365,
+            step: int = 1, start_weekday: int = 0) -> LoadResult:
+        """This method allows to simulate the power drawn by the machines.
+
+        Args:
+            machines: An iterable of machines, like a fleet registry.
+            assignment (dict): The profile name of every machine type name.
+            default (str): The profile of the types not in the assignment.
+            days (int): The number of simulated days.
+            step (int): The minutes of every step, a divisor of a day.
+            start_weekday (int): The day of the week of the first day,
+                from 0 (Monday) to 6 (Sunday).
+
+        Returns:
+            The result with the power of every step.
+
+        Raises:
+            ValueError: If the parameters are not valid or a machine has
+                no profile.
+        """
+        if days < 1:
+            raise ValueError("The simulation needs at least one day.")
+        if step < 1 or MINUTES_PER_DAY % step:
+            raise ValueError(f"The step must be a divisor of {MINUTES_PER_DAY} minutes.")
+        if not 0 <= start_weekday < 7:
+            raise ValueError("The weekday must be between 0 and 6.")
+
+        totals = self.group(machines, assignment, default)
+        steps_per_day = MINUTES_PER_DAY // step
+        weekdays = [array("d", bytes(8 * steps_per_day)) for _ in range(7)]
+        standby = self.__standby
+        for name, energy in totals.items():
+            profile = self.__profiles[name]
+            load = self.__resample(profile.daily, step)
+            for weekday, factor in enumerate(profile.weekly):
+                active = energy * (1 - standby) * factor
+                base = energy * standby
+                day = weekdays[weekday]
+                for index, usage in enumerate(load):
+                    day[index] += base + active * usage
+
+        power = array("d")
+        for day in range(days):
+            power.extend(weekdays[(day + start_weekday) % 7])
+        return LoadResult(power, step, start_weekday)
+
+    @staticmethod
+    def __resample(daily: array, step: int) -> list[float]:
+        """This method averages the usage of a day over steps of some minutes.
+
+        Args:
+            daily (array): The usage of every minute of the day.
+            step (int): The minutes of every step.
+
+        Returns:
+            A list with the usage of every step.
+        """
+        if step == 1:
+            return daily
+        return [sum(daily[start:start + step]) / step for start in range(0, MINUTES_PER_DAY, step)]
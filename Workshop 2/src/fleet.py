@@ -0,0 +1,306 @@
+"""
+This module has a class to keep the registry of the built machines.
+
+Author: Cristian Andres Gamez Nuñez <cagamezn@udistrital.edu.co>
+
+This file is part of Workshop-SM-UD.
+
+Workshop-SM-UD is free software: you can redistribute it and/or
+modify it under the terms of the GNU General Public License as
+published by the Free Software Foundation, either version 3 of
+the License, or (at your option) any later version.
+
+Workshop-SM-UD is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with Workshop-SM-UD. If not, see <https://www.gnu.org/licenses/>.
+"""
+
+
+class FleetRegistry:
+    """This class represents the registry of the machines built by the factories.
+
+    Every machine gets a numeric id when it is registered. The registry
+    keeps inverted indexes from the machine type, the material and the
+    code of every installed videogame to the ids of the machines, so the
+    fleet can be queried without walking it. The videogames and the
+    material of a registered machine must be changed through the
+    registry so the indexes stay up to date; the registry also maps
+    every machine to its id, so the id of a machine returned by a
+    factory is found with id_of.
+    """
+
+    def __init__(self):
+        self.__machines = {}  # id -> machine
+        self.__ids = {}  # identity of the machine -> id
+        self.__next_id = 0
+        self.__by_type = {}  # machine type name -> set of ids
+        self.__by_material = {}  # material -> set of ids
+        self.__by_code = {}  # videogame code -> set of ids
+
+    def __len__(self) -> int:
+        return len(self.__machines)
+
+    def __iter__(self):
+        return iter(self.__machines.values())
+
+    def register(self, machine) -> int:
+        """This method allows to register a machine in the fleet.
+
+        Args:
+            machine (Machine): The machine to register.
+
+        Returns:
+            An integer with the id of the machine in the fleet.
+
+        Raises:
+            ValueError: If the machine is already registered.
+        """
+        if id(machine) in self.__ids:
+            raise ValueError("The machine is already in the fleet.")
+        machine_id = self.__next_id
+        self.__next_id += 1
+        self.__machines[machine_id] = machine
+        self.__ids[id(machine)] = machine_id
+        self.__by_type.setdefault(type(machine).__name__, set()).add(machine_id)
+        self.__by_material.setdefault(machine.material, set()).add(machine_id)
+        for code in machine.get_videogame_codes():
+            self.__by_code.setdefault(code, set()).add(machine_id)
+        return machine_id
+
+    def register_many(self, machines: list) -> range:
+        """This method allows to register many machines at once.
+
+        The ids are consecutive and the machines are grouped by type and
+        material before updating the indexes, so every index is updated
+        once per group instead of once per machine.
+
+        Args:
+            machines (list[Machine]): The machines to register.
+
+        Returns:
+            A range with the ids of the machines, in the same order.
+
+        Raises:
+            ValueError: If a machine is already registered or repeated.
+        """
+        identities = [id(machine) for machine in machines]
+        if len(set(identities)) != len(identities) or any(identity in self.__ids for identity in identities):
+            raise ValueError("The machine is already in the fleet.")
+        first_id = self.__next_id
+        ids = range(first_id, first_id + len(machines))
+        self.__next_id += len(machines)
+        self.__machines.update(zip(ids, machines))
+        self.__ids.update(zip(identities, ids))
+
+        by_type = {}
+        by_material = {}
+        by_code = {}
+        for machine_id, machine in zip(ids, machines):
+            by_type.setdefault(type(machine).__name__, []).append(machine_id)
+            by_material.setdefault(machine.material, []).append(machine_id)
+            for code in machine.get_videogame_codes():
+                by_code.setdefault(code, []).append(machine_id)
+        for groups, index in ((by_type, self.__by_type), (by_material, self.__by_material),
+                              (by_code, self.__by_code)):
+            for key, group in groups.items():
+                index.setdefault(key, set()).update(group)
+        return ids
+
+    def unregister(self, machine_id: int):
+        """This method allows to remove a machine from the fleet.
+
+        Args:
+            machine_id (int): The id of the machine.
+
+        Returns:
+            The removed machine or None if it was not registered.
+        """
+        machine = self.__machines.pop(machine_id, None)
+        if machine is None:
+            print(f"Machine with id {machine_id} is not in the fleet.")
+            return None
+        del self.__ids[id(machine)]
+        self.__discard(self.__by_type, type(machine).__name__, machine_id)
+        self.__discard(self.__by_material, machine.material, machine_id)
+        for code in machine.get_videogame_codes():
+            self.__discard(self.__by_code, code, machine_id)
+        return machine
+
+    def get(self, machine_id: int):
+        """This method allows to get a machine by its id.
+
+        Args:
+            machine_id (int): The id of the machine.
+
+        Returns:
+            The machine or None if it is not registered.
+        """
+        return self.__machines.get(machine_id)
+
+    def id_of(self, machine) -> int:
+        """This method allows to get the id of a registered machine.
+
+        Args:
+            machine (Machine): The machine.
+
+        Returns:
+            An integer with the id of the machine in the fleet.
+
+        Raises:
+            ValueError: If the machine is not registered.
+        """
+        machine_id = self.__ids.get(id(machine))
+        if machine_id is None:
+            raise ValueError("The machine is not in the fleet.")
+        return machine_id
+
+    def add_videogame(self, machine_id: int, videogame):
+        """This method allows to install a videogame in a registered machine.
+
+        Args:
+            machine_id (int): The id of the machine.
+            videogame (VideoGame): The videogame to install.
+
+        Raises:
+            ValueError: If the machine is not registered or already has
+                the videogame.
+        """
+        self.__machine(machine_id).add_videogame(videogame)
+        self.__by_code.setdefault(videogame.get_code(), set()).add(machine_id)
+
+    def remove_videogame(self, machine_id: int, code: int):
+        """This method allows to uninstall a videogame from a registered machine.
+
+        Args:
+            machine_id (int): The id of the machine.
+            code (int): The code of the videogame.
+
+        Returns:
+            The removed videogame or None if the machine did not have it.
+
+        Raises:
+            ValueError: If the machine is not registered.
+        """
+        videogame = self.__machine(machine_id).remove_videogame(code)
+        if videogame is not None:
+            self.__discard(self.__by_code, code, machine_id)
+        return videogame
+
+    def change_material(self, machine_id: int, material: str):
+        """This method allows to change the material of a registered machine.
+
+        Args:
+            machine_id (int): The id of the machine.
+            material (str): The new material of the machine.
+
+        Raises:
+            ValueError: If the machine is not registered.
+        """
+        machine = self.__machine(machine_id)
+        self.__discard(self.__by_material, machine.material, machine_id)
+        machine.material = material
+        self.__by_material.setdefault(machine.material, set()).add(machine_id)
+
+    def by_type(self, machine_type) -> list:
+        """This method allows to get the machines of a type.
+
+        Args:
+            machine_type: The machine class or its name.
+
+        Returns:
+            A list with the machines of the type.
+        """
+        if not isinstance(machine_type, str):
+            machine_type = machine_type.__name__
+        return self.__resolve(self.__by_type.get(machine_type, ()))
+
+    def by_material(self, material: str) -> list:
+        """This method allows to get the machines of a material.
+
+        Args:
+            material (str): The material of the machines.
+
+        Returns:
+            A list with the machines of the material.
+        """
+        return self.__resolve(self.__by_material.get(material, ()))
+
+    def with_videogame(self, code: int) -> list:
+        """This method allows to get the machines that have a videogame installed.
+
+        Args:
+            code (int): The code of the videogame.
+
+        Returns:
+            A list with the machines that have the videogame.
+        """
+        return self.__resolve(self.__by_code.get(code, ()))
+
+    def find(self, machine_type=None, material: str = None, code: int = None) -> list:
+        """This method allows to get the machines that match all the given filters.
+
+        The smallest index is walked and the others are only checked, so
+        the cost depends on the most selective filter.
+
+        Args:
+            machine_type: The machine class or its name.
+            material (str): The material of the machines.
+            code (int): The code of a videogame installed in the machines.
+
+        Returns:
+            A list with the machines that match, ordered by id.
+        """
+        if machine_type is not None and not isinstance(machine_type, str):
+            machine_type = machine_type.__name__
+        filters = [index.get(key, set())
+                   for index, key in ((self.__by_type, machine_type),
+                                      (self.__by_material, material),
+                                      (self.__by_code, code))
+                   if key is not None]
+        if not filters:
+            return list(self.__machines.values())
+        filters.sort(key=len)
+        ids = [machine_id for machine_id in filters[0]
+               if all(machine_id in other for other in filters[1:])]
+        return self.__resolve(ids)
+
+    def __machine(self, machine_id: int):
+        """This method returns a registered machine.
+
+        Args:
+            machine_id (int): The id of the machine.
+
+        Raises:
+            ValueError: If the machine is not registered.
+        """
+        machine = self.__machines.get(machine_id)
+        if machine is None:
+            raise ValueError(f"Machine with id {machine_id} is not in the fleet.")
+        return machine
+
+    def __resolve(self, ids) -> list:
+        """This method returns the machines of some ids, ordered by id.
+
+        Args:
+            ids: The ids of the machines.
+        """
+        return [self.__machines[machine_id] for machine_id in sorted(ids)]
+
+    @staticmethod
+    def __discard(index: dict, key, machine_id: int):
+        """This method removes an id from an inverted index.
+
+        Args:
+            index (dict): The inverted index.
+            key: The key the id is indexed by.
+            machine_id (int): The id of the machine.
+        """
+        ids = index.get(key)
+        if ids is not None:
+            ids.discard(machine_id)
+            if not ids:
+                del index[key]
@@ -0,0 +1,406 @@
+"""
+This module has classes to place machines in floor areas or trucks.
+
+Author: Cristian Andres Gamez Nuñez <cagamezn@udistrital.edu.co>
+
+This file is part of Workshop-SM-UD.
+
+Workshop-SM-UD is free software: you can redistribute it and/or
+modify it under the terms of the GNU General Public License as
+published by the Free Software Foundation, either version 3 of
+the License, or (at your option) any later version.
+
+Workshop-SM-UD is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with Workshop-SM-UD. If not, see <https://www.gnu.org/licenses/>.
+"""
+from typing import NamedTuple
+
+
+class Area(NamedTuple):
+    """This class represents a floor area or the floor of a truck.
+
+    The sizes are in cm like the dimensions of the machines and the
+    weight limit in kg; a height or weight of None means no limit.
+    """
+    name: str
+    width: float
+    depth: float
+    height: float = None
+    max_weight: float = None
+
+
+class Placement(NamedTuple):
+    """This class represents where a machine is placed.
+
+    The position is the corner of the footprint of the machine, with its
+    clearance, closest to the origin of the area.
+    """
+    machine: object
+    area: str
+    x: float
+    y: float
+    width: float
+    depth: float
+    rotated: bool
+
+
+class PackingResult:
+    """This class represents the result of placing some machines.
+
+    optimal tells if the exact search finished, so no other placement
+    places more machines or uses fewer areas.
+    """
+
+    def __init__(self, areas: list[Area], placements: list[Placement], unplaced: list,
+                 optimal: bool = False):
+        self.areas = areas
+        self.placements = placements
+        self.unplaced = unplaced
+        self.optimal = optimal
+
+    def weights(self) -> dict:
+        """This method returns the weight placed in every used area.
+
+        Returns:
+            A dictionary with the weight in kg by area name.
+        """
+        weights = {}
+        for placement in self.placements:
+            weights[placement.area] = weights.get(placement.area, 0) + placement.machine.weight
+        return weights
+
+    def areas_used(self) -> int:
+        """This method returns the number of areas with at least one machine."""
+        return len({placement.area for placement in self.placements})
+
+    def show(self):
+        """This method shows the placements grouped by area."""
+        for area in self.areas:
+            placements = [placement for placement in self.placements if placement.area == area.name]
+            if not placements:
+                continue
+            weight = sum(placement.machine.weight for placement in placements)
+            print(f"{area.name}: {len(placements)} machines, {weight:.2f} kg")
+            for placement in placements:
+                rotated = " (rotated)" if placement.rotated else ""
+                print(f"  {type(placement.machine).__name__} at ({placement.x}, {placement.y}){rotated}")
+        if self.unplaced:
+            print(f"{len(self.unplaced)} machines could not be placed.")
+
+
+class FloorPlanner:
+    """This class represents a planner that places machines in some areas.
+
+    The footprint of a machine is the width and depth of its dimensions
+    plus the clearance around it, and machines may be rotated a quarter
+    turn. The machines stand upright, so their height must fit the
+    height of the area. The weight of the machines of an area can not
+    exceed its limit.
+
+    There are two modes. pack is a first fit decreasing shelf heuristic:
+    the largest machines are placed first, left to right in shelves, in
+    the first area with room and weight left, which scales to thousands
+    of machines. pack_exact searches all the placements at the normal
+    positions (the sums of the sizes of other machines), placing as many
+    machines as possible in as few areas as possible, and is meant for
+    small orders. It starts from the result of the heuristic and gives
+    up after trying EXACT_NODES positions, returning the best result
+    found, so orders of very different machines can not make it run for
+    minutes.
+    """
+
+    EXACT_LIMIT = 10
+    EXACT_NODES = 1000000
+
+    def __init__(self, areas: list[Area], clearance: float = 0):
+        if not areas:
+            raise ValueError("The planner needs at least one area.")
+        if len({area.name for area in areas}) != len(areas):
+            raise ValueError("The names of the areas must be unique.")
+        if clearance < 0:
+            raise ValueError("The clearance can not be negative.")
+        self.__areas = list(areas)
+        self.__clearance = clearance
+
+    def footprint(self, machine) -> tuple:
+        """This method returns the footprint of a machine with its clearance.
+
+        Args:
+            machine (Machine): The machine.
+
+        Returns:
+            A tuple with the width, depth and height of the machine.
+        """
+        width, depth, height = machine.dimensions
+        return width + self.__clearance, depth + self.__clearance, height
+
+    def pack(self, machines: list) -> PackingResult:
+        """This method allows to place the machines with the shelf heuristic.
+
+        Args:
+            machines (list[Machine]): The machines to place.
+
+        Returns:
+            The result with the placements and the machines that did not fit.
+        """
+        areas = self.__areas
+        shelves = [[] for _ in areas]  # [y, depth, used width] of every shelf
+        next_y = [0] * len(areas)
+        weights = [0] * len(areas)
+        placements = []
+        unplaced = []
+
+        order = sorted(machines, key=lambda machine: self.__area_of(machine), reverse=True)
+        for machine in order:
+            width, depth, height = self.footprint(machine)
+            weight = machine.weight
+            placement = None
+            for index, area in enumerate(areas):
+                if not self.__fits(area, height, weights[index] + weight):
+                    continue
+                placement = self.__place_in_shelves(machine, area, shelves[index], width, depth)
+                if placement is None:
+                    placement = self.__open_shelf(machine, area, shelves[index], next_y, index, width, depth)
+                if placement is not None:
+                    weights[index] += weight
+                    break
+            if placement is None:
+                unplaced.append(machine)
+            else:
+                placements.append(placement)
+        return PackingResult(areas, placements, unplaced)
+
+    def pack_exact(self, machines: list, max_nodes: int = None) -> PackingResult:
+        """This method allows to place the machines with an exhaustive search.
+
+        The search starts from the result of the shelf heuristic and only
+        looks for better ones. If it tries more than max_nodes positions
+        it stops, and the best result found so far is returned.
+
+        Args:
+            machines (list[Machine]): The machines to place, at most
+                EXACT_LIMIT.
+            max_nodes (int): The most positions the search tries,
+                EXACT_NODES if None.
+
+        Returns:
+            The result that places the most machines, using the fewest
+            areas among those, marked as optimal if the search finished.
+
+        Raises:
+            ValueError: If there are too many machines for the exact mode.
+        """
+        if len(machines) > self.EXACT_LIMIT:
+            raise ValueError(f"The exact mode places at most {self.EXACT_LIMIT} machines.")
+        areas = self.__areas
+        order = sorted(machines, key=lambda machine: (self.__area_of(machine), self.footprint(machine),
+                                                      machine.weight), reverse=True)
+        sizes = [self.footprint(machine) for machine in order]
+        kinds = [(size, machine.weight) for size, machine in zip(sizes, order)]
+        patterns = [(self.__normal_patterns(sizes, area.width), self.__normal_patterns(sizes, area.depth))
+                    for area in areas]
+        placed = [[] for _ in areas]  # (x, y, width, depth) of every machine of an area
+        weights = [0] * len(areas)
+        free = [area.width * area.depth for area in areas]  # floor left in every area
+        current = []
+        heuristic = self.pack(machines)
+        best = {"score": (len(heuristic.placements), -heuristic.areas_used()),
+                "placements": heuristic.placements, "nodes": 0}
+        max_nodes = self.EXACT_NODES if max_nodes is None else max_nodes
+
+        def score() -> tuple:
+            return len(current), -sum(1 for rectangles in placed if rectangles)
+
+        def bound(position: int) -> tuple:
+            # the most machines that fit in the floor left, taking the
+            # smallest ones, which are at the end of the order
+            count, need, room = 0, 0, sum(free)
+            for width, depth, _ in reversed(sizes[position:]):
+                if need + width * depth > room:
+                    break
+                need += width * depth
+                count += 1
+            # the fewest areas whose floor left holds those machines
+            used = [index for index, rectangles in enumerate(placed) if rectangles]
+            room = sum(free[index] for index in used)
+            empty = sorted((free[index] for index, rectangles in enumerate(placed) if not rectangles),
+                           reverse=True)
+            areas_used = len(used)
+            for floor in empty:
+                if need <= room:
+                    break
+                room += floor
+                areas_used += 1
+            return len(current) + count, -areas_used
+
+        def search(position: int, after: tuple):
+            best["nodes"] += 1
+            if best["nodes"] > max_nodes:
+                return
+            if position == len(order):
+                if score() > best["score"]:
+                    best["score"] = score()
+                    best["placements"] = list(current)
+                return
+            if bound(position) <= best["score"]:
+                return
+            machine = order[position]
+            width, depth, height = sizes[position]
+            same_next = position + 1 < len(order) and kinds[position + 1] == kinds[position]
+            empty_tried = set()
+            for index, area in enumerate(areas):
+                if not placed[index]:
+                    # the empty areas of the same size are interchangeable
+                    if area[1:] in empty_tried:
+                        continue
+                    empty_tried.add(area[1:])
+                if not self.__fits(area, height, weights[index] + machine.weight):
+                    continue
+                xs, ys = patterns[index]
+                for rotated, (w, d) in enumerate(((width, depth), (depth, width))):
+                    if rotated and w == d:
+                        break
+                    for x in xs:
+                        if x + w > area.width:
+                            break
+                        for y in ys:
+                            if y + d > area.depth:
+                                break
+                            best["nodes"] += 1
+                            if best["nodes"] > max_nodes:
+                                return
+                            # equal machines are placed in increasing positions
+                            slot = (index, x, y, rotated)
+                            if slot < after:
+                                continue
+                            if self.__overlaps(placed[index], x, y, w, d):
+                                continue
+                            placed[index].append((x, y, w, d))
+                            weights[index] += machine.weight
+                            free[index] -= w * d
+                            current.append(Placement(machine, area.name, x, y, w, d, bool(rotated)))
+                            search(position + 1, slot if same_next else ())
+                            current.pop()
+                            free[index] += w * d
+                            weights[index] -= machine.weight
+                            placed[index].pop()
+            # leave the machine out, and the equal ones after it with it
+            following = position + 1
+            while following < len(order) and kinds[following] == kinds[position]:
+                following += 1
+            search(following, ())
+
+        search(0, ())
+        placements = best["placements"]
+        placed_ids = {id(placement.machine) for placement in placements}
+        unplaced = [machine for machine in order if id(machine) not in placed_ids]
+        return PackingResult(areas, placements, unplaced, best["nodes"] <= max_nodes)
+
+    def solve(self, machines: list) -> PackingResult:
+        """This method allows to place the machines with the best mode for their number.
+
+        Args:
+            machines (list[Machine]): The machines to place.
+
+        Returns:
+            The result of the exact search, bounded by EXACT_NODES, for
+            small orders and the heuristic one otherwise.
+        """
+        if len(machines) <= self.EXACT_LIMIT:
+            return self.pack_exact(machines)
+        return self.pack(machines)
+
+    def __area_of(self, machine) -> float:
+        """This method returns the floor area of a machine with its clearance."""
+        width, depth, _ = self.footprint(machine)
+        return width * depth
+
+    @staticmethod
+    def __fits(area: Area, height: float, weight: float) -> bool:
+        """This method checks the height and weight limits of an area.
+
+        Args:
+            area (Area): The area.
+            height (float): The height of the machine.
+            weight (float): The weight of the area with the machine.
+        """
+        return ((area.height is None or height <= area.height)
+                and (area.max_weight is None or weight <= area.max_weight))
+
+    @staticmethod
+    def __place_in_shelves(machine, area: Area, shelves: list, width: float, depth: float):
+        """This method places a machine in the first open shelf with room.
+
+        The orientation that fits the depth of the shelf and leaves the
+        least unused depth is chosen.
+
+        Returns:
+            The placement or None if no shelf has room.
+        """
+        for shelf in shelves:
+            y, shelf_depth, used = shelf
+            options = [(shelf_depth - d, w, d, rotated)
+                       for rotated, (w, d) in enumerate(((width, depth), (depth, width)))
+                       if d <= shelf_depth and used + w <= area.width]
+            if options:
+                _, w, d, rotated = min(options)
+                shelf[2] += w
+                return Placement(machine, area.name, used, y, w, d, bool(rotated))
+        return None
+
+    @staticmethod
+    def __open_shelf(machine, area: Area, shelves: list, next_y: list, index: int,
+                     width: float, depth: float):
+        """This method opens a new shelf for a machine in an area.
+
+        The machine is laid with its longest side along the shelf, so the
+        shelf is as shallow as possible.
+
+        Returns:
+            The placement or None if the area has no room for a new shelf.
+        """
+        options = [(d, w, rotated)
+                   for rotated, (w, d) in enumerate(((width, depth), (depth, width)))
+                   if w <= area.width and next_y[index] + d <= area.depth]
+        if not options:
+            return None
+        d, w, rotated = min(options)
+        y = next_y[index]
+        shelves.append([y, d, w])
+        next_y[index] += d
+        return Placement(machine, area.name, 0, y, w, d, bool(rotated))
+
+    @staticmethod
+    def __normal_patterns(sizes: list[tuple], length: float) -> list[float]:
+        """This method returns the positions that are sums of sizes of the machines.
+
+        Some optimal placement has every machine pushed to the origin
+        until it touches another machine or the border, so only these
+        positions need to be tried.
+
+        Args:
+            sizes (list[tuple]): The width, depth and height of the machines.
+            length (float): The length of the side of the area.
+
+        Returns:
+            A sorted list with the positions.
+        """
+        positions = {0}
+        for width, depth, _ in sizes:
+            positions |= {position + size for position in positions for size in (width, depth)
+                          if position + size <= length}
+        return sorted(positions)
+
+    @staticmethod
+    def __overlaps(rectangles: list, x: float, y: float, width: float, depth: float) -> bool:
+        """This method checks if a rectangle overlaps some others."""
+        for other_x, other_y, other_width, other_depth in rectangles:
+            if (x < other_x + other_width and other_x < x + width
+                    and y < other_y + other_depth and other_y < y + depth):
+                return True
+        return False
@@ -18,151 +18,215 @@ General Public License for more details.
 You should have received a copy of the GNU General Public License 
 along with Workshop-SM-UD. If not, see <https://www.gnu.org/licenses/>. 
 """
-from abc import ABC, abstractmethod
+import sys
+from abc import ABC
+from types import MappingProxyType
+from typing import NamedTuple
 from videogames import VideoGame
+from pricing import default_rules
+from fleet import FleetRegistry
+
+class MachineSpec(NamedTuple):
+    """This class represents the immutable specification of a machine type.
+
+    A single spec is shared by all the machines of a type (flyweight).
+    """
+    dimensions: tuple # cm
+    memory: int # GB
+    processor: str
+
+class SpecField:
+    """This class represents an attribute read from the spec of the machine.
+
+    Assigning the attribute on a machine stores an override for that
+    machine only; the spec shared with the other machines is not changed.
+    """
+    def __set_name__(self, owner, name: str):
+        self.name = name
+
+    def __get__(self, machine, owner=None):
+        if machine is None:
+            return self
+        overrides = machine._overrides
+        if overrides and self.name in overrides:
+            return overrides[self.name]
+        return getattr(machine.SPEC, self.name)
+
+    def __set__(self, machine, value):
+        machine.override(self.name, value)
+
+_slots_by_type = {}  # machine class -> names of its slots
+
+def _slot_names(machine_type: type) -> tuple:
+    """This function returns the names of the slots of a machine type and its parents.
+
+    Args:
+        machine_type (type): The machine class.
+
+    Returns:
+        A tuple with the names of the slots.
+    """
+    names = _slots_by_type.get(machine_type)
+    if names is None:
+        names = tuple(name for cls in reversed(machine_type.__mro__)
+                      for name in cls.__dict__.get("__slots__", ()))
+        _slots_by_type[machine_type] = names
+    return names
 
 class Machine(ABC):
     """
     This class represents the behavior of a machine. 
     This act as an abstract class.
+
+    The machines declare their attributes in __slots__ so they do not
+    carry a per-instance dictionary. The dimensions, memory and processor
+    come from the MachineSpec of the machine type and the base price,
+    weight and energy consumption from the pricing rules, so a machine
+    only keeps its material, its videogames and its overrides.
+
+    The row of the material in the pricing rules is looked up when the
+    material changes, and the price of the videogames is kept as a
+    running total updated when a videogame is added or removed, so
+    calculating the price does not walk the videogames nor change the
+    machine.
+
+    The videogames are kept in a dictionary indexed by code, which keeps
+    the order they were added in, so checking, adding and removing a
+    videogame takes constant time.
     """
+    __slots__ = ("_material", "_row", "_videogames", "_videogames_price", "_overrides")
+
+    SPEC = None
+
+    dimensions = SpecField()
+    memory = SpecField()
+    processor = SpecField()
+
     def __init__(self, material: str, videogames: list[VideoGame]):
+        self._overrides = None
+        self._videogames = {}  # code -> (videogame, price when it was added)
+        self._videogames_price = 0
+        for videogame in videogames:
+            self.add_videogame(videogame)
         self.material = material
-        self.__videogames = videogames
-    
-    @abstractmethod        
-    def remove_videogame(self, code: int):
-        """This method removes a videogame from the machine.
 
-        In this method based on videogame code, if the videogame 
-        exists it will be removed from current machine.
+    @property
+    def material(self) -> str:
+        """This property returns the material of the machine.
 
-        Args:
-            code (int): Code of the videogame to be removed.
+        Returns:
+            A string with the material of the machine.
         """
-        pass
-    
-    @abstractmethod
-    def calculate_price(self):
-        """
-        This method allows to calculate the price an weight of the machine.
+        return self._material
+
+    @material.setter
+    def material(self, material: str):
+        """This setter changes the material and looks up its row in the pricing rules.
+
+        Args:
+            material (str): The material of the machine.
         """
-        pass
-    
-    @abstractmethod        
-    def add_videogame(self, videogame: VideoGame):
+        rules = default_rules()
+        try:
+            self._row = rules.row(type(self).__name__, material)
+        except ValueError: # the error is raised when the price is calculated
+            self._row = None
+            self._material = sys.intern(material)
+        else:
+            self._material = sys.intern(rules.material(material))
+
+    @property
+    def base_price(self) -> float:
+        """This property returns the base price of the machine type.
+
+        Returns:
+            A float with the price without material nor videogames.
         """
-        This method allows to add a game to the arcade machine.
-        
-        Args:
-            videogame (Game): The videogame to add.
+        return default_rules().base(type(self).__name__)[0]
+
+    @property
+    def weight(self) -> float:
+        """This property returns the weight of the machine with its material.
+
+        Returns:
+            A float with the weight in kg.
         """
-        pass
-    
-    @abstractmethod
-    def show_videogames(self):
-        """This method show all videogames in the current machine.
+        if self._overrides and "weight" in self._overrides:
+            return self._overrides["weight"]
+        if self._row is None:
+            return default_rules().base(type(self).__name__)[1]
+        return default_rules().weight(self._row)
 
-        In this method the list of videogames is printed following
-        a format of code and name.
+    @weight.setter
+    def weight(self, weight: float):
+        self.override("weight", weight)
+
+    @property
+    def energy_consumption(self) -> float:
+        """This property returns the energy consumption of the machine with its material.
+
+        Returns:
+            A float with the energy consumption in watts.
         """
-        pass
-    
+        if self._overrides and "energy_consumption" in self._overrides:
+            return self._overrides["energy_consumption"]
+        if self._row is None:
+            return default_rules().base(type(self).__name__)[2]
+        return default_rules().energy(self._row)
 
-class DanceRevolutionMachine(Machine):
-    """
-    This class represents the behavior of a Dance Rebolution machine.
-    """
-    def __init__(self, material: str, videogames: list[VideoGame],):        
-        super().__init__(material, videogames)
-        self.dimensions = (150, 150, 250) # cm
-        self.weight = 80 # kg
-        self.energy_consumption = 1000 # watts
-        self.memory = 64 # GB
-        self.processor = "Intel Core i3"
-        self.base_price = 7000
-        self.dificulties = ['easy', 'medium', 'hard']  
-        self.arrow_cardinalities = ['up', 'down', 'left', 'right']
-        self.control_price = 1000
-        
-    def remove_videogame(self, code: int):
-        """This method removes a videogame from the machine.
+    @energy_consumption.setter
+    def energy_consumption(self, energy_consumption: float):
+        self.override("energy_consumption", energy_consumption)
 
-        In this method based on videogame code, if the videogame 
-        exists it will be removed from current machine.
+    def override(self, name: str, value):
+        """This method overrides an attribute of the spec for this machine only.
 
         Args:
-            code (int): Code of the videogame to be removed.
+            name (str): The name of the attribute (dimensions, memory,
+                processor, weight or energy_consumption).
+            value: The value of the attribute for this machine.
         """
-        index = -1 # logic mark
-        for i, vg in enumerate(self.__videogames):
-            if vg.get_code() == code:
-                index = i
-                break
-        if index != -1: # videogame is in machine
-            self.__videogames.pop(index)
-            print(f"the videogame with code {code} was removed successfully")
-        else:
-            print(f"VideoGame with code {code} it not in the machine.")
+        if self._overrides is None:
+            self._overrides = {}
+        self._overrides[name] = value
 
-    def calculate_price(self):
-        """
-        This method allows to calculate the price an weight of the machine.
-        """
-        if self.material == "wood":
-            self.weight *= 1.1
-            self.base_price *= 0.95
-            self.energy_consumption *= 1.15
-        elif self.material == "aluminium":
-            self.weight *= 0.95
-            self.base_price *= 1.1
-        elif self.material == "carbon fiber":
-            self.weight *= 0.85
-            self.base_price *= 1.2
-            self.energy_consumption *= 0.90
-        else:
-            raise ValueError("The material is not available.")
-        for videogame in self.__videogames:
-            
-            self.base_price += videogame.price
-        return self.base_price
+    def get_videogames(self) -> list[VideoGame]:
+        """This method returns the videogames of the machine.
 
-    def add_videogame(self, videogame: VideoGame):
+        Returns:
+            A list with the videogames in the order they were added.
         """
-        This method allows to add a game to the arcade machine.
-        
-        Args:
-            videogame (Game): The videogame to add.
+        return [videogame for videogame, _ in self._videogames.values()]
+
+    def get_videogame_codes(self):
+        """This method returns the codes of the videogames of the machine.
+
+        Returns:
+            A view with the codes in the order they were added.
         """
-        self.__videogames.append(videogame)
+        return self._videogames.keys()
 
-    def show_videogames(self):
-        """This method show all videogames in the current machine.
+    def get_videogame_prices(self) -> list[tuple]:
+        """This method returns the prices the videogames had when they were added.
 
-        In this method the list of videogames is printed following
-        a format of code and name.
+        Returns:
+            A list with the code and the price of each videogame, in the
+            order they were added.
         """
-        if len(self.__videogames) > 0:
-            print("Code\tName")
-            for vg in self.__videogames:
-                print(vg)
-        else:
-            print("No videogames have been added.")
-            
-class ClasicArcadeMachine(Machine):
-    """
-    This class represents the behavior of a Dance Rebolution machine.
-    """
-    def __init__(self, material: str, videogames: list[VideoGame],):        
-        super().__init__(material, videogames)
-        self.dimensions = (180, 70, 60) # cm
-        self.weight = 15 # kg
-        self.energy_consumption = 200 # watts
-        self.memory = 16 # GB
-        self.processor = "Raspberry Pi 4"
-        self.base_price = 3000 
-
-    def remove_videogame(self, code: int):
+        return [(code, price) for code, (_, price) in self._videogames.items()]
+
+    def has_videogame(self, code: int) -> bool:
+        """This method checks if a videogame is in the machine.
+
+        Args:
+            code (int): Code of the videogame.
+
+        Returns:
+            True if the videogame is in the machine, False otherwise.
+        """
+        return code in self._videogames
+
+    def remove_videogame(self, code: int) -> VideoGame:
         """This method removes a videogame from the machine.
 
         In this method based on videogame code, if the videogame 
@@ -170,37 +234,72 @@ class ClasicArcadeMachine(Machine):
 
         Args:
             code (int): Code of the videogame to be removed.
+
+        Returns:
+            The removed videogame or None if it is not in the machine.
         """
-        index = -1 # logic mark
-        for i, vg in enumerate(self.__videogames):
-            if vg.get_code() == code:
-                index = i
-                break
-        if index != -1: # videogame is in machine
-            self.__videogames.pop(index)
-        else:
+        entry = self._videogames.pop(code, None)
+        if entry is None:
             print(f"VideoGame with code {code} it not in the machine.")
-
-    def calculate_price(self):
-        """
-        This method allows to calculate the price an weight of the machine.
-        """
-        if self.material == "wood":
-            self.weight *= 1.1
-            self.base_price *= 0.95
-            self.energy_consumption *= 1.15
-        elif self.material == "aluminium":
-            self.weight *= 0.95
-            self.base_price *= 1.1
-        elif self.material == "carbon fiber":
-            self.weight *= 0.85
-            self.base_price *= 1.2
-            self.energy_consumption *= 0.90
+            return None
+        videogame, price = entry
+        if self._videogames:
+            self._videogames_price -= price
         else:
+            self._videogames_price = 0 # avoid rounding leftovers
+        print(f"the videogame with code {code} was removed successfully")
+        return videogame
+
+    def calculate_price(self) -> float:
+        """
+        This method allows to calculate the price of the machine.
+
+        The videogames are counted with the price they had when they
+        were added to the machine.
+
+        Returns:
+            A float with the price of the machine with its videogames.
+
+        Raises:
+            ValueError: If the material is not available.
+        """
+        if self._row is None:
             raise ValueError("The material is not available.")
-        for videogame in self.__videogames:
-            self.base_price += videogame.price
-        return self.base_price
+        return default_rules().price(self._row) + self._videogames_price
+
+    def clone(self, material: str = None, extra_videogames: list[VideoGame] = ()) -> "Machine":
+        """
+        This method allows to copy the machine without running its constructor.
+
+        The slots are copied one by one, so the copy shares the spec and the
+        videogames of the original but has its own videogames dictionary
+        and overrides, and changing the copy does not change the original.
+
+        Args:
+            material (str): The material of the copy, or None to keep it.
+            extra_videogames (list[VideoGame]): Videogames added to the copy.
+
+        Returns:
+            The copy of the machine.
+
+        Raises:
+            ValueError: If an extra videogame is already in the machine.
+        """
+        machine_type = type(self)
+        machine = machine_type.__new__(machine_type)
+        for name in _slot_names(machine_type):
+            try:
+                setattr(machine, name, getattr(self, name))
+            except AttributeError: # the slot was never set
+                pass
+        machine._videogames = self._videogames.copy()
+        if self._overrides is not None:
+            machine._overrides = self._overrides.copy()
+        if material is not None:
+            machine.material = material
+        for videogame in extra_videogames:
+            machine.add_videogame(videogame)
+        return machine
 
     def add_videogame(self, videogame: VideoGame):
         """
@@ -208,8 +307,15 @@ class ClasicArcadeMachine(Machine):
         
         Args:
             videogame (Game): The videogame to add.
+
+        Raises:
+            ValueError: If the videogame is already in the machine.
         """
-        self.__videogames.append(videogame)
+        code = videogame.get_code()
+        if code in self._videogames:
+            raise ValueError(f"VideoGame with code {code} is already in the machine.")
+        self._videogames[code] = (videogame, videogame.price)
+        self._videogames_price += videogame.price
 
     def show_videogames(self):
         """This method show all videogames in the current machine.
@@ -217,103 +323,56 @@ class ClasicArcadeMachine(Machine):
         In this method the list of videogames is printed following
         a format of code and name.
         """
-        if len(self.__videogames) > 0:
+        if len(self._videogames) > 0:
             print("Code\tName")
-            for vg in self.__videogames:
+            for vg, _ in self._videogames.values():
                 print(vg)
         else:
             print("No videogames have been added.")
-            
-class ShootingArcadeMachine(Machine):
+    
+
+class DanceRevolutionMachine(Machine):
     """
     This class represents the behavior of a Dance Rebolution machine.
     """
-    def __init__(self, material: str, videogames: list[VideoGame]):        
-        super().__init__(material, videogames)
-        self.num_shots = 30
-        self.objetives = ['human', 'zombie', 'animal']  
-        self.dimensions = (200, 100, 70) # cm
-        self.weight = 40 # kg
-        self.energy_consumption = 450 # watts
-        self.memory = 24 # GB
-        self.processor = "Intel Core i5"
-        self.base_price = 5000
-
-    def remove_videogame(self, code: int):
-        """This method removes a videogame from the machine.
+    __slots__ = ()
 
-        In this method based on videogame code, if the videogame 
-        exists it will be removed from current machine.
+    SPEC = MachineSpec((150, 150, 250), 64, "Intel Core i3")
 
-        Args:
-            code (int): Code of the videogame to be removed.
-        """
-        index = -1 # logic mark
-        for i, vg in enumerate(self.__videogames):
-            if vg.get_code() == code:
-                index = i
-                break
-        if index != -1: # videogame is in machine
-            self.__videogames.pop(index)
-        else:
-            print(f"VideoGame with code {code} it not in the machine.")
+    dificulties = ('easy', 'medium', 'hard')
+    arrow_cardinalities = ('up', 'down', 'left', 'right')
+    control_price = 1000
+            
+class ClasicArcadeMachine(Machine):
+    """
+    This class represents the behavior of a Dance Rebolution machine.
+    """
+    __slots__ = ()
 
-    def calculate_price(self):
-        """
-        This method allows to calculate the price an weight of the machine.
-        """
-        if self.material == "wood":
-            self.weight *= 1.1
-            self.base_price *= 0.95
-            self.energy_consumption *= 1.15
-        elif self.material == "aluminium":
-            self.weight *= 0.95
-            self.base_price *= 1.1
-        elif self.material == "carbon fiber":
-            self.weight *= 0.85
-            self.base_price *= 1.2
-            self.energy_consumption *= 0.90
-        else:
-            raise ValueError("The material is not available.")
-        for videogame in self.__videogames:
-            self.base_price += videogame.price
-        return self.base_price
+    SPEC = MachineSpec((180, 70, 60), 16, "Raspberry Pi 4")
+            
+class ShootingArcadeMachine(Machine):
+    """
+    This class represents the behavior of a Dance Rebolution machine.
+    """
+    __slots__ = ()
 
-    def add_videogame(self, videogame: VideoGame):
-        """
-        This method allows to add a game to the arcade machine.
-        
-        Args:
-            videogame (Game): The videogame to add.
-        """
-        self.__videogames.append(videogame)
-        
-    def show_videogames(self):
-        """This method show all videogames in the current machine.
+    SPEC = MachineSpec((200, 100, 70), 24, "Intel Core i5")
 
-        In this method the list of videogames is printed following
-        a format of code and name.
-        """
-        if len(self.__videogames) > 0:
-            print("Code\tName")
-            for vg in self.__videogames:
-                print(vg)
-        else:
-            print("No videogames have been added.")    
+    objetives = ('human', 'zombie', 'animal')
+    num_shots = 30
     
 class RacingArcadeMachine(Machine):
     """
     This class represents the behavior of a racing arcade machine.
     """
+    __slots__ = ("num_players",)
+
+    SPEC = MachineSpec((200, 180, 110), 16, "Raspberry Pi 4")
+
     def __init__(self, material: str, videogames: list[VideoGame]):        
         super().__init__(material, videogames, )
         self.num_players = 1   
-        self.dimensions = (200, 180, 110) # cm
-        self.weight = 90 # kg
-        self.energy_consumption = 700 # watts
-        self.memory = 16 # GB
-        self.processor = "Raspberry Pi 4"
-        self.base_price = 7000
         
     def choose_num_players(self, num_players: int):
         """
@@ -326,68 +385,6 @@ class RacingArcadeMachine(Machine):
             raise ValueError("The number of players is not available.")
         
         self.num_players = num_players
-
-    def remove_videogame(self, code: int):
-        """This method removes a videogame from the machine.
-
-        In this method based on videogame code, if the videogame 
-        exists it will be removed from current machine.
-
-        Args:
-            code (int): Code of the videogame to be removed.
-        """
-        index = -1 # logic mark
-        for i, vg in enumerate(self.__videogames):
-            if vg.get_code() == code:
-                index = i
-                break
-        if index != -1: # videogame is in machine
-            self.__videogames.pop(index)
-        else:
-            print(f"VideoGame with code {code} it not in the machine.")
-
-    def calculate_price(self):
-        """
-        This method allows to calculate the price an weight of the machine.
-        """
-        if self.material == "wood":
-            self.weight *= 1.1
-            self.base_price *= 0.95
-            self.energy_consumption *= 1.15
-        elif self.material == "aluminium":
-            self.weight *= 0.95
-            self.base_price *= 1.1
-        elif self.material == "carbon fiber":
-            self.weight *= 0.85
-            self.base_price *= 1.2
-            self.energy_consumption *= 0.90
-        else:
-            raise ValueError("The material is not available.")
-        for videogame in self.__videogames:
-            self.base_price += videogame.price
-        return self.base_price
-
-    def add_videogame(self, videogame: VideoGame):
-        """
-        This method allows to add a game to the arcade machine.
-        
-        Args:
-            videogame (Game): The videogame to add.
-        """
-        self.__videogames.append(videogame)
-        
-    def show_videogames(self):
-        """This method show all videogames in the current machine.
-
-        In this method the list of videogames is printed following
-        a format of code and name.
-        """
-        if len(self.__videogames) > 0:
-            print("Code\tName")
-            for vg in self.__videogames:
-                print(vg)
-        else:
-            print("No videogames have been added.")   
     
     def make_vibration(self):
         print("the machine is vibrating")
@@ -399,109 +396,155 @@ class VirtualRealityMachine(Machine):
     """
     This class represents the behavior of a virtual reality arcade machine.
     """
+    __slots__ = ("glasses_type", "glasses_resolution", "glasses_price")
+
+    SPEC = MachineSpec((15, 22, 10), 4, "Raspberry Pi 4")
+
     def __init__(self, material: str, videogames: list[VideoGame], glasses_type: str, glasses_resolution: tuple, glasses_price: float):        
         super().__init__(material, videogames)
-        self.dimensions = (15, 22, 10) # cm
-        self.weight = 0.7 # kg
-        self.energy_consumption = 80 # watts
-        self.memory = 4 # GB
-        self.processor = "Raspberry Pi 4"
-        self.base_price = 3000
         self.glasses_type = glasses_type
         self.glasses_resolution = glasses_resolution
         self.glasses_price = glasses_price  
 
-    def remove_videogame(self, code: int):
-        """This method removes a videogame from the machine.
+# Registry of the specs shared by the machines of each type.
+MACHINE_SPECS = MappingProxyType({
+    machine_type.__name__: machine_type.SPEC
+    for machine_type in (DanceRevolutionMachine, ClasicArcadeMachine, ShootingArcadeMachine,
+                         RacingArcadeMachine, VirtualRealityMachine)
+})
+             
+class MachineFactory:
+    """
+    This class represents the machine factory.
 
-        In this method based on videogame code, if the videogame 
-        exists it will be removed from current machine.
+    The factories register the machines they create in a fleet registry,
+    which can be shared by several factories to query every machine that
+    was built. Each factory creates the machine type of its MACHINE
+    attribute.
+    """
+    MACHINE = None
 
-        Args:
-            code (int): Code of the videogame to be removed.
+    def __init__(self, fleet: FleetRegistry = None):
+        self._fleet = fleet if fleet is not None else FleetRegistry()
+        self._prototypes = {}
+
+    @property
+    def fleet(self) -> FleetRegistry:
+        """This property returns the fleet registry of the factory.
+
+        Returns:
+            The fleet registry where the machines are registered.
         """
-        index = -1 # logic mark
-        for i, vg in enumerate(self.__videogames):
-            if vg.get_code() == code:
-                index = i
-                break
-        if index != -1: # videogame is in machine
-            self.__videogames.pop(index)
-        else:
-            print(f"VideoGame with code {code} it not in the machine.")
+        return self._fleet
 
-    def calculate_price(self):
-        """
-        This method allows to calculate the price an weight of the machine.
-        """
-        if self.material == "wood":
-            self.weight *= 1.1
-            self.base_price *= 0.95
-            self.energy_consumption *= 1.15
-        elif self.material == "aluminium":
-            self.weight *= 0.95
-            self.base_price *= 1.1
-        elif self.material == "carbon fiber":
-            self.weight *= 0.85
-            self.base_price *= 1.2
-            self.energy_consumption *= 0.90
-        else:
-            raise ValueError("The material is not available.")
-        for videogame in self.__videogames:
-            self.base_price += videogame.price
-        return self.base_price
-    
-    def add_videogame(self, videogame: VideoGame):
+    def create_machine(self, material: str, videogames: list[VideoGame], *args):
         """
-        This method allows to add a game to the arcade machine.
+        This method allows to create a machine.
         
         Args:
-            videogame (Game): The videogame to add.
+            material (str): The material of the machine.
+            videogames (list[VideoGame]): The videogames of the machine.
+            *args: The extra arguments of the machine type.
+
+        Returns:
+            The created machine; fleet.id_of gives its id to change it
+            through the fleet registry.
+
+        Raises:
+            ValueError: If the factory has no machine type.
         """
-        self.__videogames.append(videogame)
-        
-    def show_videogames(self):
-        """This method show all videogames in the current machine.
+        if self.MACHINE is None:
+            raise ValueError("The factory has no machine type.")
+        machine = self.MACHINE(material, videogames, *args)
+        self._fleet.register(machine)
+        return machine
 
-        In this method the list of videogames is printed following
-        a format of code and name.
+    def create_machines(self, batch) -> list[Machine]:
         """
-        if len(self.__videogames) > 0:
-            print("Code\tName")
-            for vg in self.__videogames:
-                print(vg)
-        else:
-            print("No videogames have been added.") 
-             
-class MachineFactory:
-    """
-    This class represents the machine factory.
-    """
-    def __init__(self):
-        self.__machines = []
-    
-    def create_machine(self, material: str, videogames: list[VideoGame]):
+        This method allows to create many machines in one call.
+
+        The machines are built first and then registered in the fleet at
+        once, so the indexes are updated once per group of machines.
+
+        Args:
+            batch: An iterable of tuples with the arguments of
+                create_machine: the material, the videogames and the extra
+                arguments of the machine type.
+
+        Returns:
+            A list with the created machines, in the same order.
+
+        Raises:
+            ValueError: If the factory has no machine type.
         """
-        This method allows to create a machine.
-        
+        if self.MACHINE is None:
+            raise ValueError("The factory has no machine type.")
+        machine_type = self.MACHINE
+        machines = [machine_type(*args) for args in batch]
+        self._fleet.register_many(machines)
+        return machines
+
+    def register_prototype(self, name: str, machine: Machine):
+        """
+        This method allows to register a machine as a prototype of the factory.
+
+        The prototype is not registered in the fleet; its copies are.
+
         Args:
-            material (str): The material of the machine.
-            videogames (list[VideoGame]): The videogames of the machine.
+            name (str): The name of the prototype.
+            machine (Machine): The configured machine to copy.
+
+        Raises:
+            ValueError: If the machine is not of the factory type.
+        """
+        if self.MACHINE is not None and not isinstance(machine, self.MACHINE):
+            raise ValueError(f"The prototype must be a {self.MACHINE.__name__}.")
+        self._prototypes[name] = machine
+
+    def create_from_prototype(self, name: str, material: str = None,
+                              extra_videogames: list[VideoGame] = ()) -> Machine:
         """
-        machine = Machine(material, videogames)
-        self.__machines.append(machine)
+        This method allows to create a machine copying a registered prototype.
+
+        Args:
+            name (str): The name of the prototype.
+            material (str): The material of the machine, or None to keep
+                the one of the prototype.
+            extra_videogames (list[VideoGame]): Videogames added to the
+                ones of the prototype.
+
+        Returns:
+            The created machine.
+
+        Raises:
+            ValueError: If the prototype is not registered or an extra
+                videogame is already in the prototype.
+        """
+        prototype = self._prototypes.get(name)
+        if prototype is None:
+            raise ValueError(f"The prototype {name} is not registered.")
+        machine = prototype.clone(material, extra_videogames)
+        self._fleet.register(machine)
         return machine
 
+    def get_machines(self) -> list[Machine]:
+        """
+        This method returns the machines of the factory type in the fleet.
+        """
+        if self.MACHINE is None:
+            return list(self._fleet)
+        return self._fleet.by_type(self.MACHINE)
+
     def show_machines(self):
         """
         This method shows all machines in the factory.
         """
-        for machine in self.__machines:
+        for machine in self.get_machines():
             print(machine)
 
     def __str__(self) -> str:   
         temp_machines = ""
-        for machine in self.__machines:
+        for machine in self.get_machines():
             
             temp_machines += str(machine)
         return temp_machines
@@ -510,70 +553,32 @@ class DanceRevolutionFactory(MachineFactory):
     """
     This class represents the Dance Revolution machine factory.
     """
-    def create_machine(self, material: str, videogames: list[VideoGame]):
-        """
-        This method allows to create a machine.
-        
-        Args:
-            material (str): The material of the machine.
-            videogames (list[VideoGame]): The videogames of the machine.
-        """
-        machine = DanceRevolutionMachine(material, videogames)
-        self.__machines.append(machine)
-        return machine
+    MACHINE = DanceRevolutionMachine
 
 class ClasicArcadeFactory(MachineFactory):
     """
     This class represents the Clasic Arcade machine factory.
     """
-    def create_machine(self, material: str, videogames: list[VideoGame]):
-        """
-        This method allows to create a machine.
-        
-        Args:
-            material (str): The material of the machine.
-            videogames (list[VideoGame]): The videogames of the machine.
-        """
-        machine = ClasicArcadeMachine(material, videogames)
-        self.__machines.append(machine)
-        return machine
+    MACHINE = ClasicArcadeMachine
 
 class ShootingArcadeFactory(MachineFactory):
     """
     This class represents the Shooting Arcade machine factory.
     """
-    def create_machine(self, material: str, videogames: list[VideoGame]):
-        """
-        This method allows to create a machine.
-        
-        Args:
-            material (str): The material of the machine.
-            videogames (list[VideoGame]): The videogames of the machine.
-        """
-        machine = ShootingArcadeMachine(material, videogames)
-        self.__machines.append(machine)
-        return machine
+    MACHINE = ShootingArcadeMachine
 
 class RacingArcadeFactory(MachineFactory):
     """
     This class represents the Racing Arcade machine factory.
     """
-    def create_machine(self, material: str, videogames: list[VideoGame]):
-        """
-        This method allows to create a machine.
-        
-        Args:
-            material (str): The material of the machine.
-            videogames (list[VideoGame]): The videogames of the machine.
-        """
-        machine = RacingArcadeMachine(material, videogames)
-        self.__machines.append(machine)
-        return machine
+    MACHINE = RacingArcadeMachine
 
 class VirtualRealityFactory(MachineFactory):
     """
     This class represents the Virtual Reality machine factory.
     """
+    MACHINE = VirtualRealityMachine
+
     def create_machine(self, material: str, videogames: list[VideoGame], glasses_type: str, glasses_resolution: tuple, glasses_price: float):
         """
         This method allows to create a machine.
@@ -585,7 +590,4 @@ class VirtualRealityFactory(MachineFactory):
             glasses_resolution (tuple): The resolution of the glasses.
             glasses_price (float): The price of the glasses.
         """
-        machine = VirtualRealityMachine(material, videogames, glasses_type, glasses_resolution, glasses_price)
-        self.__machines.append(machine)
-        return machine
-
+        return super().create_machine(material, videogames, glasses_type, glasses_resolution, glasses_price)
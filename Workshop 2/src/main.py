@@ -20,11 +20,19 @@ along with Workshop-SM-UD. If not, see <https://www.gnu.org/licenses/>.
 
 """
 import sys
+import uuid
 from videogames import VideoGame
 from users import User, Manager, Client, Address
 from machines import ClasicArcadeFactory, DanceRevolutionFactory, ShootingArcadeFactory, RacingArcadeFactory, VirtualRealityFactory
-from purchasemanager import PurchaseManager
+from purchasejournal import JOURNAL_PATH, default_journal
+from purchasestore import PurchaseStore, default_store
+from purchasepipeline import PurchasePipeline
 from videogamescatalog import VideoGamesCatalog
+from quotecache import QuoteCache
+from fleet import FleetRegistry
+from pricing import default_rules
+from sqlitestore import DATABASE_PATH, SQLiteClientStore, SQLiteDatabase
+from clientdirectory import CLIENTS_CSV, ClientDirectory
 
 
 class Main:
@@ -35,10 +43,18 @@ class Main:
     MENU_CHOOSE_MACHINE = ("1. Clasic Arcade Machine\n2. Dance Revolution Machine\n3. "
                            "Shooting Arcade Machine\n4. Racing Arcade Machine\n5. Virtual Reality Machine\n6. Exit")
 
-    def __init__(self, user: User):
-        self.__catalog = VideoGamesCatalog()
+    def __init__(self, user: User, catalog=None, store: PurchaseStore = None,
+                 pipeline: PurchasePipeline = None):
+        self.__catalog = catalog if catalog is not None else VideoGamesCatalog()
         self.__temp_machine = None
+        self.__machine = None
+        self.__order_key = None
+        self.__store = store
+        self.__pipeline = pipeline
         self.__user = user
+        self.__quotes = QuoteCache()
+        self.__fleet = FleetRegistry()
+        self.__catalog.add_listener(self.__quotes.invalidate)
 
     def show_menu(self):
         """Show menu based on user type."""
@@ -52,22 +68,23 @@ class Main:
         print(self.MENU_CHOOSE_MACHINE)
         option = int(input("Choose a machine: "))
         if option == 1:
-            return ClasicArcadeFactory()
+            return ClasicArcadeFactory(self.__fleet)
         elif option == 2:
-            return DanceRevolutionFactory()
+            return DanceRevolutionFactory(self.__fleet)
         elif option == 3:
-            return ShootingArcadeFactory()
+            return ShootingArcadeFactory(self.__fleet)
         elif option == 4:
-            return RacingArcadeFactory()
+            return RacingArcadeFactory(self.__fleet)
         elif option == 5:
-            return VirtualRealityFactory()
+            return VirtualRealityFactory(self.__fleet)
         else:
             print("Invalid option.")
             return None
 
     def choose_material(self):
         """Allows the client to choose the material for the machine."""
-        material = input("Choose the material of the machine (wood, aluminum, carbon fiber): ")
+        materials = ", ".join(default_rules().materials)
+        material = input(f"Choose the material of the machine ({materials}): ")
         return material
 
     def show_videogames(self):
@@ -75,7 +92,7 @@ class Main:
         options = [
             (isinstance(self.__temp_machine, ClasicArcadeFactory), "Classic"),
             (isinstance(self.__temp_machine, DanceRevolutionFactory), "Dance"),
-            (isinstance(self.__temp_machine, ShootingArcadeFactory), "Shooting"),
+            (isinstance(self.__temp_machine, ShootingArcadeFactory), "Shooter"),
             (isinstance(self.__temp_machine, RacingArcadeFactory), "Racing"),
             (isinstance(self.__temp_machine, VirtualRealityFactory), "Virtual")
         ]
@@ -89,13 +106,27 @@ class Main:
 
     def choose_videogames(self):
         """Prompts the user to choose a videogame for the machine."""
+        query = input("Enter the code or the name of the videogame you want to add: ").strip()
+        if query.isdigit():
+            videogame = self.__catalog.search_by_code(int(query))
+            if videogame:
+                return videogame
+            print("Videogame not available.")
+            return None
+
+        candidates = self.__catalog.search_by_name(query)
+        if not candidates:
+            print("Videogame not available.")
+            return None
+        print("Did you mean:")
+        for vg in candidates:
+            print(vg)
         videogame_code = int(input("Enter the code of the videogame you want to add: "))
         videogame = self.__catalog.search_by_code(videogame_code)
         if videogame:
             return videogame
-        else:
-            print("Videogame not available.")
-            return None
+        print("Videogame not available.")
+        return None
 
     def create_machine(self):
         """Creates a customized machine."""
@@ -108,7 +139,13 @@ class Main:
 
         if videogame:
             machine = self.__temp_machine.create_machine(material, [videogame])
+            self.__machine = machine
+            self.__order_key = uuid.uuid4().hex
             print("Machine created successfully!")
+            try:
+                print(f"Price: {self.__quotes.quote(machine)}")
+            except ValueError as error:
+                print(error)
             return machine
         else:
             print("Machine creation failed.")
@@ -121,26 +158,53 @@ class Main:
         category = input("Insert the category of the videogame: ")
         price = float(input("Insert the price of the videogame: "))
         new_game = VideoGame(code, name, "", price, category, "", "", "", 2024)
-        self.__catalog.videogames.append(new_game)
+        try:
+            self.__catalog.add_videogame(new_game)
+        except ValueError as error:
+            print(error)
+            return
         print("Videogame added successfully!")
 
     def remove_videogame(self):
         """Allows the manager to remove a videogame from the catalog."""
         code = int(input("Insert the code of the videogame: "))
-        videogame = self.__catalog.search_by_code(code)
+        videogame = self.__catalog.remove_videogame(code)
         if videogame:
-            self.__catalog.videogames.remove(videogame)
             print("Videogame removed successfully!")
         else:
             print(f"Videogame with code {code} not found.")
 
     def buy_machine(self):
-        """Allows the client to finalize the purchase of the machine."""
-        if self.__temp_machine:
-            purchase_manager = PurchaseManager(self.__user, self.__temp_machine)
-            purchase_manager.finalize_purchase()
-        else:
+        """Allows the client to finalize the purchase of the machine.
+
+        The purchase is finalized in the background by the purchase
+        pipeline, which prints the receipt when it is ready. The order of
+        a machine has a single key, so buying the same machine again is
+        rejected instead of stored twice.
+        """
+        if not self.__machine:
             print("No machine has been created yet.")
+            return
+        if self.__pipeline is None:
+            if self.__store is None and JOURNAL_PATH:
+                self.__pipeline = PurchasePipeline(journal=default_journal(JOURNAL_PATH), quotes=self.__quotes)
+            else:
+                if self.__store is None:
+                    self.__store = default_store()
+                self.__pipeline = PurchasePipeline(store=self.__store, quotes=self.__quotes)
+        try:
+            future = self.__pipeline.submit(self.__user, self.__machine, self.__order_key)
+        except ValueError as error:
+            print(error)
+            return
+        future.add_done_callback(self.__show_receipt)
+        print("The purchase is being processed.")
+
+    @staticmethod
+    def __show_receipt(future):
+        """Shows the receipt of a finalized purchase or the error that stopped it."""
+        error = future.exception()
+        print(error if error else future.result())
 
     def handle_option(self, option: int) -> bool:
         """Handles menu options for both Manager and Client."""
@@ -163,28 +227,76 @@ class Main:
         return False
 
 
-def get_user() -> User:
-    """Gets the user type (Manager or Client)."""
-    options = "1. Manager\n2. Client\n3. Exit\n"
-    type_user = int(input(options))
+def load_clients(store: SQLiteClientStore = None) -> ClientDirectory:
+    """Loads the client directory with the demo client and the clients of the CLIENTS_CSV file.
 
-    if type_user == 1:
-        return Manager(1, "admin", "admin@udistrital.edu.co")
-    elif type_user == 2:
+    With a client store, the stored clients are loaded first and the
+    clients of the CLIENTS_CSV file are saved to it, so the next runs
+    find them without the file.
+    """
+    directory = ClientDirectory()
+    if store is not None:
+        directory.add_many(store)
+    if "homer@springfield.com" not in directory:
         address = Address("St. Evergreen 123", 110783, "Springfield", "USA")
-        return Client("Homer Simpson", "homer@springfield.com", "1234567", address)
-    elif type_user == 3:
-        print("Thanks for using the application. Goodbye!")
-        sys.exit()
-    else:
-        print("Invalid option.")
-        return None
+        directory.add(Client("Homer Simpson", "homer@springfield.com", "1234567", address))
+    if CLIENTS_CSV:
+        directory.import_csv(CLIENTS_CSV)
+        if store is not None:
+            store.save_many(list(directory))
+    return directory
+
+
+def get_user(directory: ClientDirectory) -> User:
+    """Gets the user type (Manager or Client); the clients are found in the directory by email.
+
+    A client whose email is not in the directory is registered with the
+    data it enters, and an invalid option is asked again.
+    """
+    options = "1. Manager\n2. Client\n3. Exit\n"
+    while True:
+        type_user = int(input(options))
+
+        if type_user == 1:
+            return Manager("admin", "admin@udistrital.edu.co")
+        elif type_user == 2:
+            email = input("Enter your email: ").strip()
+            client = directory.get_by_email(email)
+            if client is None:
+                print("Client not found, enter your data to register.")
+                name = input("Enter your name: ").strip()
+                phone = input("Enter your phone: ").strip()
+                address = Address(input("Enter your street: ").strip(), int(input("Enter your zip code: ")),
+                                  input("Enter your city: ").strip())
+                client = Client(name, email, phone, address)
+                directory.add(client)
+            return client
+        elif type_user == 3:
+            print("Thanks for using the application. Goodbye!")
+            sys.exit()
+        else:
+            print("Invalid option.")
 
 
 def run():
-    """Runs the application."""
-    user = get_user()
-    main = Main(user)
+    """Runs the application.
+
+    When the SHOP_DATABASE environment variable names a database file,
+    the catalog, the clients and the purchases are kept in it instead of
+    the catalog in memory and the purchase files. Else, when the
+    PURCHASE_JOURNAL environment variable names a file, the purchases
+    are written to that journal, rotated into compressed segments,
+    instead of the purchase store.
+    """
+    database = SQLiteDatabase(DATABASE_PATH) if DATABASE_PATH else None
+    directory = load_clients(database.clients if database is not None else None)
+    user = get_user(directory)
+    if database is None:
+        main = Main(user)
+    else:
+        if isinstance(user, Client):
+            database.clients.save(user)
+        main = Main(user, catalog=database.catalog, store=database.purchases)
 
     while True:
         main.show_menu()
@@ -192,7 +304,7 @@ def run():
         if main.handle_option(option):
             break
 
-        user = get_user()
+        user = get_user(directory)
         main.__user = user
 
 
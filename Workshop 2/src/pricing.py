@@ -0,0 +1,227 @@
+"""
+This module has a class to load the pricing rules of the machines.
+
+Author: Cristian Andres Gamez Nuñez <cagamezn@udistrital.edu.co>
+
+This file is part of Workshop-SM-UD.
+
+Workshop-SM-UD is free software: you can redistribute it and/or
+modify it under the terms of the GNU General Public License as
+published by the Free Software Foundation, either version 3 of
+the License, or (at your option) any later version.
+
+Workshop-SM-UD is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with Workshop-SM-UD. If not, see <https://www.gnu.org/licenses/>.
+"""
+import json
+import os
+from array import array
+
+DEFAULT_RULES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "pricing_rules.json")
+
+_default_rules = None
+
+
+class PricingRules:
+    """This class represents the pricing rules compiled into lookup tables.
+
+    The rules give for every material the multipliers of the price,
+    weight and energy consumption, a fixed surcharge and its aliases,
+    and for every machine type its base price, weight, energy
+    consumption and a fixed surcharge. They are compiled once into flat
+    tables with a row per machine type and material, so quoting is a
+    table lookup:
+
+        price = base_price * price multiplier + surcharges + videogames
+        weight = weight * weight multiplier
+        energy = energy_consumption * energy multiplier
+    """
+
+    def __init__(self, rules: dict):
+        materials = rules.get("materials")
+        machines = rules.get("machines")
+        if not materials or not machines:
+            raise ValueError("The pricing rules need materials and machines.")
+
+        self.__material_names = []
+        self.__materials = {}  # name or alias -> material index
+        for name, material in materials.items():
+            index = len(self.__material_names)
+            self.__material_names.append(name)
+            for alias in [name, *material.get("aliases", [])]:
+                if alias in self.__materials:
+                    raise ValueError(f"The material {alias} is defined twice.")
+                self.__materials[alias] = index
+
+        self.__machine_names = list(machines)
+        self.__machines = {name: index for index, name in enumerate(self.__machine_names)}
+        self.__bases = {}
+        self.__prices = array("d")
+        self.__weights = array("d")
+        self.__energies = array("d")
+        for name, machine in machines.items():
+            base_price = machine.get("base_price", 0)
+            weight = machine.get("weight", 0)
+            energy = machine.get("energy_consumption", 0)
+            self.__bases[name] = (base_price, weight, energy)
+            for material in materials.values():
+                self.__prices.append(base_price * material.get("price", 1)
+                                     + material.get("surcharge", 0) + machine.get("surcharge", 0))
+                self.__weights.append(weight * material.get("weight", 1))
+                self.__energies.append(energy * material.get("energy", 1))
+
+    @classmethod
+    def from_file(cls, path: str = DEFAULT_RULES_PATH) -> "PricingRules":
+        """This method loads the pricing rules from a JSON file.
+
+        Args:
+            path (str): The path of the file with the rules.
+
+        Returns:
+            The compiled pricing rules.
+        """
+        with open(path, encoding="utf-8") as file:
+            return cls(json.load(file))
+
+    @property
+    def materials(self) -> list[str]:
+        """This property returns the names of the available materials.
+
+        Returns:
+            A list with the materials in the order of the rules.
+        """
+        return list(self.__material_names)
+
+    @property
+    def machine_types(self) -> list[str]:
+        """This property returns the names of the machine types.
+
+        Returns:
+            A list with the machine types in the order of the rules.
+        """
+        return list(self.__machine_names)
+
+    def material(self, material: str) -> str:
+        """This method returns the canonical name of a material or alias.
+
+        Args:
+            material (str): The name or alias of the material.
+
+        Returns:
+            A string with the name of the material.
+
+        Raises:
+            ValueError: If the material is not available.
+        """
+        return self.__material_names[self.__material_index(material)]
+
+    def base(self, machine_type: str) -> tuple:
+        """This method returns the base values of a machine type.
+
+        Args:
+            machine_type (str): The name of the machine type.
+
+        Returns:
+            A tuple with the base price, weight and energy consumption.
+
+        Raises:
+            ValueError: If the machine type is not available.
+        """
+        if machine_type not in self.__bases:
+            raise ValueError(f"The machine type {machine_type} is not available.")
+        return self.__bases[machine_type]
+
+    def row(self, machine_type: str, material: str) -> int:
+        """This method returns the row of a machine type and material.
+
+        Args:
+            machine_type (str): The name of the machine type.
+            material (str): The name or alias of the material.
+
+        Returns:
+            An integer with the row in the tables.
+
+        Raises:
+            ValueError: If the machine type or the material is not available.
+        """
+        machine_index = self.__machines.get(machine_type)
+        if machine_index is None:
+            raise ValueError(f"The machine type {machine_type} is not available.")
+        return machine_index * len(self.__material_names) + self.__material_index(material)
+
+    def price(self, row: int) -> float:
+        """This method returns the price without videogames of a row.
+
+        Args:
+            row (int): The row in the tables.
+        """
+        return self.__prices[row]
+
+    def weight(self, row: int) -> float:
+        """This method returns the weight of a row.
+
+        Args:
+            row (int): The row in the tables.
+        """
+        return self.__weights[row]
+
+    def energy(self, row: int) -> float:
+        """This method returns the energy consumption of a row.
+
+        Args:
+            row (int): The row in the tables.
+        """
+        return self.__energies[row]
+
+    def lookup(self, machine_type: str, material: str) -> tuple:
+        """This method returns the values of a machine type and material.
+
+        Args:
+            machine_type (str): The name of the machine type.
+            material (str): The name or alias of the material.
+
+        Returns:
+            A tuple with the price without videogames, the weight and the
+            energy consumption.
+
+        Raises:
+            ValueError: If the machine type or the material is not available.
+        """
+        row = self.row(machine_type, material)
+        return self.__prices[row], self.__weights[row], self.__energies[row]
+
+    def __material_index(self, material: str) -> int:
+        """This method returns the index of a material or alias.
+
+        Args:
+            material (str): The name or alias of the material.
+
+        Returns:
+            An integer with the index of the material.
+
+        Raises:
+            ValueError: If the material is not available.
+        """
+        index = self.__materials.get(material)
+        if index is None:
+            raise ValueError("The material is not available.")
+        return index
+
+
+def default_rules() -> PricingRules:
+    """This function returns the rules of the default rules file.
+
+    The file is loaded and compiled only the first time.
+
+    Returns:
+        The compiled default pricing rules.
+    """
+    global _default_rules
+    if _default_rules is None:
+        _default_rules = PricingRules.from_file()
+    return _default_rules
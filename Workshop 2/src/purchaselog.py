@@ -0,0 +1,252 @@
+"""
+This module has functions to read the purchase.txt logs.
+
+Author: Cristian Andres Gamez Nuñez <cagamezn@udistrital.edu.co>
+
+This file is part of Workshop-SM-UD.
+
+Workshop-SM-UD is free software: you can redistribute it and/or
+modify it under the terms of the GNU General Public License as
+published by the Free Software Foundation, either version 3 of
+the License, or (at your option) any later version.
+
+Workshop-SM-UD is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with Workshop-SM-UD. If not, see <https://www.gnu.org/licenses/>.
+"""
+import mmap
+import os
+from datetime import datetime
+from typing import NamedTuple
+
+BLOCK_SIZE = 4 * 2 ** 20
+RECORD_START = b"\nDate: "
+
+
+class PurchaseGame(NamedTuple):
+    """This class represents a game line of a purchase."""
+    name: str
+    category: str
+    price: float
+
+
+class PurchaseRecord(NamedTuple):
+    """This class represents a purchase read from a log.
+
+    The logs of Workshop 1 name the buyer Customer and the ones of
+    Workshop 2 name it Client; both are read into customer.
+    """
+    date: datetime
+    customer: str
+    address: str
+    phone: str
+    email: str
+    material: str
+    games: tuple
+    total_price: float
+
+
+FIELDS = {
+    "Customer": "customer",
+    "Client": "customer",
+    "Adress": "address",
+    "Phone": "phone",
+    "Email": "email",
+    "Arcade machine material": "material",
+}
+
+
+def parse_record(text: str) -> PurchaseRecord:
+    """This function parses the text of a purchase.
+
+    Args:
+        text (str): The lines of the purchase, from the date to the
+            total price.
+
+    Returns:
+        The purchase record.
+
+    Raises:
+        ValueError: If the text is not a complete purchase.
+    """
+    lines = text.split("\n")
+    first = lines[0].rstrip("\r")
+    if not first.startswith("Date: "):
+        raise ValueError("The purchase does not start with its date.")
+    values = {"date": datetime.fromisoformat(first[6:])}
+    games = []
+    total_price = None
+    for line in lines[1:]:
+        line = line.rstrip("\r")
+        if line.startswith("Name: "):
+            rest, _, price = line[6:].rpartition(", Price: ")
+            name, _, category = rest.rpartition(", Category: ")
+            games.append(PurchaseGame(name, category, float(price)))
+        elif line.startswith("Total price: "):
+            total_price = float(line[13:])
+        elif line and line != "Games:":
+            key, _, value = line.partition(": ")
+            field = FIELDS.get(key)
+            if field is None:
+                raise ValueError(f"The purchase has an unknown line: {line}")
+            values[field] = value
+    if total_price is None or len(values) != 6:
+        raise ValueError(f"The purchase of {first[6:]} is not complete.")
+    return PurchaseRecord(games=tuple(games), total_price=total_price, **values)
+
+
+def split(path: str, parts: int, start: int = 0, end: int = None) -> list[tuple[int, int]]:
+    """This function splits a log in byte ranges that start at a purchase.
+
+    The ranges can be parsed in parallel with iter_records and together
+    have every purchase exactly once.
+
+    Args:
+        path (str): The path of the log.
+        parts (int): The number of ranges wanted.
+        start (int): The byte where a purchase starts to split from.
+        end (int): The byte where the part to split ends, or None for
+            the end of the file.
+
+    Returns:
+        A list with the start and end of the ranges; there may be fewer
+        than parts when the log is small.
+    """
+    size = os.path.getsize(path)
+    end = size if end is None else min(end, size)
+    if start >= end:
+        return []
+    bounds = [start]
+    with open(path, "rb") as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        for part in range(1, parts):
+            position = data.find(RECORD_START, max(start + (end - start) * part // parts, bounds[-1]) - 1, end)
+            if position < 0:
+                break
+            if position + 1 > bounds[-1]:
+                bounds.append(position + 1)
+    bounds.append(end)
+    return list(zip(bounds, bounds[1:]))
+
+
+def complete_end(path: str) -> int:
+    """This function returns where the last complete purchase of a log ends.
+
+    A purchase that is still being written has no total price line
+    ending in a new line yet, so it is left out.
+
+    Args:
+        path (str): The path of the log.
+
+    Returns:
+        An integer with the byte after the last complete purchase.
+    """
+    size = os.path.getsize(path)
+    if size == 0:
+        return 0
+    with open(path, "rb") as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        if data[size - 1:] == b"\n":
+            last_line = data.rfind(b"\n", 0, size - 1) + 1
+            if data[last_line:last_line + 13] == b"Total price: ":
+                return size
+        last_start = data.rfind(RECORD_START)
+        return last_start + 1 if last_start >= 0 else 0
+
+
+def iter_records(path: str, start: int = 0, end: int = None, strict: bool = False):
+    """This function reads the purchases of a log one by one.
+
+    The file is memory mapped and parsed in blocks of whole purchases,
+    so the memory used does not grow with the size of the log. Both LF
+    and CRLF line endings are read.
+
+    Args:
+        path (str): The path of the log.
+        start (int): The byte where a purchase starts, as given by split.
+        end (int): The byte where the range ends, or None for the end of
+            the file.
+        strict (bool): Whether to raise an error for a malformed
+            purchase instead of skipping it.
+
+    Yields:
+        The purchase records in the order of the log.
+
+    Raises:
+        ValueError: If strict and a purchase is malformed.
+    """
+    if os.path.getsize(path) == 0:
+        return
+    with open(path, "rb") as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        end = len(data) if end is None else min(end, len(data))
+        position = start
+        while position < end:
+            block_end = end
+            if position + BLOCK_SIZE < end:
+                boundary = data.find(RECORD_START, position + BLOCK_SIZE, end)
+                if boundary >= 0:
+                    block_end = boundary + 1
+            block = data[position:block_end]
+            position = block_end
+            yield from _parse_block(block, strict)
+
+
+def iter_blocks(chunks, strict: bool = False):
+    """This function reads the purchases of a log given in chunks of bytes.
+
+    The chunks may cut the purchases anywhere, like the ones of a
+    compressed file; every purchase is parsed when it is complete.
+
+    Args:
+        chunks: An iterable of bytes with the log in order.
+        strict (bool): Whether to raise an error for a malformed
+            purchase instead of skipping it.
+
+    Yields:
+        The purchase records in the order of the log.
+
+    Raises:
+        ValueError: If strict and a purchase is malformed.
+    """
+    pending = b""
+    for chunk in chunks:
+        pending += chunk
+        boundary = pending.rfind(RECORD_START)
+        if boundary > 0:
+            yield from _parse_block(pending[:boundary + 1], strict)
+            pending = pending[boundary + 1:]
+    if pending:
+        yield from _parse_block(pending, strict)
+
+
+def _parse_block(block: bytes, strict: bool):
+    """This function parses a block of whole purchases.
+
+    Args:
+        block (bytes): The purchases, starting at a date line.
+        strict (bool): Whether to raise an error for a malformed purchase.
+
+    Yields:
+        The purchase records of the block.
+    """
+    for text in ("\n" + block.decode("utf-8", errors="replace")).split("\nDate: ")[1:]:
+        try:
+            yield parse_record("Date: " + text)
+        except ValueError:
+            if strict:
+                raise
+
+
+def read_records(path: str, strict: bool = False) -> list[PurchaseRecord]:
+    """This function reads all the purchases of a log.
+
+    Args:
+        path (str): The path of the log.
+        strict (bool): Whether to raise an error for a malformed purchase.
+
+    Returns:
+        A list with the purchase records.
+    """
+    return list(iter_records(path, strict=strict))
@@ -1,26 +1,119 @@
+"""
+This module has a class to finalize the purchase of a machine.
+
+Author: Cristian Andres Gamez Nuñez <cagamezn@udistrital.edu.co>
+
+This file is part of Workshop-SM-UD.
+
+Workshop-SM-UD is free software: you can redistribute it and/or
+modify it under the terms of the GNU General Public License as
+published by the Free Software Foundation, either version 3 of
+the License, or (at your option) any later version.
+
+Workshop-SM-UD is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with Workshop-SM-UD. If not, see <https://www.gnu.org/licenses/>.
+"""
 from datetime import datetime
 from users import Client
 from machines import Machine
+from purchasejournal import PurchaseJournal, default_journal
+from purchasestore import PurchaseStore
 
 class PurchaseManager:
     """
     This class represents the purchase manager.
+
+    The purchases are written as structured records to a purchase store
+    when one is given, or else to a purchase journal, shared by default
+    by all the purchases of purchase.txt, as a single text record each.
+
+    The key identifies the order, so when it is given the store or the
+    journal rejects a purchase that is finalized again, as by a retry or
+    a double click.
     """
-    def __init__(self, client: Client, machine: Machine):
+    def __init__(self, client: Client, machine: Machine, journal: PurchaseJournal = None,
+                 store: PurchaseStore = None, key: str = None):
         self.client = client
         self.machine = machine
+        self.store = store
+        self.key = key
+        self.journal = journal if journal is not None or store is not None else default_journal()
+
+    def build_purchase(self, total_price: float = None) -> dict:
+        """
+        This method builds the structured record of the purchase.
+
+        Args:
+            total_price (float): The price already calculated, or None to
+                calculate it.
+
+        Returns:
+            A dictionary with the fields of the purchase.
+
+        Raises:
+            ValueError: If the price of the machine can not be calculated.
+        """
+        return {
+            "date": datetime.now().isoformat(" "),
+            "client": self.client._name,
+            "email": self.client._email,
+            "addresses": [address.one_line() for address in self.client.get_addresses()],
+            "phones": list(self.client.get_phones()),
+            "machine_type": type(self.machine).__name__,
+            "material": self.machine.material,
+            "games": [{"code": videogame.get_code(), "name": videogame.name,
+                       "category": videogame.category, "price": videogame.price}
+                      for videogame in self.machine.get_videogames()],
+            "total_price": self.machine.calculate_price() if total_price is None else total_price,
+            "key": self.key,
+        }
+
+    def build_record(self, total_price: float = None) -> str:
+        """
+        This method builds the text of the purchase in the journal.
+
+        Args:
+            total_price (float): The price already calculated, or None to
+                calculate it.
+
+        Returns:
+            A string with the lines of the purchase.
+
+        Raises:
+            ValueError: If the price of the machine can not be calculated.
+        """
+        if total_price is None:
+            total_price = self.machine.calculate_price()
+        lines = [
+            f"Date: {datetime.now()}",
+            f"Client: {self.client._name}",
+            f"Adress: {' --- '.join(address.one_line() for address in self.client.get_addresses())}",
+            f"Phone: {' --- '.join(self.client.get_phones())}",
+            f"Email: {self.client._email}",
+            f"Arcade machine material: {self.machine.material}",
+            "Games:",
+        ]
+        for videogame in self.machine.get_videogames():
+            lines.append(f"Name: {videogame.name}, Category: {videogame.category}, Price: {videogame.price}")
+        lines.append(f"Total price: {total_price}")
+        lines.append("")
+        return "\n".join(lines)
 
     def finalize_purchase(self):
         """
         This method allows to finalize the purchase.
         """
-        with open("purchase.txt", "a") as file:
-            file.write(f"Date: {datetime.now()}\n")
-            file.write(f"Client: {self.client._name}\n")
-            file.write(f"Adress: {self.client.__addresses}\n")
-            file.write(f"Phone: {self.client.__phones}\n")
-            file.write(f"Email: {self.client._email}\n")
-            file.write(f"Arcade machine material: {self.machine.material}\n")
-            file.write("Games:\n")
-        
+        try:
+            if self.store is not None:
+                self.store.append(self.build_purchase())
+            else:
+                self.journal.write(self.build_record(), self.key)
+        except ValueError as error:
+            print(error)
+            return
         print("The purchase has been finalized.")
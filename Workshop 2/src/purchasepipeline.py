@@ -0,0 +1,270 @@
+"""
+This module has a class to process the purchases in the background.
+
+Author: Cristian Andres Gamez Nuñez <cagamezn@udistrital.edu.co>
+
+This file is part of Workshop-SM-UD.
+
+Workshop-SM-UD is free software: you can redistribute it and/or
+modify it under the terms of the GNU General Public License as
+published by the Free Software Foundation, either version 3 of
+the License, or (at your option) any later version.
+
+Workshop-SM-UD is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with Workshop-SM-UD. If not, see <https://www.gnu.org/licenses/>.
+"""
+import asyncio
+import atexit
+import concurrent.futures
+import sys
+import threading
+import time
+from users import Client
+from machines import Machine
+from purchasemanager import PurchaseManager
+from purchasejournal import PurchaseJournal
+from purchasestore import PurchaseStore
+from quotecache import QuoteCache
+
+_STOP = object()
+
+
+def shutting_down() -> bool:
+    """This function tells if the interpreter is exiting.
+
+    The main thread is stopped before the exit handlers run, and no
+    worker thread can be started from then on.
+
+    Returns:
+        True if the interpreter is exiting, False otherwise.
+    """
+    return sys.is_finalizing() or not threading.main_thread().is_alive()
+
+
+class Order:
+    """This class represents a purchase going through the pipeline."""
+
+    __slots__ = ("client", "machine", "key", "submitted", "total_price", "receipt", "future")
+
+    def __init__(self, client: Client, machine: Machine, key: str, future: concurrent.futures.Future):
+        self.client = client
+        self.machine = machine
+        self.key = key
+        self.submitted = time.monotonic()
+        self.total_price = None
+        self.receipt = None
+        self.future = future
+
+
+class PurchasePipeline:
+    """This class represents a pipeline that finalizes the purchases in the background.
+
+    Submitting a purchase only puts it in a bounded queue and returns a
+    future, so the interactive flow does not wait for the files. An
+    asyncio loop in a background thread runs four stages connected by
+    bounded queues: validation, pricing, journaling and receipt. When a
+    queue is full the stage before it waits, and when the first queue is
+    full submit waits at most submit_timeout seconds, so a burst of
+    purchases is absorbed up to the size of the queues.
+
+    The purchases are written to the purchase store when one is given,
+    or else to the purchase journal. The future of a purchase gives its
+    receipt, or the error that stopped it, like the ValueError of a
+    purchase whose idempotency key the store or the journal already has.
+    """
+
+    STAGES = ("validate", "price", "journal", "receipt")
+
+    def __init__(self, store: PurchaseStore = None, journal: PurchaseJournal = None,
+                 quotes: QuoteCache = None, queue_size: int = 1000, submit_timeout: float = 5.0,
+                 on_receipt=None):
+        if store is None and journal is None:
+            raise ValueError("The purchase pipeline needs a store or a journal.")
+        if queue_size < 1:
+            raise ValueError("The size of the queues must be greater than 0.")
+        self.__store = store
+        self.__journal = journal
+        self.__quotes = quotes
+        self.__queue_size = queue_size
+        self.__submit_timeout = submit_timeout
+        self.__on_receipt = on_receipt
+        self.__stats = {"submitted": 0, "completed": 0, "failed": 0, "max_queued": 0}
+        self.__stats_lock = threading.Lock()
+        self.__closed = False
+
+        self.__loop = asyncio.new_event_loop()
+        started = threading.Event()
+        self.__thread = threading.Thread(target=self.__run, args=(started,),
+                                         name="purchase-pipeline", daemon=True)
+        self.__thread.start()
+        started.wait()
+        atexit.register(self.close)
+
+    def submit(self, client: Client, machine: Machine, key: str = None) -> concurrent.futures.Future:
+        """This method allows to put a purchase in the pipeline.
+
+        Args:
+            client (Client): The client that buys the machine.
+            machine (Machine): The machine bought.
+            key (str): The idempotency key of the order, or None.
+
+        Returns:
+            A future with the receipt of the purchase.
+
+        Raises:
+            ValueError: If the pipeline is closed or stayed full for the
+                submit timeout.
+        """
+        if self.__closed:
+            raise ValueError("The purchase pipeline is closed.")
+        future = concurrent.futures.Future()
+        order = Order(client, machine, key, future)
+        queued = asyncio.run_coroutine_threadsafe(self.__queues[0].put(order), self.__loop)
+        try:
+            queued.result(self.__submit_timeout)
+        except concurrent.futures.TimeoutError:
+            queued.cancel()
+            raise ValueError("The purchase pipeline is full, try again later.") from None
+        with self.__stats_lock:
+            self.__stats["submitted"] += 1
+            self.__stats["max_queued"] = max(self.__stats["max_queued"], self.__queues[0].qsize())
+        return future
+
+    def stats(self) -> dict:
+        """This method returns the statistics of the pipeline.
+
+        Returns:
+            A dictionary with the purchases submitted, completed and
+            failed and the most purchases waiting in the first queue.
+        """
+        with self.__stats_lock:
+            return dict(self.__stats)
+
+    def close(self, timeout: float = None):
+        """This method allows to finish the queued purchases and stop the pipeline.
+
+        Args:
+            timeout (float): The seconds to wait for the purchases, or None
+                to wait for all of them.
+        """
+        if self.__closed:
+            return
+        self.__closed = True
+        asyncio.run_coroutine_threadsafe(self.__queues[0].put(_STOP), self.__loop)
+        self.__thread.join(timeout)
+        if self.__store is not None:
+            self.__store.flush()
+        if self.__journal is not None:
+            self.__journal.flush()
+        atexit.unregister(self.close)
+
+    def __enter__(self) -> "PurchasePipeline":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def __run(self, started: threading.Event):
+        """This method runs the loop of the stages in the background thread.
+
+        Args:
+            started (threading.Event): The event set when the queues exist.
+        """
+        asyncio.set_event_loop(self.__loop)
+        self.__queues = [asyncio.Queue(self.__queue_size) for _ in self.STAGES]
+        stages = [self.__validate, self.__price, self.__write, self.__render]
+        workers = [self.__stage(stage, self.__queues[index],
+                                self.__queues[index + 1] if index + 1 < len(stages) else None)
+                   for index, stage in enumerate(stages)]
+        started.set()
+        try:
+            self.__loop.run_until_complete(asyncio.gather(*workers))
+        finally:
+            self.__loop.close()
+
+    async def __stage(self, stage, source: asyncio.Queue, target: asyncio.Queue):
+        """This method runs a stage until the pipeline is stopped.
+
+        Args:
+            stage: The coroutine function that processes an order.
+            source (asyncio.Queue): The queue the orders come from.
+            target (asyncio.Queue): The queue of the next stage, or None.
+        """
+        while True:
+            order = await source.get()
+            if order is _STOP:
+                if target is not None:
+                    await target.put(_STOP)
+                return
+            if order.future.done(): # cancelled by the client
+                continue
+            try:
+                await stage(order)
+            except Exception as error:
+                with self.__stats_lock:
+                    self.__stats["failed"] += 1
+                order.future.set_exception(error)
+                continue
+            if target is not None:
+                await target.put(order)
+
+    async def __validate(self, order: Order):
+        """This stage checks that the client can buy the machine.
+
+        Raises:
+            ValueError: If the purchase is not valid.
+        """
+        if not isinstance(order.client, Client) or not order.client._grants.get("buy_machine"):
+            raise ValueError("The user can not buy machines.")
+        if not isinstance(order.machine, Machine):
+            raise ValueError("Only machines can be bought.")
+        if not order.machine.get_videogames():
+            raise ValueError("The machine has no videogames.")
+
+    async def __price(self, order: Order):
+        """This stage calculates the price of the machine.
+
+        Raises:
+            ValueError: If the material of the machine is not available.
+        """
+        if self.__quotes is not None:
+            order.total_price = self.__quotes.quote(order.machine)
+        else:
+            order.total_price = order.machine.calculate_price()
+
+    async def __write(self, order: Order):
+        """This stage writes the purchase to the store or the journal.
+
+        The write runs in a worker thread, so a slow disk does not stop
+        the other stages. While the interpreter exits no thread can be
+        started, so the purchases left are written by the loop itself; any other error
+        of the write fails the purchase.
+        """
+        manager = PurchaseManager(order.client, order.machine, journal=self.__journal, store=self.__store,
+                                  key=order.key)
+        if self.__store is not None:
+            write, arguments = self.__store.append, (manager.build_purchase(order.total_price),)
+        else:
+            write, arguments = self.__journal.write, (manager.build_record(order.total_price), order.key)
+        if shutting_down():
+            write(*arguments)
+        else:
+            await asyncio.to_thread(write, *arguments)
+
+    async def __render(self, order: Order):
+        """This stage renders the receipt of the purchase and completes its future."""
+        lines = ["===== Receipt =====", f"Client: {order.client._name}",
+                 f"Machine: {type(order.machine).__name__} ({order.machine.material})"]
+        lines += [f"  {videogame.name}: {videogame.price}" for videogame in order.machine.get_videogames()]
+        lines.append(f"Total price: {order.total_price}")
+        order.receipt = "\n".join(lines)
+        with self.__stats_lock:
+            self.__stats["completed"] += 1
+        order.future.set_result(order.receipt)
+        if self.__on_receipt is not None:
+            self.__on_receipt(order.receipt)
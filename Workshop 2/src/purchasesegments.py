@@ -0,0 +1,352 @@
+"""
+This module has a class to rotate the purchase logs into compressed segments.
+
+Author: Cristian Andres Gamez Nuñez <cagamezn@udistrital.edu.co>
+
+This file is part of Workshop-SM-UD.
+
+Workshop-SM-UD is free software: you can redistribute it and/or
+modify it under the terms of the GNU General Public License as
+published by the Free Software Foundation, either version 3 of
+the License, or (at your option) any later version.
+
+Workshop-SM-UD is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with Workshop-SM-UD. If not, see <https://www.gnu.org/licenses/>.
+"""
+import json
+import os
+import re
+import struct
+import time
+import zlib
+from typing import NamedTuple
+from datetime import datetime
+from purchaselog import iter_blocks
+
+SEGMENT_MAGIC = b"PSEG0001"
+SEGMENT_NAME = re.compile(r"^purchases-(\d{6})\.seg$")
+CHUNK_SIZE = 2 ** 20
+DATE_LINE = re.compile(rb"^Date: ([^\r\n]*)", re.MULTILINE)
+
+
+class SegmentFooter(NamedTuple):
+    """This class represents the index at the end of a segment.
+
+    The dates are the ones of the oldest and newest purchases, in the
+    ISO format of the log.
+    """
+    first: str
+    last: str
+    count: int
+    size: int  # bytes of the log
+    data_length: int  # bytes of the compressed log
+
+
+def write_segment(log_path: str, segment_path: str, level: int = 6) -> SegmentFooter:
+    """This function compresses a log into a segment with its footer.
+
+    The segment is the log compressed in gzip format, followed by the
+    footer as JSON, the length of the footer and a magic number. The
+    purchases are counted and the oldest and newest dates are found
+    while the log is compressed, so a purchase written out of order
+    still falls in the dates of the footer.
+
+    Args:
+        log_path (str): The path of the log.
+        segment_path (str): The path of the segment to write.
+        level (int): The compression level, from 1 to 9.
+
+    Returns:
+        The footer of the segment.
+    """
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+    count = 0
+    size = 0
+    data_length = 0
+    pending = b""  # the last line of the log read, until it is complete
+    first = last = None
+    with open(log_path, "rb") as log, open(segment_path, "wb") as segment:
+        while True:
+            chunk = log.read(CHUNK_SIZE)
+            size += len(chunk)
+            lines = pending + chunk
+            complete = lines.rfind(b"\n") + 1 if chunk else len(lines)
+            for match in DATE_LINE.finditer(lines, 0, complete):
+                date = match.group(1)
+                count += 1
+                first = date if first is None or date < first else first
+                last = date if last is None or date > last else last
+            pending = lines[complete:]
+            data = compressor.compress(chunk) if chunk else compressor.flush()
+            data_length += len(data)
+            segment.write(data)
+            if not chunk:
+                break
+
+        footer = SegmentFooter((first or b"").decode("utf-8"), (last or b"").decode("utf-8"),
+                               count, size, data_length)
+        encoded = json.dumps(footer._asdict()).encode("utf-8")
+        segment.write(encoded + struct.pack(">Q", len(encoded)) + SEGMENT_MAGIC)
+        segment.flush()
+        os.fsync(segment.fileno())
+    return footer
+
+
+def read_footer(segment_path: str) -> SegmentFooter:
+    """This function reads the footer of a segment without reading its data.
+
+    Args:
+        segment_path (str): The path of the segment.
+
+    Returns:
+        The footer of the segment.
+
+    Raises:
+        ValueError: If the file is not a segment.
+    """
+    with open(segment_path, "rb") as segment:
+        segment.seek(0, os.SEEK_END)
+        end = segment.tell()
+        if end < 16:
+            raise ValueError(f"{segment_path} is not a purchase segment.")
+        segment.seek(end - 16)
+        trailer = segment.read(16)
+        if trailer[8:] != SEGMENT_MAGIC:
+            raise ValueError(f"{segment_path} is not a purchase segment.")
+        length = struct.unpack(">Q", trailer[:8])[0]
+        segment.seek(end - 16 - length)
+        return SegmentFooter(**json.loads(segment.read(length)))
+
+
+def iter_chunks(segment_path: str):
+    """This function reads the log of a segment in chunks of bytes.
+
+    Args:
+        segment_path (str): The path of the segment.
+
+    Yields:
+        The decompressed bytes of the log, in order.
+    """
+    footer = read_footer(segment_path)
+    decompressor = zlib.decompressobj(31)
+    left = footer.data_length
+    with open(segment_path, "rb") as segment:
+        while left:
+            data = segment.read(min(CHUNK_SIZE, left))
+            left -= len(data)
+            yield decompressor.decompress(data)
+    yield decompressor.flush()
+
+
+def iter_segment(segment_path: str, strict: bool = False, start: int = 0):
+    """This function reads the purchases of a segment one by one.
+
+    Args:
+        segment_path (str): The path of the segment.
+        strict (bool): Whether to raise an error for a malformed purchase.
+        start (int): The byte of the log where a purchase starts; the
+            purchases before it are skipped.
+
+    Yields:
+        The purchase records in the order of the log.
+    """
+    def chunks():
+        left = start
+        for chunk in iter_chunks(segment_path):
+            if left:
+                skipped = min(left, len(chunk))
+                chunk = chunk[skipped:]
+                left -= skipped
+            yield chunk
+
+    yield from iter_blocks(chunks(), strict)
+
+
+def list_segments(directory: str) -> list[str]:
+    """This function returns the paths of the segments of a directory.
+
+    Args:
+        directory (str): The directory of the segments.
+
+    Returns:
+        A list with the paths of the segments, oldest first, empty if
+        the directory was not created yet.
+    """
+    if not os.path.isdir(directory):
+        return []
+    segments = []
+    for name in os.listdir(directory):
+        match = SEGMENT_NAME.match(name)
+        if match:
+            segments.append((int(match.group(1)), os.path.join(directory, name)))
+    return [path for _, path in sorted(segments)]
+
+
+def overlaps(footer: SegmentFooter, start: str = None, end: str = None) -> bool:
+    """This function tells if a segment may have purchases in a range of dates.
+
+    Args:
+        footer (SegmentFooter): The footer of the segment.
+        start (str): The first date of the range, included, or None.
+        end (str): The last date of the range, excluded, or None.
+
+    Returns:
+        True if the dates of the segment overlap the range.
+    """
+    return (start is None or footer.last >= start) and (end is None or footer.first < end)
+
+
+class SegmentRotator:
+    """This class represents the rotation policy of a purchase log.
+
+    When the log reaches max_bytes, or max_age seconds passed since the
+    date of its first purchase, it is compressed into an immutable
+    segment of the directory and emptied. Every segment ends with a
+    footer with the dates of its first and last purchases and its count,
+    so queries read only the segments of the dates they need. Only the
+    newest max_segments segments and at most max_total_bytes of segments
+    are kept, so the disk used is bounded. The age is read from the log,
+    so it counts from the same purchase in every process that writes the
+    log and it is not reset when the program is started again.
+    """
+
+    def __init__(self, directory: str, max_bytes: int = 64 * 2 ** 20, max_age: float = None,
+                 max_segments: int = None, max_total_bytes: int = None, level: int = 6,
+                 clock=time.time):
+        if max_bytes is not None and max_bytes < 1:
+            raise ValueError("The maximum size of the log must be greater than 0.")
+        self.__directory = directory
+        self.__max_bytes = max_bytes
+        self.__max_age = max_age
+        self.__max_segments = max_segments
+        self.__max_total_bytes = max_total_bytes
+        self.__level = level
+        self.__clock = clock
+
+    @property
+    def directory(self) -> str:
+        """This property returns the directory of the segments.
+
+        Returns:
+            A string with the path of the directory.
+        """
+        return self.__directory
+
+    def due(self, size: int, log_path: str = None) -> bool:
+        """This method tells if a log must be rotated.
+
+        Args:
+            size (int): The bytes written to the log.
+            log_path (str): The path of the log, to read the date of its
+                first purchase, or None to only check its size.
+
+        Returns:
+            True if the log reached its maximum size or age.
+        """
+        if size == 0:
+            return False
+        if self.__max_bytes is not None and size >= self.__max_bytes:
+            return True
+        return (self.__max_age is not None and log_path is not None
+                and self.__clock() - self.started(log_path) >= self.__max_age)
+
+    @staticmethod
+    def started(log_path: str) -> float:
+        """This method returns when the purchases of a log started.
+
+        Args:
+            log_path (str): The path of the log.
+
+        Returns:
+            The time of the date of the first purchase, in seconds since
+            the epoch, or the time of the last change of the log if it
+            does not start with a purchase.
+        """
+        with open(log_path, "rb") as log:
+            match = DATE_LINE.match(log.readline(256))
+        try:
+            return datetime.fromisoformat(match.group(1).decode("utf-8")).timestamp()
+        except (AttributeError, ValueError):
+            return os.path.getmtime(log_path)
+
+    def rotate(self, log_path: str):
+        """This method allows to move the purchases of a log into a new segment.
+
+        The segment is written under a temporary name and renamed when
+        complete, then the log is emptied and the old segments beyond the
+        retention are removed.
+
+        Args:
+            log_path (str): The path of the log; it may be open in append
+                mode, but nothing must be written to it meanwhile.
+
+        Returns:
+            The path of the new segment, or None if the log was empty.
+        """
+        if not os.path.exists(log_path) or os.path.getsize(log_path) == 0:
+            return None
+        os.makedirs(self.__directory, exist_ok=True)
+        segments = list_segments(self.__directory)
+        number = int(SEGMENT_NAME.match(os.path.basename(segments[-1])).group(1)) + 1 if segments else 1
+        segment_path = os.path.join(self.__directory, f"purchases-{number:06d}.seg")
+        temporary = segment_path + ".tmp"
+        write_segment(log_path, temporary, self.__level)
+        os.replace(temporary, segment_path)
+        with open(log_path, "r+b") as log:
+            log.truncate(0)
+        self.__apply_retention()
+        return segment_path
+
+    def segments(self, start: str = None, end: str = None) -> list[tuple[str, SegmentFooter]]:
+        """This method allows to get the segments that may have purchases in a range of dates.
+
+        Only the footers are read. The dates are compared as ISO format
+        strings, so a prefix like a day or a month can be used.
+
+        Args:
+            start (str): The first date of the range, included, or None.
+            end (str): The last date of the range, excluded, or None.
+
+        Returns:
+            A list with the path and footer of the segments, oldest first.
+        """
+        found = []
+        for path in list_segments(self.__directory):
+            footer = read_footer(path)
+            if overlaps(footer, start, end):
+                found.append((path, footer))
+        return found
+
+    def records(self, start: str = None, end: str = None):
+        """This method allows to read the purchases of the segments in a range of dates.
+
+        Args:
+            start (str): The first date of the range, included, or None.
+            end (str): The last date of the range, excluded, or None.
+
+        Yields:
+            The purchase records in the range, oldest segment first.
+        """
+        for path, _ in self.segments(start, end):
+            for record in iter_segment(path):
+                date = record.date.isoformat(" ")
+                if (start is None or date >= start) and (end is None or date < end):
+                    yield record
+
+    def __apply_retention(self):
+        """This method removes the oldest segments beyond the retention."""
+        segments = list_segments(self.__directory)
+        if self.__max_segments is not None:
+            while len(segments) > self.__max_segments:
+                os.remove(segments.pop(0))
+        if self.__max_total_bytes is not None:
+            total = sum(os.path.getsize(path) for path in segments)
+            while len(segments) > 1 and total > self.__max_total_bytes:
+                path = segments.pop(0)
+                total -= os.path.getsize(path)
+                os.remove(path)
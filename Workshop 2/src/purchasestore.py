@@ -0,0 +1,571 @@
+"""
+This module has a class to store the purchases as indexed records.
+
+Author: Cristian Andres Gamez Nuñez <cagamezn@udistrital.edu.co>
+
+This file is part of Workshop-SM-UD.
+
+Workshop-SM-UD is free software: you can redistribute it and/or
+modify it under the terms of the GNU General Public License as
+published by the Free Software Foundation, either version 3 of
+the License, or (at your option) any later version.
+
+Workshop-SM-UD is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with Workshop-SM-UD. If not, see <https://www.gnu.org/licenses/>.
+"""
+import atexit
+import gzip
+import hashlib
+import json
+import os
+import re
+from array import array
+from bisect import bisect_left, insort
+from bloomfilter import BloomFilter
+from purchasejournal import LOG_DIRECTORY, RETAIN_SEGMENTS, ROTATE_BYTES, SYNC_POLICIES, FileLock
+
+DEFAULT_STORE_PATH = os.path.join(LOG_DIRECTORY, "purchases")
+DATA_FILE = "purchases.jsonl"
+INDEX_FILE = "purchases.idx"
+KEYS_FILE = "purchases.keys"
+SEGMENT_NAME = re.compile(r"^purchases-(\d{6})\.jsonl\.gz$")
+
+_default_stores = {}
+
+
+class PurchaseStore:
+    """This class represents a store of purchases with a sidecar index.
+
+    Every purchase is a JSON object in a line of the data file. Every
+    line of the index file tells where a purchase starts in the data
+    file, its length, date, client email, machine type and key. The
+    index is loaded in memory when the store is opened: the positions in
+    arrays, the emails and machine types in dictionaries of record
+    numbers and the dates in a sorted list, so finding the purchases of
+    an email, a machine type, a day or a range of dates reads only those
+    purchases.
+
+    Several processes can share the store. The purchases are appended
+    while holding a FileLock of the data file: the entries the other
+    processes added to the index are loaded first, the offset of the
+    purchase is the size of the data file, and the purchase and its
+    entry are written before the lock is released. If the index is
+    behind the data file, as after a crash between both writes, the
+    missing entries are rebuilt from the data file, and the end of a
+    file cut by a crash is dropped. The queries also load the entries
+    of the other processes first. The sync policy tells when the files
+    are forced to disk with fsync, like in PurchaseJournal. The default
+    directory is purchases inside the PURCHASE_LOG_DIR environment
+    variable or the working directory.
+
+    A purchase may carry an idempotency key, so a retried order is not
+    stored twice. The keys are kept in a Bloom filter of key_capacity
+    keys and, as 64-bit fingerprints, in an array with the positions: a
+    new key is almost never in the filter and is accepted at once, and
+    when the filter may have it the fingerprints of all the purchases
+    are compared in memory. Only a purchase whose fingerprint matches is
+    read, to check its key exactly. A key is unique in the whole store,
+    whatever the client, like in SQLitePurchaseStore.
+
+    With max_bytes, a data file that reached that size is rotated before
+    the next write: it is compressed into a segment of the segments
+    directory of the store, the keys of its purchases are kept in a keys
+    file, and the store starts again with empty files, so the indexes in
+    memory stay bounded. Only the newest max_segments segments are kept.
+    The queries read the purchases since the last rotation, and a key is
+    also checked against the keys of the previous data file, so a retry
+    is caught across a rotation. The other processes notice the new files
+    when they load the index.
+    """
+
+    def __init__(self, path: str = DEFAULT_STORE_PATH, sync: str = "close",
+                 key_capacity: int = 1_000_000, max_bytes: int = None, max_segments: int = None):
+        if sync not in SYNC_POLICIES:
+            raise ValueError(f"The sync policy must be one of {', '.join(SYNC_POLICIES)}.")
+        if max_bytes is not None and max_bytes < 1:
+            raise ValueError("The maximum size of the store must be greater than 0.")
+        os.makedirs(path, exist_ok=True)
+        self.__path = path
+        self.__data_path = os.path.join(path, DATA_FILE)
+        self.__index_path = os.path.join(path, INDEX_FILE)
+        self.__keys_path = os.path.join(path, KEYS_FILE)
+        self.__segments_path = os.path.join(path, "segments")
+        self.__sync = sync
+        self.__key_capacity = key_capacity
+        self.__max_bytes = max_bytes
+        self.__max_segments = max_segments
+        self.__data_fd = self.__index_fd = None
+        self.__open()
+        self.__file_lock = FileLock(self.__data_path)
+        with self.__file_lock:
+            self.__load()
+        atexit.register(self.close)
+
+    def __len__(self) -> int:
+        self.__refresh()
+        return len(self.__offsets)
+
+    @property
+    def path(self) -> str:
+        """This property returns the directory of the store.
+
+        Returns:
+            A string with the path of the directory.
+        """
+        return self.__path
+
+    @property
+    def closed(self) -> bool:
+        """This property tells if the store was closed.
+
+        Returns:
+            True if no more purchases can be added.
+        """
+        return self.__data_fd is None
+
+    def append(self, purchase: dict) -> int:
+        """This method allows to add a purchase to the store.
+
+        Args:
+            purchase (dict): The purchase, with at least the date, the
+                email and the machine_type, and optionally its key.
+
+        Returns:
+            An integer with the record number of the purchase.
+
+        Raises:
+            ValueError: If the store is closed, the purchase misses a
+                field of the index or a purchase with the same key is
+                already stored.
+        """
+        return self.append_many([purchase])[0]
+
+    def append_many(self, purchases: list[dict]) -> range:
+        """This method allows to add several purchases with a single write.
+
+        Args:
+            purchases (list[dict]): The purchases, with at least the date,
+                the email and the machine_type, and optionally their keys.
+
+        Returns:
+            A range with the record numbers of the purchases.
+
+        Raises:
+            ValueError: If the store is closed, a purchase misses a field
+                of the index or its key is repeated or already stored. In
+                that case no purchase is added.
+        """
+        lines = []
+        keys = set()
+        for purchase in purchases:
+            for field in ("date", "email", "machine_type"):
+                if field not in purchase:
+                    raise ValueError(f"The purchase has no {field}.")
+            key = purchase.get("key")
+            if key is not None:
+                if key in keys:
+                    raise ValueError(f"The purchase {key} has already been made.")
+                keys.add(key)
+            lines.append(json.dumps(purchase, ensure_ascii=False, separators=(",", ":")).encode("utf-8") + b"\n")
+
+        with self.__file_lock:
+            if self.__data_fd is None:
+                raise ValueError("The purchase store is closed.")
+            self.__load()
+            if self.__max_bytes is not None and self.__size >= self.__max_bytes:
+                self.__rotate()
+            for purchase in purchases:
+                key = purchase.get("key")
+                if key is not None and self.__has_key(key):
+                    raise ValueError(f"The purchase {key} has already been made.")
+            entries = []
+            offset = self.__size
+            for purchase, line in zip(purchases, lines):
+                entries.append([offset, len(line), purchase["date"], purchase["email"],
+                                purchase["machine_type"], purchase.get("key")])
+                offset += len(line)
+            index = "".join(json.dumps(entry, ensure_ascii=False) + "\n" for entry in entries).encode("utf-8")
+            self.__write(self.__data_fd, b"".join(lines))
+            self.__write(self.__index_fd, index)
+            if self.__sync == "flush":
+                os.fsync(self.__data_fd)
+                os.fsync(self.__index_fd)
+            first = len(self.__offsets)
+            for entry in entries:
+                self.__add_entry(*entry)
+            self.__index_size += len(index)
+        return range(first, first + len(entries))
+
+    def has_key(self, key: str, email: str = None) -> bool:
+        """This method tells if a purchase with an idempotency key is stored.
+
+        Args:
+            key (str): The idempotency key of the purchase.
+            email (str): The email of the client; the keys are unique in
+                the whole store, so it is not needed.
+
+        Returns:
+            True if a purchase has the key.
+        """
+        self.__refresh()
+        return self.__has_key(key)
+
+    def get(self, number: int) -> dict:
+        """This method allows to read a purchase by its record number.
+
+        Args:
+            number (int): The record number of the purchase.
+
+        Returns:
+            A dictionary with the purchase.
+
+        Raises:
+            ValueError: If there is no purchase with the number.
+        """
+        self.__refresh()
+        if not 0 <= number < len(self.__offsets):
+            raise ValueError(f"Purchase {number} is not in the store.")
+        return self.__read([number])[0]
+
+    def by_email(self, email: str) -> list[dict]:
+        """This method allows to get the purchases of a client.
+
+        Args:
+            email (str): The email of the client.
+
+        Returns:
+            A list with the purchases in the order they were made.
+        """
+        self.__refresh()
+        return self.__read(self.__by_email.get(email, ()))
+
+    def by_machine_type(self, machine_type: str) -> list[dict]:
+        """This method allows to get the purchases of a machine type.
+
+        Args:
+            machine_type (str): The name of the machine class.
+
+        Returns:
+            A list with the purchases in the order they were made.
+        """
+        self.__refresh()
+        return self.__read(self.__by_type.get(machine_type, ()))
+
+    def by_date(self, day: str) -> list[dict]:
+        """This method allows to get the purchases of a day.
+
+        Args:
+            day (str): The day in YYYY-MM-DD format.
+
+        Returns:
+            A list with the purchases of the day, ordered by date.
+        """
+        return self.between(day, day + "\uffff")
+
+    def between(self, start: str, end: str) -> list[dict]:
+        """This method allows to get the purchases in a range of dates.
+
+        The dates are compared as ISO format strings, so a prefix like
+        a day or a month can be used.
+
+        Args:
+            start (str): The first date of the range, included.
+            end (str): The last date of the range, excluded.
+
+        Returns:
+            A list with the purchases in the range, ordered by date.
+        """
+        self.__refresh()
+        low = bisect_left(self.__by_date, (start,))
+        high = bisect_left(self.__by_date, (end,))
+        return self.__read([number for _, number in self.__by_date[low:high]])
+
+    def segments(self) -> list[str]:
+        """This method returns the segments of the purchases before the last rotation.
+
+        Returns:
+            A list with the paths of the compressed data files, oldest first.
+        """
+        if not os.path.isdir(self.__segments_path):
+            return []
+        segments = sorted((int(match.group(1)), name) for name in os.listdir(self.__segments_path)
+                          for match in [SEGMENT_NAME.match(name)] if match)
+        return [os.path.join(self.__segments_path, name) for _, name in segments]
+
+    def flush(self):
+        """This method allows to force the stored purchases to disk."""
+        with self.__file_lock:
+            if self.__data_fd is not None:
+                os.fsync(self.__data_fd)
+                os.fsync(self.__index_fd)
+
+    def close(self):
+        """This method allows to close the files, forcing them to disk unless the policy is never."""
+        with self.__file_lock:
+            if self.__data_fd is None:
+                return
+            if self.__sync != "never":
+                os.fsync(self.__data_fd)
+                os.fsync(self.__index_fd)
+            os.close(self.__data_fd)
+            os.close(self.__index_fd)
+            self.__data_fd = self.__index_fd = None
+        self.__file_lock.close()
+        atexit.unregister(self.close)
+
+    def __enter__(self) -> "PurchaseStore":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def __has_key(self, key: str) -> bool:
+        """This method tells if a purchase has a key.
+
+        Args:
+            key (str): The idempotency key of the purchase.
+
+        Returns:
+            True if a purchase has the key.
+        """
+        if key not in self.__keys:
+            return False
+        fingerprint = _fingerprint(key)
+        fingerprints = self.__key_fingerprints
+        matches = []
+        try:
+            while True:
+                matches.append(fingerprints.index(fingerprint, matches[-1] + 1 if matches else 0))
+        except ValueError:
+            pass
+        if any(purchase.get("key") == key for purchase in self.__read(matches)):
+            return True
+        if not os.path.exists(self.__keys_path):
+            return False
+        with open(self.__keys_path, "rb") as file:
+            return b"\n" + key.encode("utf-8") + b"\n" in b"\n" + file.read()
+
+    def __add_entry(self, offset: int, length: int, date: str, email: str, machine_type: str,
+                    key: str = None) -> int:
+        """This method adds a purchase to the indexes in memory.
+
+        The entries written before the keys were added have no key.
+
+        Returns:
+            An integer with the record number of the purchase.
+        """
+        number = len(self.__offsets)
+        self.__offsets.append(offset)
+        self.__lengths.append(length)
+        self.__key_fingerprints.append(0 if key is None else _fingerprint(key))
+        self.__by_email.setdefault(email, []).append(number)
+        self.__by_type.setdefault(machine_type, []).append(number)
+        if not self.__by_date or self.__by_date[-1] <= (date, number):
+            self.__by_date.append((date, number))
+        else:
+            insort(self.__by_date, (date, number))
+        if key is not None:
+            self.__keys.add(key)
+        self.__size = offset + length
+        return number
+
+    def __refresh(self):
+        """This method loads the entries other processes added to the index."""
+        if self.__index_fd is None:
+            return
+        stat = os.fstat(self.__index_fd)
+        if stat.st_size != self.__index_size or os.stat(self.__index_path).st_ino != stat.st_ino:
+            with self.__file_lock:
+                if self.__index_fd is not None:
+                    self.__load()
+
+    def __open(self):
+        """This method opens the files of the store and empties the indexes in memory.
+
+        The keys of the previous data file are added to the Bloom filter.
+        """
+        for fd in (self.__data_fd, self.__index_fd):
+            if fd is not None:
+                os.close(fd)
+        flags = os.O_RDWR | os.O_APPEND | os.O_CREAT | getattr(os, "O_BINARY", 0)
+        self.__data_fd = os.open(self.__data_path, flags, 0o666)
+        self.__index_fd = os.open(self.__index_path, flags, 0o666)
+        self.__offsets = array("q")
+        self.__lengths = array("q")
+        self.__key_fingerprints = array("q")  # 0 for the purchases without a key
+        self.__by_email = {}  # email -> record numbers
+        self.__by_type = {}  # machine type -> record numbers
+        self.__by_date = []  # sorted (date, record number)
+        self.__keys = BloomFilter(self.__key_capacity)
+        self.__size = 0  # bytes of the data file with an index entry
+        self.__index_size = 0  # bytes of the index file loaded
+        if os.path.exists(self.__keys_path):
+            with open(self.__keys_path, "rb") as file:
+                for line in file:
+                    self.__keys.add(line.rstrip(b"\n").decode("utf-8"))
+
+    def __rotate(self):
+        """This method moves the data file into a new segment; the file lock must be held.
+
+        The segment and the keys file are written under temporary names
+        and renamed when complete, then the data and index files are
+        replaced by empty ones and the oldest segments beyond the
+        retention are removed.
+        """
+        os.makedirs(self.__segments_path, exist_ok=True)
+        segments = self.segments()
+        number = int(SEGMENT_NAME.match(os.path.basename(segments[-1])).group(1)) + 1 if segments else 1
+        segment_path = os.path.join(self.__segments_path, f"purchases-{number:06d}.jsonl.gz")
+        keys = []
+        with open(self.__data_path, "rb") as data, gzip.open(segment_path + ".tmp", "wb") as segment:
+            for line in data:
+                segment.write(line)
+                key = json.loads(line).get("key")
+                if key is not None:
+                    keys.append(key + "\n")
+        os.replace(segment_path + ".tmp", segment_path)
+        with open(self.__keys_path + ".tmp", "w", encoding="utf-8", newline="\n") as file:
+            file.writelines(keys)
+        os.replace(self.__keys_path + ".tmp", self.__keys_path)
+        for path in (self.__data_path, self.__index_path):
+            open(path + ".tmp", "wb").close()
+            os.replace(path + ".tmp", path)
+        self.__open()
+        if self.__max_segments is not None:
+            for path in segments[:max(0, len(segments) + 1 - self.__max_segments)]:
+                os.remove(path)
+
+    def __load(self):
+        """This method loads the new entries of the index file; the file lock must be held.
+
+        An entry must start where the previous purchase ends, so the
+        entries cut by a crash or pointing to other bytes are dropped and
+        rebuilt with the entries the data file has and the index misses.
+        The data file is cut at the first purchase that can not be read,
+        like the end of a purchase cut by a crash.
+        When another process rotated the store, the new files are opened.
+        """
+        if os.stat(self.__data_path).st_ino != os.fstat(self.__data_fd).st_ino:
+            self.__open()
+        data_size = os.fstat(self.__data_fd).st_size
+        index_size = os.fstat(self.__index_fd).st_size
+        if index_size != self.__index_size:
+            valid = self.__index_size
+            with open(self.__index_path, "rb") as file:
+                file.seek(valid)
+                for line in file:
+                    try:
+                        entry = json.loads(line) if line.endswith(b"\n") else None
+                    except ValueError:
+                        entry = None
+                    if entry is None or entry[0] != self.__size or entry[0] + entry[1] > data_size:
+                        break
+                    self.__add_entry(*entry)
+                    valid += len(line)
+            self.__truncate(self.__index_fd, index_size, valid)
+            self.__index_size = valid
+        if data_size == self.__size:
+            return
+
+        missing = []
+        with open(self.__data_path, "rb") as file:
+            file.seek(self.__size)
+            offset = self.__size
+            for line in file:
+                try:
+                    purchase = json.loads(line) if line.endswith(b"\n") else None
+                    entry = [offset, len(line), purchase["date"], purchase["email"], purchase["machine_type"],
+                             purchase.get("key")]
+                except (ValueError, TypeError, KeyError):  # cut by a crash or corrupted
+                    break
+                self.__add_entry(*entry)
+                missing.append(json.dumps(entry, ensure_ascii=False) + "\n")
+                offset += len(line)
+        self.__truncate(self.__data_fd, data_size, self.__size)
+        if missing:
+            index = "".join(missing).encode("utf-8")
+            self.__write(self.__index_fd, index)
+            self.__index_size += len(index)
+
+    @staticmethod
+    def __truncate(fd: int, size: int, valid: int):
+        """This method drops the end of a file cut by a crash.
+
+        Args:
+            fd (int): The file descriptor of the file.
+            size (int): The length of the file.
+            valid (int): The length of the valid part of the file.
+        """
+        if size > valid:
+            os.ftruncate(fd, valid)
+
+    @staticmethod
+    def __write(fd: int, data: bytes):
+        """This method writes all the bytes to a file opened in append mode.
+
+        Args:
+            fd (int): The file descriptor of the file.
+            data (bytes): The bytes to write.
+        """
+        view = memoryview(data)
+        while view:
+            view = view[os.write(fd, view):]
+
+    def __read(self, numbers) -> list[dict]:
+        """This method reads some purchases from the data file.
+
+        The purchases are read in the order of the file, so the reads go
+        forward, and returned in the given order.
+
+        Args:
+            numbers: The record numbers of the purchases.
+
+        Returns:
+            A list with the purchases.
+        """
+        if not numbers:
+            return []
+        purchases = {}
+        with open(self.__data_path, "rb") as file:
+            for number in sorted(numbers):
+                file.seek(self.__offsets[number])
+                purchases[number] = json.loads(file.read(self.__lengths[number]))
+        return [purchases[number] for number in numbers]
+
+
+def _fingerprint(key: str) -> int:
+    """This function returns the 64-bit fingerprint of an idempotency key.
+
+    Args:
+        key (str): The idempotency key.
+
+    Returns:
+        A signed integer that fits in an array of type q.
+    """
+    return int.from_bytes(hashlib.blake2b(key.encode("utf-8"), digest_size=8).digest(), "big", signed=True)
+
+
+def default_store(path: str = DEFAULT_STORE_PATH) -> PurchaseStore:
+    """This function returns the store shared by the purchases of a directory.
+
+    The store is opened the first time and again if it was closed. Like
+    the journal, it is rotated when its data file reaches the
+    PURCHASE_ROTATE_BYTES environment variable and keeps the newest
+    PURCHASE_RETAIN_SEGMENTS segments; 0 turns a limit off.
+
+    Args:
+        path (str): The directory of the store.
+
+    Returns:
+        The purchase store of the directory.
+    """
+    store = _default_stores.get(path)
+    if store is None or store.closed:
+        store = _default_stores[path] = PurchaseStore(path, max_bytes=ROTATE_BYTES or None,
+                                                      max_segments=RETAIN_SEGMENTS or None)
+    return store
@@ -0,0 +1,230 @@
+"""
+This module has a class to cache the quotes of machine configurations.
+
+Author: Cristian Andres Gamez Nuñez <cagamezn@udistrital.edu.co>
+
+This file is part of Workshop-SM-UD.
+
+Workshop-SM-UD is free software: you can redistribute it and/or
+modify it under the terms of the GNU General Public License as
+published by the Free Software Foundation, either version 3 of
+the License, or (at your option) any later version.
+
+Workshop-SM-UD is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with Workshop-SM-UD. If not, see <https://www.gnu.org/licenses/>.
+"""
+import threading
+import time
+from collections import OrderedDict
+from machines import Machine, VirtualRealityMachine
+
+
+class QuoteCache:
+    """This class represents a least recently used cache of quotes.
+
+    The quotes are indexed by a canonical key of the configuration: the
+    machine type, the material, the sorted codes of the videogames with
+    the price each one had when it was added to the machine, which is
+    the price the machine is calculated with, and the glasses options of
+    virtual reality machines. The cache keeps at
+    most max_size quotes, each one for at most ttl seconds, and a reverse
+    index from videogame codes to keys, so a change in a videogame only
+    drops the quotes that include it.
+
+    The cache is shared by the threads of the application, like the
+    purchase pipeline and the listeners of the catalog, so every access
+    to the entries is made while holding a lock. The price of a quote
+    that is not cached is calculated without the lock, so the cache
+    keeps a generation for every videogame, increased when the videogame
+    is invalidated, and a quote is only cached if the generations of its
+    videogames did not change while it was calculated.
+    """
+
+    def __init__(self, max_size: int = 1024, ttl: float = 300.0, clock=time.monotonic):
+        if max_size < 1:
+            raise ValueError("The size of the cache must be greater than 0.")
+        self.__max_size = max_size
+        self.__ttl = ttl
+        self.__clock = clock
+        self.__lock = threading.Lock()
+        self.__entries = OrderedDict()  # key -> (expiration, quote)
+        self.__keys_by_code = {}  # code -> set of keys
+        self.__generations = {}  # code -> times the videogame was invalidated
+        self.__generation = 0  # times the cache was cleared
+        self.__stats = {
+            "hits": 0,
+            "misses": 0,
+            "evictions": 0,
+            "expirations": 0,
+            "invalidations": 0,
+        }
+
+    def __len__(self) -> int:
+        return len(self.__entries)
+
+    @staticmethod
+    def key(machine_type: str, material: str, videogames, glasses: tuple = None) -> tuple:
+        """This method builds the canonical key of a configuration.
+
+        Args:
+            machine_type (str): The name of the machine class.
+            material (str): The material of the machine.
+            videogames: The code and the price of each videogame of the machine.
+            glasses (tuple): The glasses type, resolution and price, or None.
+
+        Returns:
+            A tuple that identifies the configuration.
+        """
+        return (machine_type, material, tuple(sorted(videogames)), glasses)
+
+    @staticmethod
+    def key_for(machine: Machine) -> tuple:
+        """This method builds the canonical key of a machine.
+
+        Args:
+            machine (Machine): The machine to quote.
+
+        Returns:
+            A tuple that identifies the configuration of the machine.
+        """
+        glasses = None
+        if isinstance(machine, VirtualRealityMachine):
+            glasses = (machine.glasses_type, tuple(machine.glasses_resolution), machine.glasses_price)
+        return QuoteCache.key(type(machine).__name__, machine.material, machine.get_videogame_prices(), glasses)
+
+    def get(self, key: tuple):
+        """This method returns a cached quote.
+
+        Args:
+            key (tuple): The key of the configuration.
+
+        Returns:
+            The cached quote or None if it is not cached or has expired.
+        """
+        with self.__lock:
+            entry = self.__entries.get(key)
+            if entry is not None:
+                if entry[0] > self.__clock():
+                    self.__entries.move_to_end(key)
+                    self.__stats["hits"] += 1
+                    return entry[1]
+                self.__discard(key)
+                self.__stats["expirations"] += 1
+            self.__stats["misses"] += 1
+            return None
+
+    def put(self, key: tuple, quote, generations: tuple = None):
+        """This method caches a quote, evicting the least recently used one if full.
+
+        Args:
+            key (tuple): The key of the configuration.
+            quote: The quote to cache.
+            generations (tuple): The generations the quote was calculated
+                with, from generations(), or None to always cache it.
+        """
+        with self.__lock:
+            if generations is not None and generations != self.__generations_of(key):
+                return  # a videogame was invalidated while the quote was calculated
+            if key in self.__entries:
+                self.__discard(key)
+            elif len(self.__entries) >= self.__max_size:
+                self.__discard(next(iter(self.__entries)))
+                self.__stats["evictions"] += 1
+            self.__entries[key] = (self.__clock() + self.__ttl, quote)
+            for code, _ in key[2]:
+                self.__keys_by_code.setdefault(code, set()).add(key)
+
+    def quote(self, machine: Machine):
+        """This method returns the price of a machine, calculating it if not cached.
+
+        Args:
+            machine (Machine): The machine to quote.
+
+        Returns:
+            The price of the machine.
+        """
+        key = self.key_for(machine)
+        quote = self.get(key)
+        if quote is None:
+            generations = self.generations(key)
+            quote = machine.calculate_price()
+            self.put(key, quote, generations)
+        return quote
+
+    def generations(self, key: tuple) -> tuple:
+        """This method returns the generations of the videogames of a configuration.
+
+        Args:
+            key (tuple): The key of the configuration.
+
+        Returns:
+            A tuple that changes when the cache is cleared or a videogame
+            of the configuration is invalidated.
+        """
+        with self.__lock:
+            return self.__generations_of(key)
+
+    def invalidate(self, code: int):
+        """This method drops the quotes that include a videogame.
+
+        It is meant to be registered as a listener of the catalog.
+
+        Args:
+            code (int): The code of the videogame that changed.
+        """
+        with self.__lock:
+            self.__generations[code] = self.__generations.get(code, 0) + 1
+            for key in list(self.__keys_by_code.get(code, ())):
+                self.__discard(key)
+                self.__stats["invalidations"] += 1
+
+    def clear(self):
+        """This method drops all the quotes."""
+        with self.__lock:
+            self.__entries.clear()
+            self.__keys_by_code.clear()
+            self.__generation += 1
+
+    def stats(self) -> dict:
+        """This method returns the statistics of the cache.
+
+        Returns:
+            A dictionary with the hits, misses, evictions, expirations,
+            invalidations, hit ratio and size of the cache.
+        """
+        with self.__lock:
+            stats = dict(self.__stats)
+            stats["size"] = len(self.__entries)
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_ratio"] = stats["hits"] / lookups if lookups else 0.0
+        return stats
+
+    def __discard(self, key: tuple):
+        """This method removes a quote and its entries in the reverse index; the lock must be held.
+
+        Args:
+            key (tuple): The key of the configuration.
+        """
+        del self.__entries[key]
+        for code, _ in key[2]:
+            keys = self.__keys_by_code.get(code)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self.__keys_by_code[code]
+
+    def __generations_of(self, key: tuple) -> tuple:
+        """This method returns the generations of a configuration; the lock must be held.
+
+        Args:
+            key (tuple): The key of the configuration.
+
+        Returns:
+            A tuple with the generation of the cache and of each videogame.
+        """
+        return (self.__generation,) + tuple(self.__generations.get(code, 0) for code, _ in key[2])
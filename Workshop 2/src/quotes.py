@@ -0,0 +1,200 @@
+"""
+This module has a class to quote many machine configurations at once.
+
+Author: Cristian Andres Gamez Nuñez <cagamezn@udistrital.edu.co>
+
+This file is part of Workshop-SM-UD.
+
+Workshop-SM-UD is free software: you can redistribute it and/or
+modify it under the terms of the GNU General Public License as
+published by the Free Software Foundation, either version 3 of
+the License, or (at your option) any later version.
+
+Workshop-SM-UD is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with Workshop-SM-UD. If not, see <https://www.gnu.org/licenses/>.
+"""
+from array import array
+from collections import OrderedDict
+from pricing import PricingRules, default_rules
+
+
+class BatchQuoter:
+    """This class represents a quoter of many machine configurations.
+
+    The price, weight and energy consumption of every machine type and
+    material pair come from the tables compiled by the pricing rules, so
+    quoting a configuration is a table lookup plus the price of its
+    games, which is also cached for bundles that repeat. The games are
+    quoted at their current price in the catalog, so the results are the
+    same as creating each machine now and calling calculate_price; a
+    machine created before a price changed keeps the price its games had
+    when they were added.
+
+    The game and bundle prices are kept in least recently used caches
+    of at most max_games and max_bundles entries, with a reverse index
+    from the videogame codes to the bundles, and the quoter listens to
+    the catalog, so a videogame that changes is forgotten at once with
+    only the bundles that include it.
+    """
+
+    def __init__(self, catalog, rules: PricingRules = None,
+                 max_games: int = 4096, max_bundles: int = 4096):
+        if max_games < 1 or max_bundles < 1:
+            raise ValueError("The size of the caches must be greater than 0.")
+        self.__catalog = catalog
+        self.__rules = rules if rules is not None else default_rules()
+        self.__max_games = max_games
+        self.__max_bundles = max_bundles
+        self.__game_prices = OrderedDict()
+        self.__bundle_prices = OrderedDict()
+        self.__bundles_by_code = {}  # code -> set of bundles
+        catalog.add_listener(self.invalidate)
+
+    def refresh(self):
+        """This method forgets the cached game prices."""
+        self.__game_prices.clear()
+        self.__bundle_prices.clear()
+        self.__bundles_by_code.clear()
+
+    def invalidate(self, code: int):
+        """This method forgets the cached price of a videogame.
+
+        It is registered as a listener of the catalog. The bundles that
+        include the videogame are dropped too, even if its own price was
+        already evicted.
+
+        Args:
+            code (int): The code of the videogame that changed.
+        """
+        self.__game_prices.pop(code, None)
+        for key in list(self.__bundles_by_code.get(code, ())):
+            self.__forget_bundle(key)
+
+    def encode(self, machine_types, materials) -> array:
+        """This method converts machine types and materials to table rows.
+
+        Args:
+            machine_types: A sequence with machine classes or class names.
+            materials: A sequence with the material of each configuration.
+
+        Returns:
+            An array with the row of each configuration in the tables.
+
+        Raises:
+            ValueError: If a machine type or a material is not available.
+        """
+        if len(machine_types) != len(materials):
+            raise ValueError("Every configuration needs a machine type and a material.")
+        row = self.__rules.row
+        return array("I", [row(machine_type if isinstance(machine_type, str) else machine_type.__name__,
+                               material)
+                           for machine_type, material in zip(machine_types, materials)])
+
+    def quote(self, machine_types, materials, bundles) -> tuple[array, array, array]:
+        """This method quotes many machine configurations in one pass.
+
+        Args:
+            machine_types: A sequence with machine classes or class names.
+            materials: A sequence with the material of each configuration.
+            bundles: A sequence with the videogame codes of each configuration.
+
+        Returns:
+            A tuple with three arrays: the prices, the weights and the
+            energy consumptions of the configurations.
+
+        Raises:
+            ValueError: If a machine type, a material or a videogame is
+                not available.
+        """
+        rows = self.encode(machine_types, materials)
+        if len(bundles) != len(rows):
+            raise ValueError("Every configuration needs a bundle of videogames.")
+        rules = self.__rules
+        prices = array("d", [rules.price(row) + self.bundle_price(bundle) for row, bundle in zip(rows, bundles)])
+        weights = array("d", map(rules.weight, rows))
+        energies = array("d", map(rules.energy, rows))
+        return prices, weights, energies
+
+    def bundle_price(self, codes) -> float:
+        """This method returns the price of a bundle of videogames.
+
+        Args:
+            codes: The codes of the videogames in the bundle.
+
+        Returns:
+            A float with the sum of the prices of the videogames.
+
+        Raises:
+            ValueError: If a videogame is not in the catalog or is
+                repeated in the bundle.
+        """
+        key = tuple(codes)
+        price = self.__bundle_prices.get(key)
+        if price is None:
+            if len(set(key)) != len(key):
+                code = next(code for code in key if key.count(code) > 1)
+                raise ValueError(f"VideoGame with code {code} is already in the bundle.")
+            price = 0
+            for code in key:
+                price += self.__game_price(code)
+            if len(self.__bundle_prices) >= self.__max_bundles:
+                self.__forget_bundle(next(iter(self.__bundle_prices)))
+            self.__bundle_prices[key] = price
+            for code in key:
+                self.__bundles_by_code.setdefault(code, set()).add(key)
+        else:
+            self.__bundle_prices.move_to_end(key)
+        return price
+
+    def __game_price(self, code: int) -> float:
+        """This method returns the price of a videogame of the catalog.
+
+        Args:
+            code (int): The code of the videogame.
+
+        Returns:
+            A float with the price of the videogame.
+        """
+        price = self.__game_prices.get(code)
+        if price is None:
+            videogame = self.__catalog.search_by_code(code)
+            if videogame is None:
+                raise ValueError(f"VideoGame with code {code} is not in the catalog.")
+            price = videogame.price
+            self.__remember(self.__game_prices, code, price, self.__max_games)
+        else:
+            self.__game_prices.move_to_end(code)
+        return price
+
+    def __forget_bundle(self, key: tuple):
+        """This method removes a bundle price and its entries in the reverse index.
+
+        Args:
+            key (tuple): The codes of the bundle.
+        """
+        del self.__bundle_prices[key]
+        for code in key:
+            bundles = self.__bundles_by_code.get(code)
+            if bundles is not None:
+                bundles.discard(key)
+                if not bundles:
+                    del self.__bundles_by_code[code]
+
+    @staticmethod
+    def __remember(cache: OrderedDict, key, price: float, max_size: int):
+        """This method caches a price, evicting the least recently used one if full.
+
+        Args:
+            cache (OrderedDict): The cache of prices.
+            key: The key of the price.
+            price (float): The price to cache.
+            max_size (int): The maximum number of prices of the cache.
+        """
+        if len(cache) >= max_size:
+            cache.popitem(last=False)
+        cache[key] = price
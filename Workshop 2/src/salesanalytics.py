@@ -0,0 +1,368 @@
+"""
+This module has a command to compute the sales analytics of purchase logs.
+
+Usage:
+    python salesanalytics.py purchase.txt [segments] [--workers 4] [--top 5]
+                             [--state analytics.json] [--since 2024-01 --until 2025-01]
+
+Author: Cristian Andres Gamez Nuñez <cagamezn@udistrital.edu.co>
+
+This file is part of Workshop-SM-UD.
+
+Workshop-SM-UD is free software: you can redistribute it and/or
+modify it under the terms of the GNU General Public License as
+published by the Free Software Foundation, either version 3 of
+the License, or (at your option) any later version.
+
+Workshop-SM-UD is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with Workshop-SM-UD. If not, see <https://www.gnu.org/licenses/>.
+"""
+import argparse
+import hashlib
+import json
+import os
+from heapq import nlargest
+from multiprocessing import Pool
+from purchaselog import PurchaseRecord, complete_end, iter_records, split
+from purchasesegments import iter_chunks, iter_segment, list_segments, overlaps, read_footer
+
+HEAD_SIZE = 4096  # bytes of the start of a log that tell it apart
+
+
+class SalesSummary:
+    """This class represents the sales totals of some purchases.
+
+    The totals are sums and counts, so the summaries of separate parts
+    of the logs can be merged into the summary of the whole logs.
+    """
+
+    def __init__(self):
+        self.purchases = 0
+        self.games_sold = 0
+        self.revenue = 0.0
+        self.by_material = {}  # material -> revenue
+        self.by_month = {}  # YYYY-MM -> revenue
+        self.by_game = {}  # game name -> revenue
+        self.units_by_game = {}  # game name -> units sold
+
+    def add(self, record: PurchaseRecord):
+        """This method allows to add a purchase to the totals.
+
+        Args:
+            record (PurchaseRecord): The purchase.
+        """
+        self.purchases += 1
+        self.games_sold += len(record.games)
+        self.revenue += record.total_price
+        self.by_material[record.material] = self.by_material.get(record.material, 0.0) + record.total_price
+        month = f"{record.date.year:04d}-{record.date.month:02d}"
+        self.by_month[month] = self.by_month.get(month, 0.0) + record.total_price
+        for game in record.games:
+            self.by_game[game.name] = self.by_game.get(game.name, 0.0) + game.price
+            self.units_by_game[game.name] = self.units_by_game.get(game.name, 0) + 1
+
+    def merge(self, other: "SalesSummary"):
+        """This method allows to add the totals of another summary.
+
+        Args:
+            other (SalesSummary): The summary to add.
+        """
+        self.purchases += other.purchases
+        self.games_sold += other.games_sold
+        self.revenue += other.revenue
+        for totals, other_totals in ((self.by_material, other.by_material),
+                                     (self.by_month, other.by_month),
+                                     (self.by_game, other.by_game),
+                                     (self.units_by_game, other.units_by_game)):
+            for key, value in other_totals.items():
+                totals[key] = totals.get(key, 0) + value
+
+    def top_games(self, count: int = 5) -> list[tuple[str, float]]:
+        """This method returns the games with the most revenue.
+
+        Args:
+            count (int): The number of games.
+
+        Returns:
+            A list with the name and revenue of the games, from the most.
+        """
+        return nlargest(count, self.by_game.items(), key=lambda item: (item[1], item[0]))
+
+    def average_basket(self) -> float:
+        """This method returns the average number of games per purchase."""
+        return self.games_sold / self.purchases if self.purchases else 0.0
+
+    def average_price(self) -> float:
+        """This method returns the average total price of a purchase."""
+        return self.revenue / self.purchases if self.purchases else 0.0
+
+    def to_dict(self) -> dict:
+        """This method returns the totals as a dictionary that can be saved as JSON."""
+        return dict(vars(self))
+
+    @classmethod
+    def from_dict(cls, totals: dict) -> "SalesSummary":
+        """This method creates a summary from the totals saved by to_dict.
+
+        Args:
+            totals (dict): The totals of the summary.
+
+        Returns:
+            The summary.
+        """
+        summary = cls()
+        for key, value in totals.items():
+            if key not in vars(summary):
+                raise ValueError(f"The summary has an unknown total: {key}")
+            setattr(summary, key, value)
+        return summary
+
+    def report(self, top: int = 5) -> str:
+        """This method returns the totals as a text report.
+
+        Args:
+            top (int): The number of top games.
+
+        Returns:
+            A string with the report.
+        """
+        lines = [
+            f"Purchases: {self.purchases}",
+            f"Revenue: {self.revenue:.2f}",
+            f"Average price: {self.average_price():.2f}",
+            f"Average basket size: {self.average_basket():.2f} games",
+            "Revenue by material:",
+        ]
+        lines += [f"  {material}: {revenue:.2f}" for material, revenue in sorted(self.by_material.items())]
+        lines.append("Revenue by month:")
+        lines += [f"  {month}: {revenue:.2f}" for month, revenue in sorted(self.by_month.items())]
+        lines.append(f"Top {top} games:")
+        lines += [f"  {name}: {revenue:.2f} ({self.units_by_game[name]} sold)"
+                  for name, revenue in self.top_games(top)]
+        return "\n".join(lines)
+
+
+def summarize_part(path: str, start: int, end: int, since: str = None, until: str = None) -> SalesSummary:
+    """This function computes the summary of a byte range of a log or of a segment.
+
+    It is the map step, run by the worker processes.
+
+    Args:
+        path (str): The path of the log or segment.
+        start (int): The byte where a purchase starts, in the log of a
+            segment for a segment.
+        end (int): The byte where the range ends, or None for a segment,
+            which is read to its end.
+        since (str): The first date of the purchases summarized, or None.
+        until (str): The date where the purchases summarized end, or None.
+
+    Returns:
+        The summary of the purchases of the range.
+    """
+    summary = SalesSummary()
+    records = iter_segment(path, start=start) if end is None else iter_records(path, start, end)
+    for record in records:
+        if since is not None or until is not None:
+            date = record.date.isoformat(" ")
+            if (since is not None and date < since) or (until is not None and date >= until):
+                continue
+        summary.add(record)
+    return summary
+
+
+def expand(paths: list[str]) -> list[str]:
+    """This function replaces the directories of segments by their segments.
+
+    The paths that do not exist yet, like the directory of the segments
+    before the first rotation, are skipped.
+
+    Args:
+        paths (list[str]): The paths of logs, segments or directories.
+
+    Returns:
+        A list with the paths of the logs and segments.
+    """
+    expanded = []
+    for path in paths:
+        if os.path.isdir(path):
+            expanded += list_segments(path)
+        elif os.path.exists(path):
+            expanded.append(path)
+    return expanded
+
+
+def analyze(paths: list[str], workers: int = None, offsets: dict = None,
+            since: str = None, until: str = None) -> tuple[SalesSummary, dict]:
+    """This function computes the summary of some logs and segments.
+
+    The logs are split in ranges of whole purchases that are summarized
+    by a pool of processes, together with the segments, and merged. With
+    offsets, only the bytes after the offset of every log and of the log
+    of every segment are read, so the segments already read are skipped;
+    a log shorter than its offset was replaced, so it is read again from
+    the start. With a range of dates, the segments whose footer is out
+    of the range are skipped.
+
+    Args:
+        paths (list[str]): The paths of the logs, segments or directories
+            of segments.
+        workers (int): The number of processes, or None for one per core.
+        offsets (dict): The bytes already summarized of every log and segment.
+        since (str): The first date of the purchases summarized, or None.
+        until (str): The date where the purchases summarized end, or None.
+
+    Returns:
+        A tuple with the summary of the bytes read and the new offsets.
+    """
+    workers = workers or os.cpu_count() or 1
+    offsets = dict(offsets or {})
+    tasks = []
+    for path in expand(paths):
+        key = os.path.abspath(path)
+        if path.endswith(".seg"):
+            footer = read_footer(path)
+            start = offsets.get(key, 0)
+            if start > footer.size:
+                start = 0
+            if start < footer.size and overlaps(footer, since, until):
+                tasks.append((path, start, None, since, until))
+            offsets[key] = footer.size
+            continue
+        end = complete_end(path)
+        start = offsets.get(key, 0)
+        if start > end:
+            start = 0
+        tasks += [(path, range_start, range_end, since, until)
+                  for range_start, range_end in split(path, workers, start, end)]
+        offsets[key] = end
+
+    summary = SalesSummary()
+    if workers == 1 or len(tasks) <= 1:
+        parts = [summarize_part(*task) for task in tasks]
+    else:
+        with Pool(min(workers, len(tasks))) as pool:
+            parts = pool.starmap(summarize_part, tasks)
+    for part in parts:
+        summary.merge(part)
+    return summary, offsets
+
+
+def fingerprint(path: str, size: int) -> str:
+    """This function returns a digest of the first bytes of a log or of the log of a segment.
+
+    Args:
+        path (str): The path of the log or segment.
+        size (int): The number of bytes.
+
+    Returns:
+        A string with the digest, or an empty string if the log is
+        shorter than size.
+    """
+    if path.endswith(".seg"):
+        head = b""
+        for chunk in iter_chunks(path):
+            head += chunk
+            if len(head) >= size:
+                break
+    else:
+        with open(path, "rb") as file:
+            head = file.read(size)
+    return hashlib.blake2b(head[:size], digest_size=16).hexdigest() if len(head) >= size else ""
+
+
+def analyze_incremental(paths: list[str], state_path: str, workers: int = None) -> SalesSummary:
+    """This function updates the summary saved in a state file with the new purchases.
+
+    Only the bytes appended to the logs and the segments added since the
+    last run are read. The state file keeps the summary, the bytes read
+    of every log and segment, and a fingerprint of the start of every
+    log. A log whose start changed was rotated: the bytes already read
+    are in the first new segment that starts like it, so that segment is
+    only read after them, and the log is read from its start. When no
+    segment holds them, the old totals include purchases that are gone,
+    so every log and segment is read again.
+
+    Args:
+        paths (list[str]): The paths of the logs, segments or directories
+            of segments.
+        state_path (str): The path of the state file.
+        workers (int): The number of processes, or None for one per core.
+
+    Returns:
+        The summary of all the purchases of the logs.
+    """
+    summary = SalesSummary()
+    offsets = {}
+    fingerprints = {}
+    if os.path.exists(state_path):
+        with open(state_path, encoding="utf-8") as file:
+            state = json.load(file)
+        summary = SalesSummary.from_dict(state["summary"])
+        offsets = state["offsets"]
+        fingerprints = state.get("fingerprints", {})
+
+    paths = expand(paths)
+    logs = [path for path in paths if not path.endswith(".seg")]
+    segments = [path for path in paths if path.endswith(".seg")]
+    for path in logs:
+        key = os.path.abspath(path)
+        size, digest = fingerprints.get(key, (0, ""))
+        if not size or fingerprint(path, size) == digest:
+            continue
+        read = offsets.pop(key, 0)
+        rotated = next((segment for segment in segments if os.path.abspath(segment) not in offsets
+                        and fingerprint(segment, size) == digest), None)
+        if rotated is not None:
+            offsets[os.path.abspath(rotated)] = read
+        else:  # the old totals include purchases that are gone
+            summary = SalesSummary()
+            offsets = {}
+            break
+
+    new, offsets = analyze(paths, workers, offsets)
+    summary.merge(new)
+    fingerprints = {}
+    for path in logs:
+        size = min(HEAD_SIZE, offsets[os.path.abspath(path)])
+        fingerprints[os.path.abspath(path)] = (size, fingerprint(path, size))
+    temporary = state_path + ".tmp"
+    with open(temporary, "w", encoding="utf-8") as file:
+        json.dump({"offsets": offsets, "fingerprints": fingerprints, "summary": summary.to_dict()}, file)
+    os.replace(temporary, state_path)
+    return summary
+
+
+def main(arguments: list[str] = None):
+    """This function runs the analytics command.
+
+    Args:
+        arguments (list[str]): The command line arguments, or None to
+            read them from sys.argv.
+    """
+    parser = argparse.ArgumentParser(description="Compute the sales analytics of purchase logs.")
+    parser.add_argument("logs", nargs="+",
+                        help="purchase logs in the purchase.txt format, segments or directories of segments")
+    parser.add_argument("--workers", type=int, default=None, help="processes, one per core by default")
+    parser.add_argument("--top", type=int, default=5, help="number of top games")
+    parser.add_argument("--state", default=None,
+                        help="state file to only read the purchases added since the last run")
+    parser.add_argument("--since", default=None, help="first date of the purchases, like 2024-09")
+    parser.add_argument("--until", default=None, help="date where the purchases end, excluded")
+    options = parser.parse_args(arguments)
+
+    if options.state and (options.since or options.until):
+        parser.error("the state file can not be used with a range of dates")
+    if options.state:
+        summary = analyze_incremental(options.logs, options.state, options.workers)
+    else:
+        summary, _ = analyze(options.logs, options.workers, since=options.since, until=options.until)
+    print(summary.report(options.top))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,901 @@
+"""
+This module has classes to store the catalog, clients and purchases in SQLite.
+
+Author: Cristian Andres Gamez Nuñez <cagamezn@udistrital.edu.co>
+
+This file is part of Workshop-SM-UD.
+
+Workshop-SM-UD is free software: you can redistribute it and/or
+modify it under the terms of the GNU General Public License as
+published by the Free Software Foundation, either version 3 of
+the License, or (at your option) any later version.
+
+Workshop-SM-UD is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with Workshop-SM-UD. If not, see <https://www.gnu.org/licenses/>.
+"""
+import json
+import os
+import queue
+import sqlite3
+import threading
+from collections import Counter
+from contextlib import contextmanager
+from heapq import nsmallest
+from nameindex import EXACT, NAME_PREFIX, WORD_PREFIX, FUZZY, normalize, trigrams
+from users import Address, Client
+from videogames import VideoGame, add_price_listener, remove_price_listener
+import videogamescatalog
+
+DATABASE_PATH = os.environ.get("SHOP_DATABASE")
+STATEMENT_CACHE = 256
+CLIENT_BATCH_SIZE = 1000
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS videogames (
+    code INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    description TEXT NOT NULL,
+    price REAL NOT NULL,
+    category TEXT NOT NULL,
+    definition TEXT NOT NULL,
+    storytelling_creator TEXT NOT NULL,
+    graphics_creator TEXT NOT NULL,
+    year INTEGER NOT NULL,
+    name_key TEXT NOT NULL,
+    num_trigrams INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS videogames_category ON videogames (category);
+CREATE INDEX IF NOT EXISTS videogames_definition ON videogames (definition);
+CREATE INDEX IF NOT EXISTS videogames_storytelling ON videogames (storytelling_creator);
+CREATE INDEX IF NOT EXISTS videogames_graphics ON videogames (graphics_creator);
+CREATE INDEX IF NOT EXISTS videogames_price ON videogames (price);
+CREATE INDEX IF NOT EXISTS videogames_year ON videogames (year);
+CREATE TABLE IF NOT EXISTS videogame_tokens (
+    token TEXT NOT NULL,
+    code INTEGER NOT NULL,
+    PRIMARY KEY (token, code)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS videogame_tokens_code ON videogame_tokens (code);
+CREATE TABLE IF NOT EXISTS videogame_trigrams (
+    trigram TEXT NOT NULL,
+    code INTEGER NOT NULL,
+    PRIMARY KEY (trigram, code)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS videogame_trigrams_code ON videogame_trigrams (code);
+CREATE TABLE IF NOT EXISTS clients (
+    email TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    phones TEXT NOT NULL,
+    addresses TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS purchases (
+    number INTEGER PRIMARY KEY,
+    date TEXT NOT NULL,
+    email TEXT NOT NULL,
+    machine_type TEXT NOT NULL,
+    data TEXT NOT NULL,
+    key TEXT
+);
+CREATE INDEX IF NOT EXISTS purchases_email ON purchases (email, number);
+CREATE INDEX IF NOT EXISTS purchases_machine_type ON purchases (machine_type, number);
+CREATE INDEX IF NOT EXISTS purchases_date ON purchases (date, number);
+"""
+
+# The statements are constant strings with parameters, so every connection
+# prepares them once and reuses them from its statement cache.
+VIDEOGAME_COLUMNS = ("code, name, description, price, category, definition, "
+                     "storytelling_creator, graphics_creator, year")
+SELECT_VIDEOGAMES = f"SELECT {VIDEOGAME_COLUMNS} FROM videogames"
+SELECT_VIDEOGAME = SELECT_VIDEOGAMES + " WHERE code = ?"
+INSERT_VIDEOGAME = (f"INSERT INTO videogames ({VIDEOGAME_COLUMNS}, name_key, num_trigrams) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)")
+UPSERT_VIDEOGAME = INSERT_VIDEOGAME + (
+    " ON CONFLICT (code) DO UPDATE SET name = excluded.name, description = excluded.description,"
+    " price = excluded.price, category = excluded.category, definition = excluded.definition,"
+    " storytelling_creator = excluded.storytelling_creator, graphics_creator = excluded.graphics_creator,"
+    " year = excluded.year, name_key = excluded.name_key, num_trigrams = excluded.num_trigrams")
+DELETE_VIDEOGAME = "DELETE FROM videogames WHERE code = ?"
+UPDATE_PRICE = "UPDATE videogames SET price = ? WHERE code = ? AND price = ?"
+INSERT_TOKEN = "INSERT OR IGNORE INTO videogame_tokens (token, code) VALUES (?, ?)"
+DELETE_TOKENS = "DELETE FROM videogame_tokens WHERE code = ?"
+INSERT_TRIGRAM = "INSERT OR IGNORE INTO videogame_trigrams (trigram, code) VALUES (?, ?)"
+DELETE_TRIGRAMS = "DELETE FROM videogame_trigrams WHERE code = ?"
+SELECT_PREFIXES = ("SELECT t.token, t.code, v.name_key FROM videogame_tokens AS t "
+                   "JOIN videogames AS v ON v.code = t.code WHERE t.token >= ? AND t.token < ? LIMIT ?")
+UPSERT_CLIENT = ("INSERT INTO clients (email, name, phones, addresses) VALUES (?, ?, ?, ?) "
+                 "ON CONFLICT (email) DO UPDATE SET name = excluded.name, phones = excluded.phones, "
+                 "addresses = excluded.addresses")
+NEXT_PURCHASE = "SELECT COALESCE(MAX(number), -1) + 1 FROM purchases"
+INSERT_PURCHASE = ("INSERT INTO purchases (number, date, email, machine_type, data, key) "
+                   "VALUES (?, ?, ?, ?, ?, ?)")
+INDEX_PURCHASE_KEYS = "CREATE UNIQUE INDEX IF NOT EXISTS purchases_key ON purchases (key) WHERE key IS NOT NULL"
+
+
+class ConnectionPool:
+    """This class represents a pool of connections to a SQLite database.
+
+    The connections are opened when they are first needed, up to size,
+    and given back to the pool after use, so the threads of the
+    application share a few connections instead of opening one per
+    query. The database runs in WAL mode: the readers do not wait for
+    the writer and the writer does not wait for the readers. A thread
+    that finds every connection busy waits at most timeout seconds.
+    """
+
+    def __init__(self, path: str, size: int = 4, timeout: float = 5.0):
+        if size < 1:
+            raise ValueError("The size of the pool must be greater than 0.")
+        if path == ":memory:":
+            raise ValueError("The database must be a file to be shared by the connections.")
+        self.__path = path
+        self.__size = size
+        self.__timeout = timeout
+        self.__idle = queue.LifoQueue()
+        self.__opened = 0
+        self.__lock = threading.Lock()
+        self.__closed = False
+        with self.connection() as connection:
+            connection.executescript(SCHEMA)
+
+    @property
+    def path(self) -> str:
+        """This property returns the path of the database.
+
+        Returns:
+            A string with the path of the database file.
+        """
+        return self.__path
+
+    @property
+    def closed(self) -> bool:
+        """This property tells if the pool was closed."""
+        return self.__closed
+
+    @contextmanager
+    def connection(self):
+        """This method allows to borrow a connection of the pool.
+
+        Yields:
+            A connection in autocommit mode, given back when the block ends.
+
+        Raises:
+            ValueError: If the pool is closed or every connection stayed busy.
+        """
+        connection = self.__acquire()
+        try:
+            yield connection
+        finally:
+            if self.__closed:
+                connection.close()
+            else:
+                self.__idle.put(connection)
+
+    @contextmanager
+    def transaction(self):
+        """This method allows to run several statements in a single transaction.
+
+        The transaction takes the write lock when it begins, so it never
+        fails halfway because of another writer. It is committed when the
+        block ends and rolled back if the block raises an error.
+
+        Yields:
+            The connection of the transaction.
+        """
+        with self.connection() as connection:
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                yield connection
+            except BaseException:
+                connection.execute("ROLLBACK")
+                raise
+            connection.execute("COMMIT")
+
+    def close(self):
+        """This method allows to close the connections of the pool."""
+        self.__closed = True
+        while True:
+            try:
+                self.__idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+    def __acquire(self) -> sqlite3.Connection:
+        """This method takes an idle connection or opens a new one.
+
+        Returns:
+            The connection.
+
+        Raises:
+            ValueError: If the pool is closed or every connection stayed busy.
+        """
+        if self.__closed:
+            raise ValueError("The database is closed.")
+        try:
+            return self.__idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self.__lock:
+            opened = self.__opened < self.__size
+            if opened:
+                self.__opened += 1
+        if opened:
+            return self.__connect()
+        try:
+            return self.__idle.get(timeout=self.__timeout)
+        except queue.Empty:
+            raise ValueError("All the connections of the database are busy.") from None
+
+    def __connect(self) -> sqlite3.Connection:
+        """This method opens a connection with the settings of the pool.
+
+        Returns:
+            The connection.
+        """
+        connection = sqlite3.connect(self.__path, timeout=self.__timeout, isolation_level=None,
+                                     check_same_thread=False, cached_statements=STATEMENT_CACHE)
+        connection.execute("PRAGMA journal_mode = WAL")
+        connection.execute("PRAGMA synchronous = NORMAL")  # WAL is still safe from corruption
+        return connection
+
+
+def _videogame_rows(videogame: VideoGame) -> tuple[tuple, list[tuple], list[tuple]]:
+    """This function returns the rows of a videogame and of its name index.
+
+    Args:
+        videogame (VideoGame): The videogame.
+
+    Returns:
+        A tuple with the row of the videogame and the rows of its tokens
+        and trigrams.
+    """
+    code = videogame.get_code()
+    normalized = normalize(videogame.name)
+    name_trigrams = trigrams(normalized)
+    row = (code, videogame.name, videogame.description, videogame.price, videogame.category,
+           videogame.definition, videogame.storytelling_creator, videogame.graphics_creator,
+           videogame.year, normalized, len(name_trigrams))
+    tokens = [(token, code) for token in {normalized, *normalized.split()}]
+    return row, tokens, [(trigram, code) for trigram in name_trigrams]
+
+
+class SQLiteVideoGamesCatalog:
+    """
+    This class represents a catalog of games stored in a SQLite database.
+
+    It has the methods of VideoGamesCatalog, so it can replace it, but
+    the videogames are only read from the database when a search needs
+    them: the catalog survives restarts and opens without loading it.
+    The filters of search use the indexes of the columns and the name
+    searches use tables of the words and trigrams of the names, ranked
+    like the NameIndex of the catalog in memory.
+
+    Listeners registered with add_listener are called with the code of
+    a videogame every time this catalog adds, removes or changes it.
+    """
+
+    def __init__(self, pool: ConnectionPool, seed: bool = True, max_prefix_matches: int = 1000,
+                 min_similarity: float = 0.3):
+        self.__pool = pool
+        self.__listeners = []
+        self.__max_prefix_matches = max_prefix_matches
+        self.__min_similarity = min_similarity
+        add_price_listener(self.__on_price_change)  # held weakly, see add_price_listener
+        if seed and len(self) == 0:
+            self.add_videogames(videogamescatalog.sample_videogames())
+
+    def __len__(self) -> int:
+        with self.__pool.connection() as connection:
+            return connection.execute("SELECT COUNT(*) FROM videogames").fetchone()[0]
+
+    def add_listener(self, listener):
+        """This method registers a function called when a videogame changes.
+
+        Args:
+            listener: A function that receives the code of the videogame.
+        """
+        self.__listeners.append(listener)
+
+    def __notify(self, code: int):
+        """This method calls the listeners with the code of a changed videogame.
+
+        Args:
+            code (int): The code of the videogame.
+        """
+        for listener in self.__listeners:
+            listener(code)
+
+    def __on_price_change(self, videogame: VideoGame, old_price: float):
+        """This method saves the new price of a videogame of the catalog.
+
+        Only the row with the code and the old price of the videogame is
+        changed, so the videogames of other catalogs are left alone.
+
+        Args:
+            videogame (VideoGame): The videogame whose price changed.
+            old_price (float): The price before the change.
+        """
+        if self.__pool.closed:
+            self.close()
+            return
+        code = videogame.get_code()
+        with self.__pool.transaction() as connection:
+            changed = connection.execute(UPDATE_PRICE, (videogame.price, code, old_price)).rowcount
+        if changed:
+            self.__notify(code)
+
+    def close(self):
+        """This method allows to stop following the price changes of the videogames."""
+        remove_price_listener(self.__on_price_change)
+
+    @property
+    def videogames(self) -> list[VideoGame]:
+        """This property returns the videogames of the catalog.
+
+        Returns:
+            A list with the videogames ordered by code.
+        """
+        return self.__select(SELECT_VIDEOGAMES + " ORDER BY code")
+
+    def add_videogame(self, videogame: VideoGame):
+        """
+        This method allows to add a videogame to the catalog.
+
+        Args:
+            videogame (VideoGame): The videogame to add.
+
+        Raises:
+            ValueError: If a videogame with the same code is already in the catalog.
+        """
+        self.add_videogames([videogame])
+
+    def add_videogames(self, videogames: list[VideoGame]):
+        """
+        This method allows to add several videogames to the catalog at once.
+
+        All the videogames are inserted in a single transaction.
+
+        Args:
+            videogames (list[VideoGame]): The videogames to add.
+
+        Raises:
+            ValueError: If a code is repeated or already in the catalog.
+                In that case no videogame is added.
+        """
+        codes = set()
+        for videogame in videogames:
+            code = videogame.get_code()
+            if code in codes:
+                raise ValueError(f"A videogame with code {code} is already in the catalog.")
+            codes.add(code)
+        try:
+            self.__write(INSERT_VIDEOGAME, videogames)
+        except sqlite3.IntegrityError:
+            existing = next(vg.get_code() for vg in videogames if self.search_by_code(vg.get_code()))
+            raise ValueError(f"A videogame with code {existing} is already in the catalog.") from None
+        for code in codes:
+            self.__notify(code)
+
+    def upsert_videogames(self, videogames: list[VideoGame]) -> int:
+        """
+        This method allows to add or replace several videogames at once.
+
+        It is the path to load or refresh a large catalog: the rows are
+        written with one prepared statement in a single transaction, and
+        a videogame whose code is already in the catalog is replaced.
+
+        Args:
+            videogames (list[VideoGame]): The videogames to add or replace.
+
+        Returns:
+            An integer with the number of videogames written.
+        """
+        videogames = list(videogames)
+        self.__write(UPSERT_VIDEOGAME, videogames)
+        for videogame in videogames:
+            self.__notify(videogame.get_code())
+        return len(videogames)
+
+    def remove_videogame(self, code: int) -> VideoGame:
+        """
+        This method allows to remove a videogame from the catalog.
+
+        Args:
+            code (int): The code of the VideoGame.
+
+        Returns:
+            The removed videogame or None if the code is not in the catalog.
+        """
+        with self.__pool.transaction() as connection:
+            row = connection.execute(SELECT_VIDEOGAME, (code,)).fetchone()
+            if row is None:
+                return None
+            connection.execute(DELETE_VIDEOGAME, (code,))
+            connection.execute(DELETE_TOKENS, (code,))
+            connection.execute(DELETE_TRIGRAMS, (code,))
+        self.__notify(code)
+        return VideoGame(*row)
+
+    def search_by_code(self, code: int) -> VideoGame:
+        """
+        This method allows to search a videogame by code.
+
+        Args:
+            code (int): The code of the VideoGame.
+        """
+        found = self.__select(SELECT_VIDEOGAME, (code,))
+        return found[0] if found else None
+
+    def search_by_name(self, name: str, limit: int = 5) -> list[VideoGame]:
+        """
+        This method allows to search videogames by name.
+
+        The name can be complete, a prefix of the name or of one of its
+        words, or have typos; the best candidates are returned first.
+
+        Args:
+            name (str): The name of the VideoGame.
+            limit (int): The maximum number of videogames to return.
+
+        Returns:
+            A list with the videogames ranked by similarity.
+        """
+        normalized = normalize(name)
+        if not normalized:
+            return []
+        query_trigrams = sorted(trigrams(normalized))
+        tiers = {}
+        names = {}
+        shared = Counter()
+        with self.__pool.connection() as connection:
+            for token, code, name_key in connection.execute(
+                    SELECT_PREFIXES, (normalized, normalized + "\uffff", self.__max_prefix_matches)):
+                if name_key == normalized:
+                    tier = EXACT
+                elif token == name_key:
+                    tier = NAME_PREFIX
+                else:
+                    tier = WORD_PREFIX
+                tiers[code] = max(tier, tiers.get(code, FUZZY))
+                names[code] = name_key
+            marks = ", ".join("?" * len(query_trigrams))
+            sizes = {}
+            for code, count, num_trigrams, name_key in connection.execute(
+                    "SELECT t.code, COUNT(*), v.num_trigrams, v.name_key FROM videogame_trigrams AS t "
+                    f"JOIN videogames AS v ON v.code = t.code WHERE t.trigram IN ({marks}) GROUP BY t.code",
+                    query_trigrams):
+                shared[code] = count
+                sizes[code] = num_trigrams
+                names[code] = name_key
+
+        ranked = []
+        for code, count in shared.items():
+            similarity = count / (len(query_trigrams) + sizes[code] - count)
+            tier = tiers.pop(code, FUZZY)
+            if tier > FUZZY or similarity >= self.__min_similarity:
+                ranked.append((-tier, -similarity, code))
+        ranked.extend((-tier, 0.0, code) for code, tier in tiers.items())
+        best = [code for _, _, code in nsmallest(limit, ranked, key=lambda item: (item[0], item[1], names[item[2]]))]
+        if not best:
+            return []
+        found = {vg.get_code(): vg for vg in self.__select(
+            SELECT_VIDEOGAMES + f" WHERE code IN ({', '.join('?' * len(best))})", best)}
+        return [found[code] for code in best if code in found]
+
+    def search_by_category(self, category: str) -> list[VideoGame]:
+        """
+        This method allows to search a videogame by category.
+
+        Args:
+            category (str): The category of the VideoGame.
+        """
+        return self.search(category=category)
+
+    def search(self, category: str = None, definition: str = None, creator: str = None,
+               min_price: float = None, max_price: float = None,
+               min_year: int = None, max_year: int = None) -> list[VideoGame]:
+        """
+        This method allows to search videogames matching all the given filters.
+
+        The filters become the conditions of a single query, and SQLite
+        resolves it through the index of the most selective column.
+        Ranges are inclusive.
+
+        Args:
+            category (str): The category of the VideoGame.
+            definition (str): The definition of the VideoGame (HD or Standard).
+            creator (str): The storytelling or graphics creator of the VideoGame.
+            min_price (float): The minimum price of the VideoGame.
+            max_price (float): The maximum price of the VideoGame.
+            min_year (int): The minimum year of the VideoGame.
+            max_year (int): The maximum year of the VideoGame.
+
+        Returns:
+            A list with the matching videogames ordered by code.
+        """
+        conditions = []
+        parameters = []
+        for condition, value in (("category = ?", category),
+                                 ("definition = ?", definition),
+                                 ("(storytelling_creator = ? OR graphics_creator = ?)", creator),
+                                 ("price >= ?", min_price),
+                                 ("price <= ?", max_price),
+                                 ("year >= ?", min_year),
+                                 ("year <= ?", max_year)):
+            if value is not None:
+                conditions.append(condition)
+                parameters += [value] * condition.count("?")
+        where = f" WHERE {' AND '.join(conditions)}" if conditions else ""
+        return self.__select(SELECT_VIDEOGAMES + where + " ORDER BY code", parameters)
+
+    def show_games(self):
+        """
+        This method allows to show the games.
+        """
+        for videogame in self.videogames:
+            print(f"code: {videogame.get_code()}, Name: {videogame.name}, Category: {videogame.category}, Price: {videogame.price}")
+
+    def __select(self, statement: str, parameters=()) -> list[VideoGame]:
+        """This method runs a query of videogames.
+
+        Args:
+            statement (str): The query, selecting the columns of a videogame.
+            parameters: The parameters of the query.
+
+        Returns:
+            A list with the videogames of the rows.
+        """
+        with self.__pool.connection() as connection:
+            return [VideoGame(*row) for row in connection.execute(statement, parameters)]
+
+    def __write(self, statement: str, videogames: list[VideoGame]):
+        """This method writes some videogames and their name index in a transaction.
+
+        Args:
+            statement (str): The insert or upsert statement of the videogames.
+            videogames (list[VideoGame]): The videogames to write.
+        """
+        rows, tokens, name_trigrams = [], [], []
+        for videogame in videogames:
+            row, row_tokens, row_trigrams = _videogame_rows(videogame)
+            rows.append(row)
+            tokens += row_tokens
+            name_trigrams += row_trigrams
+        codes = [(row[0],) for row in rows]
+        with self.__pool.transaction() as connection:
+            connection.executemany(statement, rows)
+            connection.executemany(DELETE_TOKENS, codes)
+            connection.executemany(DELETE_TRIGRAMS, codes)
+            connection.executemany(INSERT_TOKEN, tokens)
+            connection.executemany(INSERT_TRIGRAM, name_trigrams)
+
+
+class SQLiteClientStore:
+    """This class represents the records of the clients in a SQLite database.
+
+    A client is identified by its email; saving a client that is already
+    stored replaces its name, phones and addresses. Iterating the store
+    gives the clients ordered by email, read in batches of
+    CLIENT_BATCH_SIZE rows, so they can be loaded into a ClientDirectory
+    without holding all the rows at once.
+    """
+
+    def __init__(self, pool: ConnectionPool):
+        self.__pool = pool
+
+    def __len__(self) -> int:
+        with self.__pool.connection() as connection:
+            return connection.execute("SELECT COUNT(*) FROM clients").fetchone()[0]
+
+    def __iter__(self):
+        with self.__pool.connection() as connection:
+            cursor = connection.execute("SELECT name, email, phones, addresses FROM clients ORDER BY email")
+            while True:
+                rows = cursor.fetchmany(CLIENT_BATCH_SIZE)
+                if not rows:
+                    return
+                for row in rows:
+                    yield self.__client(*row)
+
+    def save(self, client: Client):
+        """This method allows to add or replace a client.
+
+        Args:
+            client (Client): The client to save.
+        """
+        self.save_many([client])
+
+    def save_many(self, clients: list[Client]) -> int:
+        """This method allows to add or replace several clients at once.
+
+        The clients are written with one prepared statement in a single
+        transaction.
+
+        Args:
+            clients (list[Client]): The clients to save.
+
+        Returns:
+            An integer with the number of clients written.
+        """
+        rows = [(client._email, client._name, json.dumps(list(client.get_phones())),
+                 json.dumps([address.parts() for address in client.get_addresses()]))
+                for client in clients]
+        with self.__pool.transaction() as connection:
+            connection.executemany(UPSERT_CLIENT, rows)
+        return len(rows)
+
+    def get(self, email: str) -> Client:
+        """This method allows to read a client by its email.
+
+        Args:
+            email (str): The email of the client.
+
+        Returns:
+            The client or None if the email is not stored.
+        """
+        with self.__pool.connection() as connection:
+            row = connection.execute("SELECT name, email, phones, addresses FROM clients WHERE email = ?",
+                                     (email,)).fetchone()
+        return None if row is None else self.__client(*row)
+
+    def remove(self, email: str) -> bool:
+        """This method allows to remove a client.
+
+        Args:
+            email (str): The email of the client.
+
+        Returns:
+            True if the client was stored.
+        """
+        with self.__pool.transaction() as connection:
+            return connection.execute("DELETE FROM clients WHERE email = ?", (email,)).rowcount > 0
+
+    @staticmethod
+    def __client(name: str, email: str, phones: str, addresses: str) -> Client:
+        """This method creates a client from its row.
+
+        Args:
+            name (str): The name of the client.
+            email (str): The email of the client.
+            phones (str): The phones of the client as JSON.
+            addresses (str): The addresses of the client as JSON.
+
+        Returns:
+            The client.
+        """
+        phones = json.loads(phones)
+        addresses = json.loads(addresses)
+        client = Client(name, email, phones[0], Address(*addresses[0]))
+        for phone in phones[1:]:
+            client.add_phone(phone)
+        for address in addresses[1:]:
+            client.add_address(*address)
+        return client
+
+
+class SQLitePurchaseStore:
+    """This class represents a store of purchases in a SQLite database.
+
+    It has the methods of PurchaseStore, so it can replace it. Every
+    purchase is a row with its record number, date, client email,
+    machine type and the purchase as JSON, and the email, machine type
+    and date columns are indexed. Every append is its own transaction;
+    append_many writes a batch of purchases in a single one.
+
+    The idempotency keys of the purchases have a unique index, so a
+    retried order is rejected by the database itself, even when it comes
+    from another process.
+    """
+
+    def __init__(self, pool: ConnectionPool):
+        self.__pool = pool
+        with pool.transaction() as connection:
+            columns = [row[1] for row in connection.execute("PRAGMA table_info(purchases)")]
+            if "key" not in columns:  # databases created before the keys
+                connection.execute("ALTER TABLE purchases ADD COLUMN key TEXT")
+            connection.execute(INDEX_PURCHASE_KEYS)
+
+    def __len__(self) -> int:
+        with self.__pool.connection() as connection:
+            return connection.execute(NEXT_PURCHASE).fetchone()[0]
+
+    @property
+    def path(self) -> str:
+        """This property returns the path of the database.
+
+        Returns:
+            A string with the path of the database file.
+        """
+        return self.__pool.path
+
+    def append(self, purchase: dict) -> int:
+        """This method allows to add a purchase to the store.
+
+        Args:
+            purchase (dict): The purchase, with at least the date, the
+                email and the machine_type, and optionally its key.
+
+        Returns:
+            An integer with the record number of the purchase.
+
+        Raises:
+            ValueError: If the purchase misses a field of the index or
+                a purchase with the same key is already stored.
+        """
+        return self.append_many([purchase])[0]
+
+    def append_many(self, purchases: list[dict]) -> range:
+        """This method allows to add several purchases in a single transaction.
+
+        Args:
+            purchases (list[dict]): The purchases, with at least the date,
+                the email and the machine_type, and optionally their keys.
+
+        Returns:
+            A range with the record numbers of the purchases.
+
+        Raises:
+            ValueError: If a purchase misses a field of the index or its
+                key is repeated or already stored. In that case no
+                purchase is added.
+        """
+        rows = []
+        for purchase in purchases:
+            for field in ("date", "email", "machine_type"):
+                if field not in purchase:
+                    raise ValueError(f"The purchase has no {field}.")
+            rows.append((purchase["date"], purchase["email"], purchase["machine_type"],
+                         json.dumps(purchase, ensure_ascii=False, separators=(",", ":")),
+                         purchase.get("key")))
+        try:
+            with self.__pool.transaction() as connection:
+                first = connection.execute(NEXT_PURCHASE).fetchone()[0]
+                connection.executemany(INSERT_PURCHASE, [(first + position, *row)
+                                                         for position, row in enumerate(rows)])
+        except sqlite3.IntegrityError:
+            keys = [row[-1] for row in rows if row[-1] is not None]
+            key = next((key for key in keys if keys.count(key) > 1 or self.has_key(key)), None)
+            raise ValueError(f"The purchase {key} has already been made.") from None
+        return range(first, first + len(rows))
+
+    def has_key(self, key: str, email: str = None) -> bool:
+        """This method tells if a purchase with an idempotency key is stored.
+
+        Args:
+            key (str): The idempotency key of the purchase.
+            email (str): The email of the client; the key index does not
+                need it.
+
+        Returns:
+            True if a purchase has the key.
+        """
+        with self.__pool.connection() as connection:
+            return connection.execute("SELECT 1 FROM purchases WHERE key = ?", (key,)).fetchone() is not None
+
+    def get(self, number: int) -> dict:
+        """This method allows to read a purchase by its record number.
+
+        Args:
+            number (int): The record number of the purchase.
+
+        Returns:
+            A dictionary with the purchase.
+
+        Raises:
+            ValueError: If there is no purchase with the number.
+        """
+        found = self.__select("SELECT data FROM purchases WHERE number = ?", (number,))
+        if not found:
+            raise ValueError(f"Purchase {number} is not in the store.")
+        return found[0]
+
+    def by_email(self, email: str) -> list[dict]:
+        """This method allows to get the purchases of a client.
+
+        Args:
+            email (str): The email of the client.
+
+        Returns:
+            A list with the purchases in the order they were made.
+        """
+        return self.__select("SELECT data FROM purchases WHERE email = ? ORDER BY number", (email,))
+
+    def by_machine_type(self, machine_type: str) -> list[dict]:
+        """This method allows to get the purchases of a machine type.
+
+        Args:
+            machine_type (str): The name of the machine class.
+
+        Returns:
+            A list with the purchases in the order they were made.
+        """
+        return self.__select("SELECT data FROM purchases WHERE machine_type = ? ORDER BY number",
+                             (machine_type,))
+
+    def by_date(self, day: str) -> list[dict]:
+        """This method allows to get the purchases of a day.
+
+        Args:
+            day (str): The day in YYYY-MM-DD format.
+
+        Returns:
+            A list with the purchases of the day, ordered by date.
+        """
+        return self.between(day, day + "\uffff")
+
+    def between(self, start: str, end: str) -> list[dict]:
+        """This method allows to get the purchases in a range of dates.
+
+        The dates are compared as ISO format strings, so a prefix like
+        a day or a month can be used.
+
+        Args:
+            start (str): The first date of the range, included.
+            end (str): The last date of the range, excluded.
+
+        Returns:
+            A list with the purchases in the range, ordered by date.
+        """
+        return self.__select("SELECT data FROM purchases WHERE date >= ? AND date < ? "
+                             "ORDER BY date, number", (start, end))
+
+    def flush(self):
+        """This method allows to move the committed purchases from the WAL file to the database."""
+        with self.__pool.connection() as connection:
+            connection.execute("PRAGMA wal_checkpoint(PASSIVE)")
+
+    def close(self):
+        """This method allows to flush the purchases; the pool is closed by its owner."""
+        if not self.__pool.closed:
+            self.flush()
+
+    def __enter__(self) -> "SQLitePurchaseStore":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def __select(self, statement: str, parameters) -> list[dict]:
+        """This method runs a query of purchases.
+
+        Args:
+            statement (str): The query, selecting the data column.
+            parameters: The parameters of the query.
+
+        Returns:
+            A list with the purchases of the rows.
+        """
+        with self.__pool.connection() as connection:
+            return [json.loads(data) for data, in connection.execute(statement, parameters)]
+
+
+class SQLiteDatabase:
+    """This class represents the SQLite database of the shop.
+
+    It opens a connection pool to the database file and gives the
+    catalog, the clients and the purchases stored in it, which can be
+    passed to Main in place of the catalog in memory and the purchase
+    files.
+    """
+
+    def __init__(self, path: str, pool_size: int = 4, timeout: float = 5.0, seed: bool = True):
+        self.pool = ConnectionPool(path, pool_size, timeout)
+        self.catalog = SQLiteVideoGamesCatalog(self.pool, seed)
+        self.clients = SQLiteClientStore(self.pool)
+        self.purchases = SQLitePurchaseStore(self.pool)
+
+    def close(self):
+        """This method allows to flush the purchases and close the connections."""
+        self.catalog.close()
+        self.purchases.close()
+        self.pool.close()
+
+    def __enter__(self) -> "SQLiteDatabase":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
@@ -20,30 +20,52 @@ You should have received a copy of the GNU General Public License
 along with Workshop-SM-UD. If not, see <https://www.gnu.org/licenses/>. 
 """
 
+import sys
 from abc import ABC
+from types import MappingProxyType
 
 # ========== Address Class ========== #
 class Address:  # abstract data type
     """This class represents the behavior of an address in the application."""
 
+    __slots__ = ("__street", "__zip_code", "__city", "__country")
+
     def __init__(
         self, street: str, zip_code: int, city: str, country: str = "Colombia"
     ):
         self.__street = street
         self.__zip_code = zip_code
-        self.__city = city
-        self.__country = country
+        self.__city = sys.intern(city)
+        self.__country = sys.intern(country)
 
     def __str__(self) -> str:
         return f"{'='*10}\nStreet: {self.__street}\nZip Code: {self.__zip_code}\n\
             City: {self.__city}\nCountry: {self.__country}"
 
+    def one_line(self) -> str:
+        """This method returns the address in a single line.
+
+        Returns:
+            A string with the street, zip code, city and country.
+        """
+        return f"{self.__street}, {self.__zip_code}, {self.__city}, {self.__country}"
+
+    def parts(self) -> tuple:
+        """This method returns the fields of the address.
+
+        Returns:
+            A tuple with the street, zip code, city and country.
+        """
+        return (self.__street, self.__zip_code, self.__city, self.__country)
+
 
 # ========== User AbstractClass ========== #
 class User(ABC):
     """This class represents the behavior of a general
     user in the application, ti acts as an abstract class."""
 
+    __slots__ = ("_name", "_email", "_grants")
+
     def __init__(self, name: str, email: str, grants: dict = {
             "add_videogames": None,
             "remove_videogames": None,
@@ -60,13 +82,17 @@ class User(ABC):
 class Client(User):
     """This class represents the behavior of a general client in the application."""
 
+    __slots__ = ("__phones", "__addresses")
+
+    GRANTS = MappingProxyType({  # shared by all the clients
+        "add_videogames": False,
+        "remove_videogames": False,
+        "add_machine_material": True,
+        "buy_machine": True,
+    })
+
     def __init__(self, name: str, email: str, phone: str, address: Address):
-        super().__init__(name, email, grants={  # This line was modified
-            "add_videogames": False,
-            "remove_videogames": False,
-            "add_machine_material": True,
-            "buy_machine": True,
-        })
+        super().__init__(name, email, grants=Client.GRANTS)
         self.__phones = [phone]
         self.__addresses = [address]
 
@@ -98,6 +124,14 @@ class Client(User):
         address_temp = Address(street, zip_code, city, country)
         self.__addresses.append(address_temp)
 
+    def get_phones(self) -> list:
+        """This method returns the list of phones of the client.
+
+        Returns:
+            A list with the phones of the client.
+        """
+        return self.__phones
+
     def get_addresses(self) -> list:
         """This method returns the list of addresses of the client.
 
@@ -113,10 +147,14 @@ class Client(User):
 class Manager(User):
     """This class represents the behavior of a general manager in the application."""
 
+    __slots__ = ()
+
+    GRANTS = MappingProxyType({  # shared by all the managers
+        "add_videogames": True,
+        "remove_videogames": True,
+        "add_machine_material": True,
+        "buy_machine": False,
+    })
+
     def __init__(self, name: str, email: str):
-        super().__init__(name, email, grants={  # This line was modified
-            "add_videogames": True,
-            "remove_videogames": True,
-            "add_machine_material": True,
-            "buy_machine": False,
-        })
\ No newline at end of file
+        super().__init__(name, email, grants=Manager.GRANTS)
\ No newline at end of file
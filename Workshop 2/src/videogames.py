@@ -18,9 +18,62 @@ General Public License for more details.
 You should have received a copy of the GNU General Public License 
 along with Workshop-SM-UD. If not, see <https://www.gnu.org/licenses/>. 
 """
+import sys
+from types import MethodType
+from weakref import WeakMethod
+
+_price_listeners = []  # references that return the listener or None once it is gone
+
+def add_price_listener(listener):
+    """This function registers a function called when a videogame price changes.
+
+    Bound methods are held through a weak reference, so registering the
+    method of an object, e.g. a catalog, does not keep the object alive;
+    the listener is dropped when the object is collected.
+
+    Args:
+        listener: A function that receives the videogame and its old price.
+    """
+    if isinstance(listener, MethodType):
+        _price_listeners.append(WeakMethod(listener))
+    else:
+        _price_listeners.append(lambda: listener)
+
+def remove_price_listener(listener):
+    """This function unregisters a function added with add_price_listener.
+
+    Args:
+        listener: The function to unregister.
+    """
+    for reference in list(_price_listeners):
+        if reference() == listener:
+            _price_listeners.remove(reference)
+
+def _notify_price_change(videogame, old_price: float):
+    """This function calls the price listeners, dropping the collected ones.
+
+    Args:
+        videogame (VideoGame): The videogame whose price changed.
+        old_price (float): The price before the change.
+    """
+    for reference in list(_price_listeners):
+        listener = reference()
+        if listener is None:
+            if reference in _price_listeners:
+                _price_listeners.remove(reference)
+        else:
+            listener(videogame, old_price)
 
 class VideoGame:
-    """This class represents the behavior of a general videogame."""
+    """This class represents the behavior of a general videogame.
+
+    The attributes are declared in __slots__ so the videogames do not
+    carry a per-instance dictionary, and the categorical strings are
+    interned so all the videogames share the same string objects.
+    """
+
+    __slots__ = ("__code", "name", "description", "price", "category", "definition",
+                 "storytelling_creator", "graphics_creator", "year")
 
     def __init__(self, code: int, name: str, description: str, price: float, category: str, definition: str, 
                  storytelling_creator: str, graphics_creator: str, year: int): 
@@ -28,10 +81,10 @@ class VideoGame:
         self.name = name
         self.description = description
         self.price = price
-        self.category = category
-        self.definition = definition # HD or standard definition
-        self.storytelling_creator = storytelling_creator
-        self.graphics_creator = graphics_creator
+        self.category = sys.intern(category)
+        self.definition = sys.intern(definition) # HD or standard definition
+        self.storytelling_creator = sys.intern(storytelling_creator)
+        self.graphics_creator = sys.intern(graphics_creator)
         self.year = year
  
     def get_code(self) -> int:
@@ -55,7 +108,9 @@ class VideoGame:
         This method adds a 10% to the price of the videogame if it is in HD.
         """
         if self.definition == "HD":
+            old_price = self.price
             self.price *= 1.1
+            _notify_price_change(self, old_price)
             
     def __str__(self) -> str:
         return f"Code: {self.__code}, Name: {self.name}, Description: {self.description}"
@@ -18,34 +18,230 @@ General Public License for more details.
 You should have received a copy of the GNU General Public License 
 along with Workshop-SM-UD. If not, see <https://www.gnu.org/licenses/>. 
 """
-from videogames import VideoGame
+from bisect import bisect_left, bisect_right, insort
+from videogames import VideoGame, add_price_listener
+from nameindex import NameIndex
 
-dance_revolution = VideoGame(1, "Dance Revolution", "Dance", 100.0, "Dance", "HD", "Sofia", "Liam", 2023)
-super_mario = VideoGame(2, "Super Mario Bros", "Classic game", 50.0, "Classic", "Standard", "Sofia", "Liam", 1985)
-legend_zelda = VideoGame(3, "The Legend of Zelda", "Classic game", 80.0, "Classic", "HD", "Sofia", "Liam", 1986)
-street_fighter = VideoGame(4, "Street Fighter", "Classic game", 70.0, "Classic", "HD", "Sofia", "Liam", 1987) 
-pacman = VideoGame(5, "PacMan", "Classic game", 40.0, "Classic", "Standard", "Sofia", "Liam", 1980)
-gunfire = VideoGame(6, "Gunfire Assault", "shoot game", 60.0, "Shooter", "HD", "Sofia", "Liam", 2023)
-nitrospeed = VideoGame(7, "Nitro Speed", "racing game", 70.0, "Racing", "HD", "Sofia", "Liam", 2023)
-virtual_quest = VideoGame(8, "Virtual Quest", "virtual game", 70.0, "Virtual", "HD", "Sofia", "Liam", 2023)
+SAMPLE_VIDEOGAMES = (
+    (1, "Dance Revolution", "Dance", 100.0, "Dance", "HD", "Sofia", "Liam", 2023),
+    (2, "Super Mario Bros", "Classic game", 50.0, "Classic", "Standard", "Sofia", "Liam", 1985),
+    (3, "The Legend of Zelda", "Classic game", 80.0, "Classic", "HD", "Sofia", "Liam", 1986),
+    (4, "Street Fighter", "Classic game", 70.0, "Classic", "HD", "Sofia", "Liam", 1987),
+    (5, "PacMan", "Classic game", 40.0, "Classic", "Standard", "Sofia", "Liam", 1980),
+    (6, "Gunfire Assault", "shoot game", 60.0, "Shooter", "HD", "Sofia", "Liam", 2023),
+    (7, "Nitro Speed", "racing game", 70.0, "Racing", "HD", "Sofia", "Liam", 2023),
+    (8, "Virtual Quest", "virtual game", 70.0, "Virtual", "HD", "Sofia", "Liam", 2023),
+)
+
+def sample_videogames() -> list[VideoGame]:
+    """This function creates the videogames every new catalog starts with.
+
+    New VideoGame objects are created on every call, so a price changed
+    in the videogames of a catalog does not reach the other catalogs.
+
+    Returns:
+        A list with the sample videogames.
+    """
+    return [VideoGame(*fields) for fields in SAMPLE_VIDEOGAMES]
 
 class VideoGamesCatalog:
     """
     This class represents the catalog of games.
+
+    The videogames are stored in a dictionary indexed by code, so
+    searching, adding and removing a videogame by code takes constant time.
+    Secondary indexes are kept for the queries: inverted indexes map each
+    category, definition and creator to the codes having it, and sorted
+    lists of (value, code) pairs answer the price and year ranges. The
+    price each videogame was indexed with is remembered, so its entry is
+    found again even after the price of the videogame changed. Names are
+    kept in a NameIndex for prefix and fuzzy searches.
+
+    Listeners registered with add_listener are called with the code of
+    a videogame every time it is added, removed or its price changes.
     """
     def __init__(self):
-        self.videogames = [
-            dance_revolution,
-            super_mario,
-            legend_zelda,
-            street_fighter,
-            pacman,
-            gunfire,
-            nitrospeed,
-            virtual_quest
-            ]
-    
-            
+        self.__videogames = {}
+        self.__by_category = {}
+        self.__by_definition = {}
+        self.__by_creator = {}
+        self.__by_price = []
+        self.__by_year = []
+        self.__indexed_prices = {}
+        self.__names = NameIndex()
+        self.__listeners = []
+        add_price_listener(self.__on_price_change)  # held weakly, see add_price_listener
+        self.add_videogames(sample_videogames())
+
+    def add_listener(self, listener):
+        """This method registers a function called when a videogame changes.
+
+        Args:
+            listener: A function that receives the code of the videogame.
+        """
+        self.__listeners.append(listener)
+
+    def __notify(self, code: int):
+        """This method calls the listeners with the code of a changed videogame.
+
+        Args:
+            code (int): The code of the videogame.
+        """
+        for listener in self.__listeners:
+            listener(code)
+
+    def __on_price_change(self, videogame: VideoGame, old_price: float):
+        """This method moves a videogame of the catalog in the price index.
+
+        Args:
+            videogame (VideoGame): The videogame whose price changed.
+            old_price (float): The price before the change.
+        """
+        code = videogame.get_code()
+        if self.__videogames.get(code) is not videogame:
+            return
+        self.__reindex_price(videogame)
+        self.__notify(code)
+
+    def __reindex_price(self, videogame: VideoGame):
+        """This method moves a videogame to its current price in the price index.
+
+        Args:
+            videogame (VideoGame): The videogame to move.
+        """
+        code = videogame.get_code()
+        indexed_price = self.__indexed_prices.get(code)
+        if indexed_price == videogame.price:
+            return
+        if indexed_price is not None:
+            self.__delete_sorted(self.__by_price, indexed_price, code)
+        insort(self.__by_price, (videogame.price, code))
+        self.__indexed_prices[code] = videogame.price
+
+    @staticmethod
+    def __delete_sorted(sorted_index: list, value, code: int):
+        """This method removes a (value, code) pair from a sorted index.
+
+        Args:
+            sorted_index (list): A sorted list of (value, code) pairs.
+            value: The value the code was indexed with.
+            code (int): The code of the videogame.
+        """
+        position = bisect_left(sorted_index, (value, code))
+        if position < len(sorted_index) and sorted_index[position] == (value, code):
+            del sorted_index[position]
+
+    @property
+    def videogames(self) -> list[VideoGame]:
+        """This property returns the videogames of the catalog.
+
+        Returns:
+            A list with the videogames in insertion order.
+        """
+        return list(self.__videogames.values())
+
+    def add_videogame(self, videogame: VideoGame):
+        """
+        This method allows to add a videogame to the catalog.
+
+        Args:
+            videogame (VideoGame): The videogame to add.
+
+        Raises:
+            ValueError: If a videogame with the same code is already in the catalog.
+        """
+        code = videogame.get_code()
+        if code in self.__videogames:
+            raise ValueError(f"A videogame with code {code} is already in the catalog.")
+        self.__videogames[code] = videogame
+        self.__index(videogame)
+        insort(self.__by_price, (videogame.price, code))
+        insort(self.__by_year, (videogame.year, code))
+        self.__indexed_prices[code] = videogame.price
+        self.__names.add(code, videogame.name, videogame)
+        self.__notify(code)
+
+    def add_videogames(self, videogames: list[VideoGame]):
+        """
+        This method allows to add several videogames to the catalog at once.
+
+        The sorted indexes are rebuilt once at the end, so loading a large
+        catalog does not pay a sorted insertion per videogame.
+
+        Args:
+            videogames (list[VideoGame]): The videogames to add.
+
+        Raises:
+            ValueError: If a code is repeated or already in the catalog.
+                In that case no videogame is added.
+        """
+        codes = set()
+        for videogame in videogames:
+            code = videogame.get_code()
+            if code in self.__videogames or code in codes:
+                raise ValueError(f"A videogame with code {code} is already in the catalog.")
+            codes.add(code)
+        for videogame in videogames:
+            code = videogame.get_code()
+            self.__videogames[code] = videogame
+            self.__index(videogame)
+            self.__by_price.append((videogame.price, code))
+            self.__by_year.append((videogame.year, code))
+            self.__indexed_prices[code] = videogame.price
+        self.__by_price.sort()
+        self.__by_year.sort()
+        self.__names.add_many((vg.get_code(), vg.name, vg) for vg in videogames)
+        for code in codes:
+            self.__notify(code)
+
+    def remove_videogame(self, code: int) -> VideoGame:
+        """
+        This method allows to remove a videogame from the catalog.
+
+        Args:
+            code (int): The code of the VideoGame.
+
+        Returns:
+            The removed videogame or None if the code is not in the catalog.
+        """
+        videogame = self.__videogames.pop(code, None)
+        if videogame:
+            self.__unindex(videogame)
+            self.__notify(code)
+        return videogame
+
+    def __index(self, videogame: VideoGame):
+        """This method adds a videogame to the inverted indexes.
+
+        Args:
+            videogame (VideoGame): The videogame to index.
+        """
+        code = videogame.get_code()
+        self.__by_category.setdefault(videogame.category, set()).add(code)
+        self.__by_definition.setdefault(videogame.definition, set()).add(code)
+        for creator in (videogame.storytelling_creator, videogame.graphics_creator):
+            self.__by_creator.setdefault(creator, set()).add(code)
+
+    def __unindex(self, videogame: VideoGame):
+        """This method removes a videogame from the secondary indexes.
+
+        Args:
+            videogame (VideoGame): The videogame to unindex.
+        """
+        code = videogame.get_code()
+        for index, key in ((self.__by_category, videogame.category),
+                           (self.__by_definition, videogame.definition),
+                           (self.__by_creator, videogame.storytelling_creator),
+                           (self.__by_creator, videogame.graphics_creator)):
+            codes = index.get(key)
+            if codes is not None:
+                codes.discard(code)
+                if not codes:
+                    del index[key]
+        self.__delete_sorted(self.__by_price, self.__indexed_prices.pop(code), code)
+        self.__delete_sorted(self.__by_year, videogame.year, code)
+        self.__names.remove(code)
+
     def search_by_code(self, code: int) -> VideoGame: 
         """
         This method allows to search a videogame by code.
@@ -53,11 +249,24 @@ class VideoGamesCatalog:
         Args:
             code (int): The code of the VideoGame.
         """
-        for videogame in self.videogames:
-            if videogame.__code == code:
-                return videogame
-        return None
+        return self.__videogames.get(code)
     
+    def search_by_name(self, name: str, limit: int = 5) -> list[VideoGame]:
+        """
+        This method allows to search videogames by name.
+
+        The name can be complete, a prefix of the name or of one of its
+        words, or have typos; the best candidates are returned first.
+
+        Args:
+            name (str): The name of the VideoGame.
+            limit (int): The maximum number of videogames to return.
+
+        Returns:
+            A list with the videogames ranked by similarity.
+        """
+        return self.__names.search(name, limit)
+
     def search_by_category(self, category: str) -> list[VideoGame]:
         """
         This method allows to search a videogame by category.
@@ -65,15 +274,83 @@ class VideoGamesCatalog:
         Args:
             category (str): The category of the VideoGame.
         """
-        games_by_category = []
-        for videogame in self.videogames:
-            if videogame.category == category:
-                games_by_category.append(videogame)
-        return games_by_category
+        return self.search(category=category)
+
+    def search(self, category: str = None, definition: str = None, creator: str = None,
+               min_price: float = None, max_price: float = None,
+               min_year: int = None, max_year: int = None) -> list[VideoGame]:
+        """
+        This method allows to search videogames matching all the given filters.
+
+        The most selective filter is resolved through its index and only
+        those candidates are checked against the remaining filters, so the
+        whole catalog is never scanned. Ranges are inclusive.
+
+        Args:
+            category (str): The category of the VideoGame.
+            definition (str): The definition of the VideoGame (HD or Standard).
+            creator (str): The storytelling or graphics creator of the VideoGame.
+            min_price (float): The minimum price of the VideoGame.
+            max_price (float): The maximum price of the VideoGame.
+            min_year (int): The minimum year of the VideoGame.
+            max_year (int): The maximum year of the VideoGame.
+
+        Returns:
+            A list with the matching videogames ordered by code.
+        """
+        size, codes = len(self.__videogames) + 1, None
+        for index, key in ((self.__by_category, category),
+                           (self.__by_definition, definition),
+                           (self.__by_creator, creator)):
+            if key is not None:
+                matches = index.get(key, ())
+                if len(matches) < size:
+                    size, codes = len(matches), matches
+        for sorted_index, low, high in ((self.__by_price, min_price, max_price),
+                                        (self.__by_year, min_year, max_year)):
+            if low is not None or high is not None:
+                start, end = self.__range(sorted_index, low, high)
+                if end - start < size:
+                    size = max(end - start, 0)
+                    codes = [sorted_index[position][1] for position in range(start, end)]
+
+        if codes is None:
+            return sorted(self.__videogames.values(), key=VideoGame.get_code)
+
+        result = []
+        for code in codes:
+            videogame = self.__videogames[code]
+            if ((category is None or videogame.category == category)
+                    and (definition is None or videogame.definition == definition)
+                    and (creator is None or creator in (videogame.storytelling_creator,
+                                                        videogame.graphics_creator))
+                    and (min_price is None or videogame.price >= min_price)
+                    and (max_price is None or videogame.price <= max_price)
+                    and (min_year is None or videogame.year >= min_year)
+                    and (max_year is None or videogame.year <= max_year)):
+                result.append(videogame)
+        result.sort(key=VideoGame.get_code)
+        return result
+
+    @staticmethod
+    def __range(sorted_index: list, low, high) -> tuple[int, int]:
+        """This method finds the positions of a sorted index inside a range.
+
+        Args:
+            sorted_index (list): A sorted list of (value, code) pairs.
+            low: The inclusive lower bound or None.
+            high: The inclusive upper bound or None.
+
+        Returns:
+            A tuple with the start and end positions of the range.
+        """
+        start = 0 if low is None else bisect_left(sorted_index, (low,))
+        end = len(sorted_index) if high is None else bisect_right(sorted_index, (high, float("inf")))
+        return start, end
     
     def show_games(self):
         """
         This method allows to show the games.
         """
-        for videogame in self.videogames:
-            print(f"code: {videogame.code}, Name: {videogame.name}, Category: {videogame.category}, Price: {videogame.price}")
\ No newline at end of file
+        for videogame in self.__videogames.values():
+            print(f"code: {videogame.get_code()}, Name: {videogame.name}, Category: {videogame.category}, Price: {videogame.price}")
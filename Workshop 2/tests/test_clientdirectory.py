@@ -0,0 +1,85 @@
+"""
+Tests for the indexed client directory.
+
+This file is part of Workshop-SM-UD.
+
+Workshop-SM-UD is free software: you can redistribute it and/or 
+modify it under the terms of the GNU General Public License as 
+published by the Free Software Foundation, either version 3 of 
+the License, or (at your option) any later version.
+
+Workshop-SM-UD is distributed in the hope that it will be useful, 
+but WITHOUT ANY WARRANTY; without even the implied warranty of 
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU 
+General Public License for more details.
+
+You should have received a copy of the GNU General Public License 
+along with Workshop-SM-UD. If not, see <https://www.gnu.org/licenses/>. 
+"""
+import pytest
+
+import main
+from clientdirectory import ClientDirectory
+from sqlitestore import SQLiteDatabase
+from users import Address, Client
+
+
+def write_clients(path, rows):
+    with open(path, "w", encoding="utf-8") as file:
+        file.write("name,email,phone,street,zip_code,city,country\n")
+        file.writelines(",".join(row) + "\n" for row in rows)
+    return str(path)
+
+
+def test_clients_are_found_by_email_phone_and_name(tmp_path):
+    directory = ClientDirectory()
+    path = write_clients(tmp_path / "clients.csv", [
+        ("Ana María Pérez", "ana@mail.com", "300", "Street 1", "110111", "Bogota", ""),
+        ("Ana María Pérez", "ana@mail.com", "301", "Street 2", "110112", "Bogota", ""),
+        ("Bob Stone", "bob@mail.com", "300", "Street 3", "110113", "Cali", "Colombia"),
+        ("Broken", "broken@mail.com", "302", "Street 4", "zip", "Cali", ""),
+    ])
+    assert directory.import_csv(path) == 2
+    assert directory.get_by_email("ana@mail.com").get_phones() == ["300", "301"]
+    assert sorted(client._email for client in directory.get_by_phone("300")) == ["ana@mail.com", "bob@mail.com"]
+    assert [client._email for client in directory.search_by_name("pere")] == ["ana@mail.com"]
+    assert directory.remove("bob@mail.com")._name == "Bob Stone"
+    assert directory.get_by_phone("300")[0]._email == "ana@mail.com"
+    assert directory.search_by_name("bob") == [] and len(directory) == 1
+    with pytest.raises(ValueError):
+        directory.import_csv(path, strict=True)
+
+
+def test_clients_are_loaded_from_and_saved_to_the_store(tmp_path, monkeypatch):
+    path = str(tmp_path / "shop.db")
+    with SQLiteDatabase(path) as database:
+        database.clients.save(Client("Carla Ruiz", "carla@mail.com", "310", Address("Street 5", 110115, "Tunja")))
+        monkeypatch.setattr(main, "CLIENTS_CSV", write_clients(tmp_path / "clients.csv", [
+            ("Dario Gil", "dario@mail.com", "320", "Street 6", "110116", "Neiva", "")]))
+        directory = main.load_clients(database.clients)
+        assert {client._email for client in directory} == {"carla@mail.com", "dario@mail.com",
+                                                            "homer@springfield.com"}
+    monkeypatch.setattr(main, "CLIENTS_CSV", None)
+    with SQLiteDatabase(path) as database:
+        directory = main.load_clients(database.clients)
+        assert directory.get_by_email("dario@mail.com").get_phones() == ["320"]
+        assert directory.search_by_name("carla")[0]._email == "carla@mail.com"
+
+
+def test_unknown_email_registers_the_client(monkeypatch):
+    directory = ClientDirectory()
+    answers = iter(["4", "2", "bart@springfield.com", "Bart Simpson", "7654321", "St. Evergreen 742", "110783",
+                    "Springfield"])
+    monkeypatch.setattr("builtins.input", lambda prompt="": next(answers))
+    client = main.get_user(directory)
+    assert isinstance(client, Client)
+    assert directory.get_by_email("bart@springfield.com")._name == "Bart Simpson"
+
+
+def test_separators_in_addresses_are_rejected():
+    directory = ClientDirectory()
+    with pytest.raises(ValueError):
+        directory.add(Client("Ana", "ana@mail.com", "300", Address("Street\x1d1", 110111, "Bogota")))
+    with pytest.raises(ValueError):
+        directory.add(Client("Ana", "ana@mail.com", "300", Address("Street 1", 110111, "Bo\x1egota")))
+    assert len(directory) == 0
@@ -0,0 +1,69 @@
+"""
+Tests for the columnar videogame catalog.
+
+This file is part of Workshop-SM-UD.
+
+Workshop-SM-UD is free software: you can redistribute it and/or 
+modify it under the terms of the GNU General Public License as 
+published by the Free Software Foundation, either version 3 of 
+the License, or (at your option) any later version.
+
+Workshop-SM-UD is distributed in the hope that it will be useful, 
+but WITHOUT ANY WARRANTY; without even the implied warranty of 
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU 
+General Public License for more details.
+
+You should have received a copy of the GNU General Public License 
+along with Workshop-SM-UD. If not, see <https://www.gnu.org/licenses/>. 
+"""
+import random
+
+from columnarcatalog import ColumnarVideoGamesCatalog
+from videogames import VideoGame
+
+
+def random_games(count, seed=7):
+    generator = random.Random(seed)
+    return [VideoGame(code, f"Game {code}", generator.choice(["a", "b"]),
+                      round(generator.uniform(10, 100), 2), generator.choice(["Racing", "Puzzle"]),
+                      generator.choice(["HD", "Standard"]), generator.choice(["Ana", "Luis"]),
+                      generator.choice(["Luis", "Eva"]), generator.randint(1980, 2023))
+            for code in range(count)]
+
+
+def expected(games, category=None, creator=None, min_price=None, max_price=None, max_year=None):
+    return [game.get_code() for game in games
+            if (category is None or game.category == category)
+            and (creator is None or creator in (game.storytelling_creator, game.graphics_creator))
+            and (min_price is None or game.price >= min_price)
+            and (max_price is None or game.price <= max_price)
+            and (max_year is None or game.year <= max_year)]
+
+
+def test_search_matches_a_scan_of_the_games():
+    games = random_games(500)
+    catalog = ColumnarVideoGamesCatalog(games)
+    for filters in ({"category": "Racing"}, {"min_price": 30, "max_price": 40},
+                    {"creator": "Luis", "max_year": 2000}, {"category": "Puzzle", "min_price": 90},
+                    {"creator": "Nobody"}):
+        found = [game.get_code() for game in catalog.search(**filters)]
+        assert found == expected(games, **filters)
+
+
+def test_remove_moves_the_last_row():
+    games = random_games(50)
+    catalog = ColumnarVideoGamesCatalog(games)
+    assert catalog.remove_videogame(10).get_code() == 10
+    assert catalog.remove_videogame(10) is None
+    assert len(catalog) == 49
+    assert catalog.search_by_code(49).name == "Game 49"
+    assert catalog.search_by_name("Game 49")[0].get_code() == 49
+    remaining = [game for game in games if game.get_code() != 10]
+    found = [game.get_code() for game in catalog.search(category="Racing")]
+    assert found == expected(remaining, category="Racing")
+
+
+def test_returned_videogames_are_copies():
+    catalog = ColumnarVideoGamesCatalog(random_games(5))
+    catalog.search_by_code(1).price = 0.0
+    assert catalog.search_by_code(1).price != 0.0
@@ -0,0 +1,52 @@
+"""
+Tests for the compact domain objects.
+
+This file is part of Workshop-SM-UD.
+
+Workshop-SM-UD is free software: you can redistribute it and/or 
+modify it under the terms of the GNU General Public License as 
+published by the Free Software Foundation, either version 3 of 
+the License, or (at your option) any later version.
+
+Workshop-SM-UD is distributed in the hope that it will be useful, 
+but WITHOUT ANY WARRANTY; without even the implied warranty of 
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU 
+General Public License for more details.
+
+You should have received a copy of the GNU General Public License 
+along with Workshop-SM-UD. If not, see <https://www.gnu.org/licenses/>. 
+"""
+import pytest
+
+from machines import ClasicArcadeMachine
+from users import Address, Client, Manager
+from videogames import VideoGame
+
+
+def test_domain_objects_have_no_instance_dictionary():
+    address = Address("Street 1", 110111, "Bogota")
+    objects = [address, Client("Ana", "ana@mail.com", "300", address), Manager("Eva", "eva@mail.com"),
+               VideoGame(1, "Game", "test", 10.0, "Puzzle", "HD", "Ana", "Luis", 2000),
+               ClasicArcadeMachine("wood", [])]
+    for domain_object in objects:
+        assert not hasattr(domain_object, "__dict__")
+        with pytest.raises(AttributeError):
+            domain_object.unexpected = 1
+
+
+def test_categorical_strings_are_interned():
+    first = VideoGame(1, "A", "test", 10.0, "".join(["Puz", "zle"]), "HD", "Ana", "Luis", 2000)
+    second = VideoGame(2, "B", "test", 10.0, "".join(["Puzz", "le"]), "HD", "Ana", "Luis", 2000)
+    assert first.category is second.category
+    first_city = Address("Street 1", 1, "".join(["Bog", "ota"])).parts()[2]
+    second_city = Address("Street 2", 2, "".join(["Bo", "gota"])).parts()[2]
+    assert first_city is second_city
+
+
+def test_clients_share_their_grants():
+    address = Address("Street 1", 110111, "Bogota")
+    first = Client("Ana", "ana@mail.com", "300", address)
+    second = Client("Luis", "luis@mail.com", "301", address)
+    assert first._grants is second._grants is Client.GRANTS
+    with pytest.raises(TypeError):
+        Client.GRANTS["buy_machine"] = False
@@ -0,0 +1,75 @@
+"""
+Tests for the fleet energy simulation.
+
+This file is part of Workshop-SM-UD.
+
+Workshop-SM-UD is free software: you can redistribute it and/or 
+modify it under the terms of the GNU General Public License as 
+published by the Free Software Foundation, either version 3 of 
+the License, or (at your option) any later version.
+
+Workshop-SM-UD is distributed in the hope that it will be useful, 
+but WITHOUT ANY WARRANTY; without even the implied warranty of 
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU 
+General Public License for more details.
+
+You should have received a copy of the GNU General Public License 
+along with Workshop-SM-UD. If not, see <https://www.gnu.org/licenses/>. 
+"""
+import pytest
+
+from energysimulation import EnergySimulation, UsageProfile
+from machines import ClasicArcadeMachine, DanceRevolutionMachine
+
+
+def brute_force_power(machines, profiles, assignment, standby, days, start_weekday):
+    power = []
+    for day in range(days):
+        weekday = (day + start_weekday) % 7
+        for minute in range(24 * 60):
+            total = 0.0
+            for machine in machines:
+                profile = profiles[assignment[type(machine).__name__]]
+                usage = profile.daily[minute] * profile.weekly[weekday]
+                total += machine.energy_consumption * (standby + (1 - standby) * usage)
+            power.append(total)
+    return power
+
+
+def test_power_matches_a_sum_over_the_machines():
+    evenings = UsageProfile.from_hours("evenings", {18: 1.0, 19: 0.5}, [1, 1, 1, 1, 1, 2, 0])
+    mornings = UsageProfile.from_hours("mornings", {8: 0.25})
+    machines = [ClasicArcadeMachine("wood", []), ClasicArcadeMachine("aluminum", []),
+                DanceRevolutionMachine("wood", [])]
+    assignment = {"ClasicArcadeMachine": "evenings", "DanceRevolutionMachine": "mornings"}
+    result = EnergySimulation([evenings, mornings], standby=0.1).run(
+        machines, assignment, days=8, start_weekday=3)
+    expected = brute_force_power(machines, {"evenings": evenings, "mornings": mornings},
+                                 assignment, 0.1, 8, 3)
+    assert list(result.power) == pytest.approx(expected)
+    power, step = result.peak()
+    assert result.time_of(step) == "day 3 (Saturday) 18:00"
+    assert result.energy() == pytest.approx(sum(expected) / 60 / 1000)
+
+
+def test_steps_average_the_minutes():
+    profile = UsageProfile.from_hours("half", {0: 1.0})
+    result = EnergySimulation([profile]).run([ClasicArcadeMachine("wood", [])],
+                                             {}, default="half", days=1, step=120)
+    energy = ClasicArcadeMachine("wood", []).energy_consumption
+    assert len(result.power) == 12
+    assert result.power[0] == pytest.approx(energy / 2)
+
+
+def test_invalid_parameters_are_rejected():
+    profile = UsageProfile.from_hours("always", {hour: 1.0 for hour in range(24)})
+    simulation = EnergySimulation([profile])
+    machines = [ClasicArcadeMachine("wood", [])]
+    with pytest.raises(ValueError):
+        simulation.run(machines, {})
+    with pytest.raises(ValueError):
+        simulation.run(machines, {}, default="always", step=7)
+    with pytest.raises(ValueError):
+        simulation.run(machines, {}, default="missing")
+    with pytest.raises(ValueError):
+        UsageProfile("short", [1.0] * 10)
@@ -0,0 +1,78 @@
+"""
+Tests for the fleet registry.
+
+This file is part of Workshop-SM-UD.
+
+Workshop-SM-UD is free software: you can redistribute it and/or 
+modify it under the terms of the GNU General Public License as 
+published by the Free Software Foundation, either version 3 of 
+the License, or (at your option) any later version.
+
+Workshop-SM-UD is distributed in the hope that it will be useful, 
+but WITHOUT ANY WARRANTY; without even the implied warranty of 
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU 
+General Public License for more details.
+
+You should have received a copy of the GNU General Public License 
+along with Workshop-SM-UD. If not, see <https://www.gnu.org/licenses/>. 
+"""
+import pytest
+
+from fleet import FleetRegistry
+from machines import ClasicArcadeFactory, ClasicArcadeMachine, RacingArcadeFactory
+from videogames import VideoGame
+
+
+def make_games(count):
+    return [VideoGame(code, f"Game {code}", "test", 10.0, "Puzzle", "HD", "Ana", "Luis", 2000)
+            for code in range(count)]
+
+
+def test_factories_share_the_registry_and_its_indexes():
+    games = make_games(3)
+    fleet = FleetRegistry()
+    clasic = ClasicArcadeFactory(fleet)
+    racing = RacingArcadeFactory(fleet)
+    first = clasic.create_machine("wood", [games[0]])
+    batch = clasic.create_machines([("aluminum", [games[0], games[1]]), ("wood", [])])
+    car = racing.create_machine("wood", [games[2]])
+    assert len(fleet) == 4
+    assert clasic.get_machines() == [first, *batch]
+    assert racing.get_machines() == [car]
+    assert fleet.by_material("wood") == [first, batch[1], car]
+    assert fleet.with_videogame(0) == [first, batch[0]]
+    assert fleet.find(machine_type=ClasicArcadeMachine, material="wood", code=0) == [first]
+
+
+def test_changes_through_the_registry_update_the_indexes():
+    games = make_games(2)
+    fleet = FleetRegistry()
+    machine_id = fleet.register(ClasicArcadeMachine("wood", [games[0]]))
+    fleet.add_videogame(machine_id, games[1])
+    fleet.remove_videogame(machine_id, 0)
+    fleet.change_material(machine_id, "aluminum")
+    assert fleet.with_videogame(0) == []
+    assert fleet.with_videogame(1) == [fleet.get(machine_id)]
+    assert fleet.by_material("wood") == []
+    assert fleet.by_material("aluminium") == [fleet.get(machine_id)]
+    assert fleet.unregister(machine_id) is not None
+    assert fleet.find(code=1) == [] and len(fleet) == 0
+    with pytest.raises(ValueError):
+        fleet.add_videogame(machine_id, games[0])
+
+
+def test_machines_of_the_factories_are_changed_through_their_ids():
+    games = make_games(2)
+    factory = ClasicArcadeFactory()
+    fleet = factory.fleet
+    machine = factory.create_machine("wood", [games[0]])
+    batch = factory.create_machines([("wood", []), ("aluminum", [])])
+    fleet.add_videogame(fleet.id_of(machine), games[1])
+    fleet.change_material(fleet.id_of(batch[1]), "wood")
+    assert fleet.with_videogame(1) == [machine]
+    assert fleet.by_material("wood") == [machine, *batch]
+    with pytest.raises(ValueError):
+        fleet.register(machine)
+    fleet.unregister(fleet.id_of(machine))
+    with pytest.raises(ValueError):
+        fleet.id_of(machine)
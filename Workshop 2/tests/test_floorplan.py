@@ -0,0 +1,87 @@
+"""
+Tests for the floor-plan packing.
+
+This file is part of Workshop-SM-UD.
+
+Workshop-SM-UD is free software: you can redistribute it and/or 
+modify it under the terms of the GNU General Public License as 
+published by the Free Software Foundation, either version 3 of 
+the License, or (at your option) any later version.
+
+Workshop-SM-UD is distributed in the hope that it will be useful, 
+but WITHOUT ANY WARRANTY; without even the implied warranty of 
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU 
+General Public License for more details.
+
+You should have received a copy of the GNU General Public License 
+along with Workshop-SM-UD. If not, see <https://www.gnu.org/licenses/>. 
+"""
+import random
+import time
+
+from floorplan import Area, FloorPlanner
+from machines import ClasicArcadeMachine, DanceRevolutionMachine
+
+
+def sized_machine(width, depth, height=100):
+    machine = ClasicArcadeMachine("wood", [])
+    machine.dimensions = (width, depth, height)
+    return machine
+
+
+def assert_valid(result, areas):
+    by_area = {area.name: area for area in areas}
+    for index, placement in enumerate(result.placements):
+        area = by_area[placement.area]
+        assert placement.x + placement.width <= area.width
+        assert placement.y + placement.depth <= area.depth
+        for other in result.placements[index + 1:]:
+            if other.area == placement.area:
+                assert (placement.x >= other.x + other.width or other.x >= placement.x + placement.width
+                        or placement.y >= other.y + other.depth or other.y >= placement.y + placement.depth)
+
+
+def test_exact_mode_beats_the_heuristic_on_small_orders():
+    areas = [Area("hall", 100, 100)]
+    planner = FloorPlanner(areas)
+    machines = [sized_machine(60, 30), sized_machine(50, 60), sized_machine(60, 50), sized_machine(60, 50)]
+    heuristic = planner.pack(machines)
+    exact = planner.solve(machines)
+    assert exact.optimal
+    assert len(exact.placements) == 3 > len(heuristic.placements)
+    assert_valid(exact, areas)
+
+
+def test_exact_mode_gives_up_after_its_budget():
+    generator = random.Random(3)
+    machines = [sized_machine(generator.randint(90, 170), generator.randint(90, 170)) for _ in range(10)]
+    areas = [Area("hall", 400, 400)]
+    planner = FloorPlanner(areas)
+    start = time.perf_counter()
+    result = planner.pack_exact(machines, max_nodes=20000)
+    assert time.perf_counter() - start < 5
+    assert not result.optimal
+    assert len(result.placements) >= len(planner.pack(machines).placements)
+    assert len(result.placements) + len(result.unplaced) == 10
+    assert_valid(result, areas)
+
+
+def test_height_and_weight_limits():
+    truck = Area("truck", 1000, 1000, height=150, max_weight=100)
+    planner = FloorPlanner([truck], clearance=10)
+    tall = sized_machine(50, 50, 200)
+    dance = DanceRevolutionMachine("wood", [])
+    light = [sized_machine(50, 50) for _ in range(3)]
+    result = planner.solve([tall, dance, *light])
+    assert tall in result.unplaced
+    assert sum(result.weights().values()) <= 100
+    assert all(placement.width == 60 for placement in result.placements)
+
+
+def test_large_orders_use_the_heuristic():
+    areas = [Area(f"hall {index}", 500, 500) for index in range(3)]
+    machines = [sized_machine(90, 60) for _ in range(FloorPlanner.EXACT_LIMIT + 30)]
+    result = FloorPlanner(areas).solve(machines)
+    assert not result.optimal
+    assert not result.unplaced
+    assert_valid(result, areas)
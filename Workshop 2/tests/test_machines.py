@@ -0,0 +1,102 @@
+"""
+Tests for the machines and their factories.
+
+This file is part of Workshop-SM-UD.
+
+Workshop-SM-UD is free software: you can redistribute it and/or 
+modify it under the terms of the GNU General Public License as 
+published by the Free Software Foundation, either version 3 of 
+the License, or (at your option) any later version.
+
+Workshop-SM-UD is distributed in the hope that it will be useful, 
+but WITHOUT ANY WARRANTY; without even the implied warranty of 
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU 
+General Public License for more details.
+
+You should have received a copy of the GNU General Public License 
+along with Workshop-SM-UD. If not, see <https://www.gnu.org/licenses/>. 
+"""
+import pytest
+
+from machines import MACHINE_SPECS, ClasicArcadeFactory, ClasicArcadeMachine, RacingArcadeMachine
+from pricing import default_rules
+from videogames import VideoGame
+
+
+def make_games(count):
+    return [VideoGame(code, f"Game {code}", "test", 10.0 + code, "Puzzle", "HD", "Ana", "Luis", 2000)
+            for code in range(count)]
+
+
+def test_running_totals_follow_videogames_and_material():
+    games = make_games(4)
+    machine = ClasicArcadeMachine("wood", games[:2])
+    base = default_rules().lookup("ClasicArcadeMachine", "wood")[0]
+    assert machine.calculate_price() == pytest.approx(base + 21.0)
+    machine.add_videogame(games[2])
+    machine.remove_videogame(0)
+    assert machine.calculate_price() == pytest.approx(base + 23.0)
+    machine.remove_videogame(1)
+    machine.remove_videogame(2)
+    assert machine.calculate_price() == base
+    machine.material = "carbon fiber"
+    price, weight, energy = default_rules().lookup("ClasicArcadeMachine", "carbon fiber")
+    assert (machine.calculate_price(), machine.weight, machine.energy_consumption) == (price, weight, energy)
+
+
+def test_videogames_keep_the_price_they_were_added_with():
+    game = make_games(1)[0]
+    machine = RacingArcadeMachine("wood", [game])
+    price = machine.calculate_price()
+    game.add_definition()
+    assert machine.calculate_price() == price
+
+
+def test_unavailable_material_fails_when_priced():
+    machine = ClasicArcadeMachine("gold", [])
+    with pytest.raises(ValueError):
+        machine.calculate_price()
+
+
+def test_videogames_are_indexed_by_code_in_insertion_order():
+    games = make_games(5)
+    machine = ClasicArcadeMachine("wood", [games[3], games[1], games[4]])
+    assert list(machine.get_videogame_codes()) == [3, 1, 4]
+    assert machine.has_videogame(1) and not machine.has_videogame(0)
+    assert machine.remove_videogame(1) is games[1]
+    assert machine.remove_videogame(1) is None
+    machine.add_videogame(games[1])
+    assert machine.get_videogames() == [games[3], games[4], games[1]]
+    with pytest.raises(ValueError):
+        machine.add_videogame(games[4])
+
+
+def test_machines_share_the_spec_of_their_type():
+    first, second = ClasicArcadeMachine("wood", []), ClasicArcadeMachine("aluminum", [])
+    assert first.SPEC is second.SPEC is MACHINE_SPECS["ClasicArcadeMachine"]
+    assert first.dimensions == first.SPEC.dimensions
+    first.memory = 64
+    first.weight = 1.0
+    assert (first.memory, first.weight) == (64, 1.0)
+    assert second.memory == MACHINE_SPECS["ClasicArcadeMachine"].memory
+    assert second.weight == default_rules().lookup("ClasicArcadeMachine", "aluminum")[1]
+
+
+def test_clones_do_not_share_state_with_the_prototype():
+    games = make_games(3)
+    factory = ClasicArcadeFactory()
+    prototype = ClasicArcadeMachine("wood", games[:1])
+    prototype.memory = 32
+    factory.register_prototype("basic", prototype)
+    clone = factory.create_from_prototype("basic", "aluminum", games[1:2])
+    clone.memory = 8
+    clone.remove_videogame(0)
+    assert list(prototype.get_videogame_codes()) == [0]
+    assert (prototype.material, prototype.memory) == ("wood", 32)
+    assert list(clone.get_videogame_codes()) == [1]
+    assert clone.calculate_price() == pytest.approx(ClasicArcadeMachine("aluminum", games[1:2]).calculate_price())
+    assert factory.get_machines() == [clone]
+    with pytest.raises(ValueError):
+        factory.create_from_prototype("missing")
+    with pytest.raises(ValueError):
+        factory.register_prototype("racing", RacingArcadeMachine("wood", []))
@@ -0,0 +1,55 @@
+"""
+Tests for the prefix and fuzzy name index.
+
+This file is part of Workshop-SM-UD.
+
+Workshop-SM-UD is free software: you can redistribute it and/or 
+modify it under the terms of the GNU General Public License as 
+published by the Free Software Foundation, either version 3 of 
+the License, or (at your option) any later version.
+
+Workshop-SM-UD is distributed in the hope that it will be useful, 
+but WITHOUT ANY WARRANTY; without even the implied warranty of 
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU 
+General Public License for more details.
+
+You should have received a copy of the GNU General Public License 
+along with Workshop-SM-UD. If not, see <https://www.gnu.org/licenses/>. 
+"""
+from nameindex import NameIndex, normalize
+
+
+def build_index():
+    index = NameIndex()
+    index.add_many([(1, "Street Fighter", "sf"), (2, "Street Racer", "sr"),
+                    (3, "Super Mario Bros", "smb"), (4, "Pokémon Stadium", "ps")])
+    return index
+
+
+def test_normalize_removes_accents_and_punctuation():
+    assert normalize("  Pokémon: Stadium!! ") == "pokemon stadium"
+
+
+def test_exact_match_comes_before_prefixes():
+    index = build_index()
+    index.add(5, "Street", "s")
+    found = index.search("street")
+    assert found[0] == "s"
+    assert sorted(found[1:]) == ["sf", "sr"]
+
+
+def test_word_prefix_and_typos():
+    index = build_index()
+    assert index.search("mario")[0] == "smb"
+    assert index.search("stret fihgter")[0] == "sf"
+    assert index.search("pokemon")[0] == "ps"
+
+
+def test_remove_and_replace():
+    index = build_index()
+    index.remove(1)
+    assert "sf" not in index.search("street fighter")
+    index.add(2, "Nitro Racer", "nr")
+    assert index.search("street") == []
+    assert index.search("nitro") == ["nr"]
+    assert len(index) == 3
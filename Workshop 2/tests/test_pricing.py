@@ -0,0 +1,52 @@
+"""
+Tests for the pricing rules.
+
+This file is part of Workshop-SM-UD.
+
+Workshop-SM-UD is free software: you can redistribute it and/or 
+modify it under the terms of the GNU General Public License as 
+published by the Free Software Foundation, either version 3 of 
+the License, or (at your option) any later version.
+
+Workshop-SM-UD is distributed in the hope that it will be useful, 
+but WITHOUT ANY WARRANTY; without even the implied warranty of 
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU 
+General Public License for more details.
+
+You should have received a copy of the GNU General Public License 
+along with Workshop-SM-UD. If not, see <https://www.gnu.org/licenses/>. 
+"""
+import json
+
+import pytest
+
+from pricing import PricingRules, default_rules
+
+
+def test_rules_are_compiled_into_rows():
+    rules = PricingRules({
+        "materials": {"wood": {"price": 2, "weight": 3, "energy": 4, "surcharge": 5}},
+        "machines": {"Box": {"base_price": 10, "weight": 20, "energy_consumption": 30, "surcharge": 1}},
+    })
+    assert rules.lookup("Box", "wood") == (26, 60, 120)
+    assert rules.materials == ["wood"]
+    with pytest.raises(ValueError):
+        rules.row("Box", "gold")
+    with pytest.raises(ValueError):
+        rules.row("Crate", "wood")
+
+
+def test_rules_are_loaded_from_a_file(tmp_path):
+    path = tmp_path / "rules.json"
+    path.write_text(json.dumps({"materials": {"steel": {"aliases": ["iron"]}},
+                                "machines": {"Box": {"base_price": 10}}}))
+    rules = PricingRules.from_file(str(path))
+    assert rules.material("iron") == "steel"
+    assert rules.lookup("Box", "iron")[0] == 10
+
+
+def test_default_rules_match_the_material_multipliers():
+    price, weight, energy = default_rules().lookup("ClasicArcadeMachine", "wood")
+    assert (price, weight, energy) == pytest.approx((3000 * 0.95, 15 * 1.1, 200 * 1.15))
+    with pytest.raises(ValueError):
+        PricingRules({"materials": {}, "machines": {"Box": {}}})
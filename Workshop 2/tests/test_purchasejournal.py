@@ -0,0 +1,185 @@
+"""
+Tests for the buffered purchase journal.
+
+This file is part of Workshop-SM-UD.
+
+Workshop-SM-UD is free software: you can redistribute it and/or 
+modify it under the terms of the GNU General Public License as 
+published by the Free Software Foundation, either version 3 of 
+the License, or (at your option) any later version.
+
+Workshop-SM-UD is distributed in the hope that it will be useful, 
+but WITHOUT ANY WARRANTY; without even the implied warranty of 
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU 
+General Public License for more details.
+
+You should have received a copy of the GNU General Public License 
+along with Workshop-SM-UD. If not, see <https://www.gnu.org/licenses/>. 
+"""
+import multiprocessing
+import os
+import threading
+import time
+
+import pytest
+
+from purchasejournal import FileLock, PurchaseJournal
+from purchasesegments import SegmentRotator, iter_chunks, list_segments
+
+
+def read(path):
+    with open(path, encoding="utf-8") as file:
+        return file.read()
+
+
+def test_records_are_written_in_batches(tmp_path):
+    path = str(tmp_path / "purchase.txt")
+    with PurchaseJournal(path, flush_every=3, flush_interval=60, newline="\n") as journal:
+        journal.write("a\n")
+        journal.write("b\n")
+        assert read(path) == ""
+        journal.write("c\n")
+        assert read(path) == "a\nb\nc\n"
+        journal.write("d\n")
+    assert read(path) == "a\nb\nc\nd\n"
+    with pytest.raises(ValueError):
+        journal.write("e\n")
+
+
+def test_idle_journal_is_flushed_by_its_timer(tmp_path):
+    path = str(tmp_path / "purchase.txt")
+    with PurchaseJournal(path, flush_every=100, flush_interval=0.05, newline="\n") as journal:
+        journal.write("a\n")
+        deadline = time.monotonic() + 5
+        while read(path) != "a\n" and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert read(path) == "a\n"
+
+
+def test_threads_never_mix_records(tmp_path):
+    path = str(tmp_path / "purchase.txt")
+    with PurchaseJournal(path, flush_every=7, newline="\n") as journal:
+        def write(name):
+            for number in range(200):
+                journal.write(f"{name} {number} {'x' * 50}\n")
+
+        threads = [threading.Thread(target=write, args=(f"t{index}",)) for index in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    lines = read(path).splitlines()
+    assert len(lines) == 800
+    assert all(line.endswith("x" * 50) and len(line.split()) == 3 for line in lines)
+
+
+def write_large_records(path, name, count, segments=None):
+    rotation = SegmentRotator(segments, max_bytes=2 ** 20) if segments else None
+    with PurchaseJournal(path, flush_every=3, newline="\n", rotation=rotation) as journal:
+        for number in range(count):
+            journal.write(f"{name} {number} {name * 70000}\n")
+
+
+def run_processes(*arguments):
+    context = multiprocessing.get_context("fork" if hasattr(os, "fork") else "spawn")
+    processes = [context.Process(target=write_large_records, args=(*arguments[:1], f"p{index}", *arguments[1:]))
+                 for index in range(4)]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+    assert all(process.exitcode == 0 for process in processes)
+
+
+def test_processes_never_split_large_records(tmp_path):
+    path = str(tmp_path / "purchase.txt")
+    run_processes(path, 20)
+    lines = read(path).splitlines()
+    assert len(lines) == 80
+    assert all(line.split()[2] == line.split()[0] * 70000 for line in lines)
+
+
+def test_processes_rotate_every_record_once(tmp_path):
+    path = str(tmp_path / "purchase.txt")
+    segments = str(tmp_path / "segments")
+    run_processes(path, 20, segments)
+    text = read(path) + "".join(b"".join(iter_chunks(segment)).decode("utf-8") for segment in list_segments(segments))
+    records = sorted(tuple(line.split()[:2]) for line in text.splitlines())
+    assert records == sorted((f"p{index}", str(number)) for index in range(4) for number in range(20))
+    assert len(list_segments(segments)) > 1
+
+
+def test_file_lock_excludes_the_other_processes(tmp_path):
+    path = str(tmp_path / "purchase.txt")
+    lock = FileLock(path)
+    assert lock.path == path + ".lock"
+    context = multiprocessing.get_context("fork" if hasattr(os, "fork") else "spawn")
+    with lock:
+        process = context.Process(target=write_large_records, args=(path, "p", 1))
+        process.start()
+        time.sleep(0.3)
+        assert read(path) == ""
+    process.join()
+    assert process.exitcode == 0 and read(path).startswith("p 0 ")
+    lock.close()
+
+
+def write_keyed_records(path, count):
+    accepted = 0
+    with PurchaseJournal(path, flush_every=5, newline="\n") as journal:
+        for number in range(count):
+            try:
+                journal.write(f"order-{number}\n", f"order-{number}")
+                accepted += 1
+            except ValueError:
+                pass
+    return accepted
+
+
+def test_processes_accept_every_key_once(tmp_path):
+    path = str(tmp_path / "purchase.txt")
+    context = multiprocessing.get_context("fork" if hasattr(os, "fork") else "spawn")
+    with context.Pool(4) as pool:
+        accepted = pool.starmap(write_keyed_records, [(path, 100)] * 4)
+    assert sum(accepted) >= 100  # a buffered record whose key another process wrote is dropped at the flush
+    assert sorted(read(path).splitlines()) == sorted(f"order-{number}" for number in range(100))
+    with PurchaseJournal(path) as journal:
+        assert journal.has_key("order-99") and not journal.has_key("order-100")
+        with pytest.raises(ValueError):
+            journal.write("again\n", "order-0")
+
+
+def write_and_crash(path):
+    journal = PurchaseJournal(path, flush_every=10, flush_interval=60, newline="\n")
+    journal.write("order-1\n", "order-1")
+    os._exit(0)  # the record is still in the buffer
+
+
+def test_crash_before_flush_keeps_no_key(tmp_path):
+    path = str(tmp_path / "purchase.txt")
+    context = multiprocessing.get_context("fork" if hasattr(os, "fork") else "spawn")
+    process = context.Process(target=write_and_crash, args=(path,))
+    process.start()
+    process.join()
+    with PurchaseJournal(path, newline="\n") as journal:
+        assert not journal.has_key("order-1")
+        journal.write("order-1\n", "order-1")
+        assert journal.has_key("order-1")
+        with pytest.raises(ValueError):
+            journal.write("again\n", "order-1")
+    assert read(path) == "order-1\n"
+    assert read(path + ".keys") == "order-1\n"
+
+
+def test_keys_are_rotated_with_the_journal(tmp_path):
+    path = str(tmp_path / "purchase.txt")
+    rotation = SegmentRotator(str(tmp_path / "segments"), max_bytes=20)
+    with PurchaseJournal(path, flush_every=1, newline="\n", rotation=rotation) as journal:
+        for number in range(6):
+            journal.write(f"order-{number}\n", f"order-{number}")
+    assert not os.path.exists(path + ".keys")
+    assert read(path + ".keys.1") == "order-3\norder-4\norder-5\n"
+    with PurchaseJournal(path, newline="\n") as journal:
+        assert journal.has_key("order-5") and not journal.has_key("order-0")
+        with pytest.raises(ValueError):
+            journal.write("again\n", "order-4")
@@ -0,0 +1,69 @@
+"""
+Tests for the streaming parser of the purchase logs.
+
+This file is part of Workshop-SM-UD.
+
+Workshop-SM-UD is free software: you can redistribute it and/or 
+modify it under the terms of the GNU General Public License as 
+published by the Free Software Foundation, either version 3 of 
+the License, or (at your option) any later version.
+
+Workshop-SM-UD is distributed in the hope that it will be useful, 
+but WITHOUT ANY WARRANTY; without even the implied warranty of 
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU 
+General Public License for more details.
+
+You should have received a copy of the GNU General Public License 
+along with Workshop-SM-UD. If not, see <https://www.gnu.org/licenses/>. 
+"""
+import pytest
+
+import purchaselog
+from purchaselog import complete_end, iter_records, read_records, split
+
+
+def record_text(day, price, buyer="Client", newline="\n"):
+    lines = [f"Date: 2024-03-{day:02d} 12:00:00.000001", f"{buyer}: Ana", "Adress: Street 1",
+             "Phone: 300", "Email: ana@mail.com", "Arcade machine material: wood", "Games:",
+             f"Name: Pac, Man, Category: Arcade, Price: {price}", f"Total price: {price + 100}", ""]
+    return newline.join(lines)
+
+
+def write_log(path, records):
+    with open(path, "wb") as file:
+        file.write("".join(records).encode("utf-8"))
+    return str(path)
+
+
+def test_both_workshop_formats_are_parsed(tmp_path):
+    path = write_log(tmp_path / "purchase.txt",
+                     [record_text(1, 10.0), record_text(2, 20.0, "Customer", "\r\n")])
+    records = read_records(path)
+    assert [record.customer for record in records] == ["Ana", "Ana"]
+    assert records[0].games[0].name == "Pac, Man"
+    assert [record.total_price for record in records] == [110.0, 120.0]
+    assert records[1].date.day == 2
+
+
+def test_malformed_records_are_skipped_unless_strict(tmp_path):
+    path = write_log(tmp_path / "purchase.txt",
+                     [record_text(1, 10.0), "Date: 2024-03-02 12:00:00\nWho: nobody\n", record_text(3, 30.0)])
+    assert len(read_records(path)) == 2
+    with pytest.raises(ValueError):
+        read_records(path, strict=True)
+
+
+def test_split_ranges_have_every_record_once(tmp_path, monkeypatch):
+    monkeypatch.setattr(purchaselog, "BLOCK_SIZE", 512)
+    path = write_log(tmp_path / "purchase.txt", [record_text(day % 28 + 1, float(day)) for day in range(300)])
+    for parts in (1, 3, 7, 50):
+        ranges = split(path, parts)
+        prices = [record.games[0].price for start, end in ranges for record in iter_records(path, start, end)]
+        assert prices == [float(day) for day in range(300)]
+
+
+def test_complete_end_leaves_out_a_record_being_written(tmp_path):
+    complete = record_text(1, 10.0)
+    path = write_log(tmp_path / "purchase.txt", [complete, record_text(2, 20.0)[:60]])
+    assert complete_end(path) == len(complete.encode("utf-8"))
+    assert len(list(iter_records(path, 0, complete_end(path)))) == 1
@@ -0,0 +1,45 @@
+"""
+Tests for the purchase pipeline.
+
+This file is part of Workshop-SM-UD.
+
+Workshop-SM-UD is free software: you can redistribute it and/or 
+modify it under the terms of the GNU General Public License as 
+published by the Free Software Foundation, either version 3 of 
+the License, or (at your option) any later version.
+
+Workshop-SM-UD is distributed in the hope that it will be useful, 
+but WITHOUT ANY WARRANTY; without even the implied warranty of 
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU 
+General Public License for more details.
+
+You should have received a copy of the GNU General Public License 
+along with Workshop-SM-UD. If not, see <https://www.gnu.org/licenses/>. 
+"""
+from machines import ClasicArcadeMachine
+from purchasepipeline import PurchasePipeline
+from users import Address, Client
+from videogamescatalog import VideoGamesCatalog
+
+
+class FailingJournal:
+    def __init__(self):
+        self.writes = 0
+
+    def write(self, record, key=None):
+        self.writes += 1
+        raise RuntimeError("The disk is gone.")
+
+    def flush(self):
+        pass
+
+
+def test_failed_write_fails_its_future_and_is_not_retried():
+    journal = FailingJournal()
+    pipeline = PurchasePipeline(journal=journal)
+    client = Client("Ana", "ana@mail.com", "300", Address("Street 1", 110111, "Bogota"))
+    machine = ClasicArcadeMachine("wood", [VideoGamesCatalog().search_by_code(1)])
+    future = pipeline.submit(client, machine, "order-1")
+    assert isinstance(future.exception(5), RuntimeError)
+    pipeline.close()
+    assert journal.writes == 1
@@ -0,0 +1,107 @@
+"""
+Tests for the rotation of the purchase logs into segments.
+
+This file is part of Workshop-SM-UD.
+
+Workshop-SM-UD is free software: you can redistribute it and/or 
+modify it under the terms of the GNU General Public License as 
+published by the Free Software Foundation, either version 3 of 
+the License, or (at your option) any later version.
+
+Workshop-SM-UD is distributed in the hope that it will be useful, 
+but WITHOUT ANY WARRANTY; without even the implied warranty of 
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU 
+General Public License for more details.
+
+You should have received a copy of the GNU General Public License 
+along with Workshop-SM-UD. If not, see <https://www.gnu.org/licenses/>. 
+"""
+import os
+from datetime import datetime
+
+from purchasejournal import PurchaseJournal, default_rotation
+from purchasesegments import SegmentRotator, iter_segment, list_segments, read_footer, write_segment
+from salesanalytics import analyze_incremental
+
+
+def record_text(date, game="Pac"):
+    return "\n".join([f"Date: {date}", "Client: Ana", "Adress: Street 1", "Phone: 300",
+                      "Email: ana@mail.com", "Arcade machine material: wood", "Games:",
+                      f"Name: {game}, Category: Arcade, Price: 10.0", "Total price: 110.0", ""])
+
+
+def append_log(path, records):
+    with open(path, "a", encoding="utf-8", newline="") as file:
+        file.write("".join(records))
+    return str(path)
+
+
+def test_footer_has_the_oldest_and_newest_dates(tmp_path):
+    log = append_log(tmp_path / "purchase.txt", [record_text("2024-03-05 10:00:00"), record_text("2024-01-02 10:00:00"),
+                                                 record_text("2024-07-01 10:00:00"), record_text("2024-02-01 10:00:00")])
+    footer = write_segment(log, str(tmp_path / "purchases-000001.seg"))
+    assert (footer.first, footer.last, footer.count) == ("2024-01-02 10:00:00", "2024-07-01 10:00:00", 4)
+    assert read_footer(str(tmp_path / "purchases-000001.seg")) == footer
+
+
+def test_segment_can_be_read_after_a_byte(tmp_path):
+    first = record_text("2024-03-01 10:00:00", "Old")
+    log = append_log(tmp_path / "purchase.txt", [first, record_text("2024-03-02 10:00:00", "New")])
+    segment = str(tmp_path / "purchases-000001.seg")
+    write_segment(log, segment)
+    assert [record.games[0].name for record in iter_segment(segment)] == ["Old", "New"]
+    assert [record.games[0].name for record in iter_segment(segment, start=len(first))] == ["New"]
+
+
+def test_age_counts_from_the_first_purchase_of_the_log(tmp_path):
+    log = append_log(tmp_path / "purchase.txt", [record_text("2024-03-01 10:00:00")])
+    started = datetime(2024, 3, 1, 10).timestamp()
+    now = [started + 30]
+    rotator = SegmentRotator(str(tmp_path / "segments"), max_bytes=None, max_age=60, clock=lambda: now[0])
+    assert not rotator.due(10, log)
+    now[0] = started + 60
+    restarted = SegmentRotator(str(tmp_path / "segments"), max_bytes=None, max_age=60, clock=lambda: now[0])
+    assert rotator.due(10, log) and restarted.due(10, log)
+    assert not rotator.due(0, log)
+
+
+def test_journal_rotates_into_numbered_segments(tmp_path):
+    rotator = SegmentRotator(str(tmp_path / "segments"), max_bytes=300, max_segments=2)
+    with PurchaseJournal(str(tmp_path / "purchase.txt"), flush_every=1, newline="\n", rotation=rotator) as journal:
+        for day in range(1, 10):
+            journal.write(record_text(f"2024-03-{day:02d} 10:00:00"))
+    segments = list_segments(str(tmp_path / "segments"))
+    assert [path[-10:] for path in segments] == ["000003.seg", "000004.seg"]
+    assert read_footer(segments[-1])[:3] == ("2024-03-07 10:00:00", "2024-03-08 10:00:00", 2)
+    with open(tmp_path / "purchase.txt", encoding="utf-8") as file:
+        assert file.read() == record_text("2024-03-09 10:00:00")
+
+
+def test_default_rotation_keeps_segments_next_to_the_journal(tmp_path):
+    rotator = default_rotation(str(tmp_path / "purchase.txt"))
+    assert rotator.directory == str(tmp_path / "segments")
+    assert not os.path.exists(rotator.directory)  # created by the first rotation
+
+
+def test_rotator_keeps_the_newest_segments(tmp_path):
+    log = str(tmp_path / "purchase.txt")
+    rotator = SegmentRotator(str(tmp_path / "segments"), max_segments=2)
+    for day in range(1, 5):
+        append_log(log, [record_text(f"2024-03-0{day} 10:00:00")])
+        rotator.rotate(log)
+    assert [os.path.basename(path) for path in list_segments(rotator.directory)] == [
+        "purchases-000003.seg", "purchases-000004.seg"]
+
+
+def test_incremental_analytics_follows_a_rotation(tmp_path):
+    log = str(tmp_path / "purchase.txt")
+    state = str(tmp_path / "state.json")
+    rotator = SegmentRotator(str(tmp_path / "segments"))
+    append_log(log, [record_text(f"2024-03-0{day} 10:00:00", "old") for day in range(1, 4)])
+    assert analyze_incremental([log, rotator.directory], state, workers=1).units_by_game == {"old": 3}
+    append_log(log, [record_text(f"2024-03-0{day} 10:00:00", "old") for day in range(4, 6)])
+    rotator.rotate(log)
+    append_log(log, [record_text(f"2024-04-0{day} 10:00:00", "new") for day in range(1, 9)])
+    summary = analyze_incremental([log, rotator.directory], state, workers=1)
+    assert summary.units_by_game == {"old": 5, "new": 8}
+    assert analyze_incremental([log, rotator.directory], state, workers=1).units_by_game == {"old": 5, "new": 8}
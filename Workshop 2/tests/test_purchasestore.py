@@ -0,0 +1,164 @@
+"""
+Tests for the indexed purchase store.
+
+This file is part of Workshop-SM-UD.
+
+Workshop-SM-UD is free software: you can redistribute it and/or 
+modify it under the terms of the GNU General Public License as 
+published by the Free Software Foundation, either version 3 of 
+the License, or (at your option) any later version.
+
+Workshop-SM-UD is distributed in the hope that it will be useful, 
+but WITHOUT ANY WARRANTY; without even the implied warranty of 
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU 
+General Public License for more details.
+
+You should have received a copy of the GNU General Public License 
+along with Workshop-SM-UD. If not, see <https://www.gnu.org/licenses/>. 
+"""
+import gzip
+import json
+import multiprocessing
+import os
+import subprocess
+import sys
+
+import pytest
+
+from purchasestore import DATA_FILE, INDEX_FILE, PurchaseStore
+
+
+def purchase(number, email="ana@mail.com", machine_type="ClasicArcadeMachine", key=None):
+    return {"date": f"2024-01-{number % 28 + 1:02d} 10:00:00", "email": email,
+            "machine_type": machine_type, "total_price": float(number), "key": key}
+
+
+def append_purchases(path, name, count):
+    with PurchaseStore(path) as store:
+        for number in range(count):
+            store.append(purchase(number, email=f"{name}@mail.com", key=f"{name}-{number}"))
+
+
+def test_queries_read_only_the_indexed_purchases(tmp_path):
+    with PurchaseStore(str(tmp_path)) as store:
+        for number in range(30):
+            store.append(purchase(number, email=f"client{number % 3}@mail.com",
+                                  machine_type="RacingArcadeMachine" if number % 5 == 0 else "ClasicArcadeMachine"))
+        assert len(store.by_email("client1@mail.com")) == 10
+        assert [item["total_price"] for item in store.by_machine_type("RacingArcadeMachine")] == [0, 5, 10, 15, 20, 25]
+        assert [item["total_price"] for item in store.by_date("2024-01-02")] == [1.0, 29.0]
+        assert len(store.between("2024-01-01", "2024-01-03")) == 4
+        assert store.get(7)["total_price"] == 7.0
+        with pytest.raises(ValueError):
+            store.get(30)
+
+
+def test_stores_sharing_a_directory_see_each_other(tmp_path):
+    first, second = PurchaseStore(str(tmp_path)), PurchaseStore(str(tmp_path))
+    first.append(purchase(1, key="order-1"))
+    second.append(purchase(2))
+    first.append(purchase(3))
+    assert [item["total_price"] for item in second.by_email("ana@mail.com")] == [1.0, 2.0, 3.0]
+    assert [item["total_price"] for item in first.by_email("ana@mail.com")] == [1.0, 2.0, 3.0]
+    with pytest.raises(ValueError):
+        second.append(purchase(4, key="order-1"))
+    first.close()
+    second.close()
+
+
+def test_processes_appending_together_keep_the_index_exact(tmp_path):
+    path = str(tmp_path)
+    PurchaseStore(path).close()
+    context = multiprocessing.get_context("fork" if hasattr(os, "fork") else "spawn")
+    processes = [context.Process(target=append_purchases, args=(path, f"p{index}", 150)) for index in range(4)]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+    assert all(process.exitcode == 0 for process in processes)
+    with open(os.path.join(path, INDEX_FILE), "rb") as file:
+        entries = [json.loads(line) for line in file]
+    assert len(entries) == 600
+    assert all(entry[0] == previous[0] + previous[1] for previous, entry in zip(entries, entries[1:]))
+    with PurchaseStore(path) as store:
+        for index in range(4):
+            found = store.by_email(f"p{index}@mail.com")
+            assert [item["key"] for item in found] == [f"p{index}-{number}" for number in range(150)]
+
+
+def test_entries_lost_in_a_crash_are_rebuilt(tmp_path):
+    path = str(tmp_path)
+    with PurchaseStore(path) as store:
+        store.append(purchase(1))
+    with open(os.path.join(path, DATA_FILE), "ab") as file:
+        file.write(json.dumps(purchase(2, key="lost")).encode("utf-8") + b"\n")
+        file.write(b'{"date": "2024-01-')
+    with open(os.path.join(path, INDEX_FILE), "ab") as file:
+        file.write(b"[999, 3")
+    with PurchaseStore(path) as store:
+        assert len(store) == 2
+        assert store.has_key("lost", "ana@mail.com")
+        store.append(purchase(3))
+        assert [item["total_price"] for item in store.by_email("ana@mail.com")] == [1.0, 2.0, 3.0]
+
+
+def test_default_directory_follows_the_purchase_log_directory(tmp_path):
+    source = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+    environment = dict(os.environ, PURCHASE_LOG_DIR=str(tmp_path), PYTHONPATH=source)
+    output = subprocess.run([sys.executable, "-c", "import purchasestore; print(purchasestore.DEFAULT_STORE_PATH)"],
+                            env=environment, capture_output=True, text=True, check=True).stdout
+    assert output.strip() == os.path.join(str(tmp_path), "purchases")
+
+
+def test_keys_are_checked_in_memory(tmp_path):
+    path = str(tmp_path)
+    with PurchaseStore(path, key_capacity=1) as store:  # the filter matches almost every key
+        for number in range(20):
+            store.append(purchase(number, key=f"order-{number}"))
+        data_path = os.path.join(path, DATA_FILE)
+        size = os.path.getsize(data_path)
+        with open(data_path, "r+b") as file:
+            file.write(b"x" * size)
+        assert not store.has_key("order-20", "ana@mail.com")
+        with pytest.raises(ValueError):
+            store.has_key("order-1", "ana@mail.com")  # only a matching purchase is read
+
+
+def test_full_store_is_rotated_into_segments(tmp_path):
+    path = str(tmp_path)
+    first = PurchaseStore(path, max_bytes=300, max_segments=2)
+    second = PurchaseStore(path, max_bytes=300, max_segments=2)
+    assert not os.path.exists(os.path.join(path, "segments"))
+    for number in range(10):
+        first.append(purchase(number, key=f"order-{number}"))
+    assert [os.path.basename(segment) for segment in first.segments()] == [
+        "purchases-000002.jsonl.gz", "purchases-000003.jsonl.gz"]
+    with gzip.open(first.segments()[-1], "rt", encoding="utf-8") as segment:
+        assert [json.loads(line)["key"] for line in segment] == ["order-6", "order-7", "order-8"]
+    assert [item["key"] for item in second.by_email("ana@mail.com")] == ["order-9"]
+    with pytest.raises(ValueError):
+        second.append(purchase(8, key="order-8"))  # in the previous data file
+    second.append(purchase(10, key="order-10"))
+    assert [item["key"] for item in first.by_email("ana@mail.com")] == ["order-9", "order-10"]
+    first.close()
+    second.close()
+
+
+def test_keys_are_unique_in_the_whole_store(tmp_path):
+    with PurchaseStore(str(tmp_path)) as store:
+        store.append(purchase(1, key="order-1"))
+        assert store.has_key("order-1") and store.has_key("order-1", "bob@mail.com")
+        with pytest.raises(ValueError):
+            store.append(purchase(2, email="bob@mail.com", key="order-1"))
+
+
+def test_unreadable_purchase_is_cut_like_a_crash(tmp_path):
+    path = str(tmp_path)
+    with PurchaseStore(path) as store:
+        store.append(purchase(1))
+    with open(os.path.join(path, DATA_FILE), "ab") as file:
+        file.write(b'{"date": "2024-01-02"\n' + json.dumps(purchase(3)).encode("utf-8") + b"\n")
+    with PurchaseStore(path) as store:
+        assert len(store) == 1
+        store.append(purchase(2))
+        assert [item["total_price"] for item in store.by_email("ana@mail.com")] == [1.0, 2.0]
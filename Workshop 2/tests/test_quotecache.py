@@ -0,0 +1,124 @@
+"""
+Tests for the quote cache and the price listeners.
+
+This file is part of Workshop-SM-UD.
+
+Workshop-SM-UD is free software: you can redistribute it and/or 
+modify it under the terms of the GNU General Public License as 
+published by the Free Software Foundation, either version 3 of 
+the License, or (at your option) any later version.
+
+Workshop-SM-UD is distributed in the hope that it will be useful, 
+but WITHOUT ANY WARRANTY; without even the implied warranty of 
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU 
+General Public License for more details.
+
+You should have received a copy of the GNU General Public License 
+along with Workshop-SM-UD. If not, see <https://www.gnu.org/licenses/>. 
+"""
+import gc
+import threading
+
+import pytest
+
+import videogames
+from machines import ClasicArcadeMachine
+from quotecache import QuoteCache
+from videogamescatalog import VideoGamesCatalog
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_hits_expirations_and_evictions():
+    clock = FakeClock()
+    cache = QuoteCache(max_size=2, ttl=10.0, clock=clock)
+    first, second, third = (QuoteCache.key("ClasicArcadeMachine", "wood", [(code, 1.0)]) for code in (1, 2, 3))
+    cache.put(first, 1.0)
+    cache.put(second, 2.0)
+    assert cache.get(first) == 1.0
+    cache.put(third, 3.0)
+    assert cache.get(second) is None
+    clock.now = 11.0
+    assert cache.get(first) is None
+    stats = cache.stats()
+    assert (stats["hits"], stats["evictions"], stats["expirations"]) == (1, 1, 1)
+
+
+def test_price_change_invalidates_only_the_quotes_with_the_videogame():
+    catalog = VideoGamesCatalog()
+    cache = QuoteCache()
+    catalog.add_listener(cache.invalidate)
+    dance, mario = catalog.search_by_code(1), catalog.search_by_code(2)
+    with_dance = ClasicArcadeMachine("wood", [dance])
+    with_mario = ClasicArcadeMachine("wood", [mario])
+    old_price = cache.quote(with_dance)
+    cache.quote(with_mario)
+    dance.add_definition()
+    assert len(cache) == 1
+    assert cache.quote(ClasicArcadeMachine("wood", [dance])) == pytest.approx(old_price + 10.0)
+
+
+def test_machines_keep_the_price_their_videogames_had_when_added():
+    catalog = VideoGamesCatalog()
+    cache = QuoteCache()
+    dance = catalog.search_by_code(1)
+    old_machine = ClasicArcadeMachine("wood", [dance])
+    old_price = cache.quote(old_machine)
+    dance.add_definition()  # the cache is not listening, so nothing is invalidated
+    new_machine = ClasicArcadeMachine("wood", [dance])
+    assert cache.quote(new_machine) == pytest.approx(new_machine.calculate_price()) == pytest.approx(old_price + 10.0)
+    assert cache.quote(old_machine) == pytest.approx(old_price)
+
+
+def test_quote_invalidated_while_calculated_is_not_cached():
+    cache = QuoteCache()
+    key = QuoteCache.key("ClasicArcadeMachine", "wood", [(1, 100.0), (2, 50.0)])
+    generations = cache.generations(key)
+    cache.invalidate(2)
+    cache.put(key, 1.0, generations)
+    assert cache.get(key) is None
+    cache.put(key, 2.0, cache.generations(key))
+    assert cache.get(key) == 2.0
+    generations = cache.generations(key)
+    cache.clear()
+    cache.put(key, 3.0, generations)
+    assert len(cache) == 0
+
+
+def test_catalogs_do_not_share_videogames_nor_stay_alive():
+    first, second = VideoGamesCatalog(), VideoGamesCatalog()
+    assert first.search_by_code(1) is not second.search_by_code(1)
+    first.search_by_code(1).add_definition()
+    assert second.search_by_code(1).price == 100.0
+    listeners = len(videogames._price_listeners)
+    del first, second
+    gc.collect()
+    VideoGamesCatalog().search_by_code(1).add_definition()
+    assert len(videogames._price_listeners) < listeners
+
+
+def test_threads_share_the_cache():
+    cache = QuoteCache(max_size=8)
+    keys = [QuoteCache.key("ClasicArcadeMachine", "wood", [(code, 1.0), (code + 1, 1.0)]) for code in range(32)]
+
+    def use(offset):
+        for round in range(300):
+            key = keys[(offset + round) % len(keys)]
+            if cache.get(key) is None:
+                cache.put(key, float(round))
+            cache.invalidate((offset + round) % 33)
+
+    threads = [threading.Thread(target=use, args=(offset,)) for offset in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    stats = cache.stats()
+    assert stats["hits"] + stats["misses"] == 8 * 300
+    assert stats["size"] == len(cache) <= 8
@@ -0,0 +1,84 @@
+"""
+Tests for the batch quote engine.
+
+This file is part of Workshop-SM-UD.
+
+Workshop-SM-UD is free software: you can redistribute it and/or 
+modify it under the terms of the GNU General Public License as 
+published by the Free Software Foundation, either version 3 of 
+the License, or (at your option) any later version.
+
+Workshop-SM-UD is distributed in the hope that it will be useful, 
+but WITHOUT ANY WARRANTY; without even the implied warranty of 
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU 
+General Public License for more details.
+
+You should have received a copy of the GNU General Public License 
+along with Workshop-SM-UD. If not, see <https://www.gnu.org/licenses/>. 
+"""
+import pytest
+
+from machines import ClasicArcadeMachine, DanceRevolutionMachine
+from quotes import BatchQuoter
+from videogames import VideoGame
+from videogamescatalog import VideoGamesCatalog
+
+
+def make_catalog():
+    catalog = VideoGamesCatalog()
+    catalog.add_videogames([VideoGame(code, f"Game {code}", "test", 10.0 * code, "Puzzle", "HD",
+                                      "Ana", "Luis", 2000) for code in range(100, 110)])
+    return catalog
+
+
+def test_quotes_match_calculate_price():
+    catalog = make_catalog()
+    quoter = BatchQuoter(catalog)
+    bundles = [(100, 101), (), (102,)]
+    prices, weights, energies = quoter.quote([ClasicArcadeMachine, "DanceRevolutionMachine",
+                                              ClasicArcadeMachine],
+                                             ["wood", "aluminum", "carbon fiber"], bundles)
+    machines = [ClasicArcadeMachine("wood", [catalog.search_by_code(100), catalog.search_by_code(101)]),
+                DanceRevolutionMachine("aluminum", []),
+                ClasicArcadeMachine("carbon fiber", [catalog.search_by_code(102)])]
+    assert list(prices) == pytest.approx([machine.calculate_price() for machine in machines])
+    assert list(weights) == pytest.approx([machine.weight for machine in machines])
+    assert list(energies) == pytest.approx([machine.energy_consumption for machine in machines])
+
+
+def test_unknown_configurations_are_rejected():
+    quoter = BatchQuoter(make_catalog())
+    with pytest.raises(ValueError):
+        quoter.quote(["ClasicArcadeMachine"], ["gold"], [()])
+    with pytest.raises(ValueError):
+        quoter.bundle_price((999,))
+
+
+def test_caches_are_bounded():
+    quoter = BatchQuoter(make_catalog(), max_games=3, max_bundles=2)
+    for code in range(100, 110):
+        quoter.bundle_price((code,))
+    assert len(quoter._BatchQuoter__game_prices) == 3
+    assert len(quoter._BatchQuoter__bundle_prices) == 2
+
+
+def test_price_changes_reach_the_quoter_without_refresh():
+    catalog = make_catalog()
+    quoter = BatchQuoter(catalog)
+    assert quoter.bundle_price((100, 101)) == pytest.approx(2010.0)
+    catalog.search_by_code(100).add_definition()
+    assert quoter.bundle_price((100, 101)) == pytest.approx(2110.0)
+    catalog.remove_videogame(101)
+    with pytest.raises(ValueError):
+        quoter.bundle_price((100, 101))
+
+
+def test_price_change_drops_only_the_bundles_with_the_videogame():
+    catalog = make_catalog()
+    quoter = BatchQuoter(catalog)
+    quoter.bundle_price((100, 101))
+    quoter.bundle_price((102,))
+    catalog.search_by_code(101).add_definition()
+    assert list(quoter._BatchQuoter__bundle_prices) == [(102,)]
+    with pytest.raises(ValueError):
+        quoter.bundle_price((100, 100))
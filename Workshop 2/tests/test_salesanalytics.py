@@ -0,0 +1,72 @@
+"""
+Tests for the parallel and incremental sales analytics.
+
+This file is part of Workshop-SM-UD.
+
+Workshop-SM-UD is free software: you can redistribute it and/or 
+modify it under the terms of the GNU General Public License as 
+published by the Free Software Foundation, either version 3 of 
+the License, or (at your option) any later version.
+
+Workshop-SM-UD is distributed in the hope that it will be useful, 
+but WITHOUT ANY WARRANTY; without even the implied warranty of 
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU 
+General Public License for more details.
+
+You should have received a copy of the GNU General Public License 
+along with Workshop-SM-UD. If not, see <https://www.gnu.org/licenses/>. 
+"""
+import pytest
+
+from salesanalytics import SalesSummary, analyze, analyze_incremental
+
+
+def record_text(day, price, month=3):
+    return "\n".join([f"Date: 2024-{month:02d}-{day:02d} 12:00:00.000001", "Client: Ana", "Adress: Street 1",
+                      "Phone: 300", "Email: ana@mail.com", "Arcade machine material: wood", "Games:",
+                      f"Name: Game {day % 4}, Category: Arcade, Price: {price}",
+                      f"Total price: {price + 100}", ""])
+
+
+def append_log(path, records):
+    with open(path, "a", encoding="utf-8", newline="") as file:
+        file.write("".join(records))
+    return str(path)
+
+
+def test_parallel_summary_matches_the_serial_one(tmp_path):
+    path = append_log(tmp_path / "purchase.txt", [record_text(day % 28 + 1, float(day)) for day in range(200)])
+    serial, offsets = analyze([path], workers=1)
+    parallel, _ = analyze([path], workers=3)
+    assert serial.to_dict() == parallel.to_dict()
+    assert serial.purchases == 200
+    assert offsets[str(tmp_path / "purchase.txt")] > 0
+
+
+def test_incremental_run_only_adds_new_purchases(tmp_path):
+    log = append_log(tmp_path / "purchase.txt", [record_text(1, 10.0), record_text(2, 20.0)])
+    state = str(tmp_path / "state.json")
+    assert analyze_incremental([log], state, workers=1).purchases == 2
+    append_log(log, [record_text(3, 30.0)])
+    summary = analyze_incremental([log], state, workers=1)
+    assert summary.purchases == 3
+    assert summary.revenue == pytest.approx(360.0)
+    assert analyze_incremental([log], state, workers=1).purchases == 3
+
+
+def test_range_of_dates_filters_purchases(tmp_path):
+    log = append_log(tmp_path / "purchase.txt", [record_text(1, 10.0, 2), record_text(1, 20.0, 3),
+                                                 record_text(1, 30.0, 4)])
+    summary, _ = analyze([log], workers=1, since="2024-03", until="2024-04")
+    assert summary.purchases == 1
+    assert summary.by_month == {"2024-03": 120.0}
+
+
+def test_summaries_merge_and_load(tmp_path):
+    first = SalesSummary.from_dict({"purchases": 1, "revenue": 5.0, "by_game": {"A": 5.0}})
+    second = SalesSummary.from_dict({"purchases": 2, "revenue": 7.0, "by_game": {"A": 1.0, "B": 6.0}})
+    first.merge(second)
+    assert (first.purchases, first.revenue) == (3, 12.0)
+    assert first.top_games(1) == [("B", 6.0)]
+    with pytest.raises(ValueError):
+        SalesSummary.from_dict({"profit": 1})
@@ -0,0 +1,76 @@
+"""
+Tests for the SQLite catalog, clients and purchases.
+
+This file is part of Workshop-SM-UD.
+
+Workshop-SM-UD is free software: you can redistribute it and/or 
+modify it under the terms of the GNU General Public License as 
+published by the Free Software Foundation, either version 3 of 
+the License, or (at your option) any later version.
+
+Workshop-SM-UD is distributed in the hope that it will be useful, 
+but WITHOUT ANY WARRANTY; without even the implied warranty of 
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU 
+General Public License for more details.
+
+You should have received a copy of the GNU General Public License 
+along with Workshop-SM-UD. If not, see <https://www.gnu.org/licenses/>. 
+"""
+import pytest
+
+import videogames
+from sqlitestore import SQLiteDatabase
+from users import Address, Client
+
+
+def purchase(number, email="ana@mail.com", key=None):
+    return {"date": f"2024-03-{number:02d} 10:00:00", "email": email, "machine_type": "ClasicArcadeMachine",
+            "key": key}
+
+
+def test_catalog_is_seeded_once_and_saves_price_changes(tmp_path):
+    path = str(tmp_path / "shop.db")
+    with SQLiteDatabase(path) as database:
+        games = len(database.catalog)
+        changed = []
+        database.catalog.add_listener(changed.append)
+        videogame = database.catalog.search_by_code(1)
+        videogame.add_definition()
+        assert changed == [1]
+    with SQLiteDatabase(path) as database:
+        assert len(database.catalog) == games
+        assert database.catalog.search_by_code(1).price == videogame.price
+
+
+def test_closing_the_database_removes_its_price_listener(tmp_path):
+    listeners = len(videogames._price_listeners)
+    database = SQLiteDatabase(str(tmp_path / "shop.db"))
+    assert len(videogames._price_listeners) == listeners + 1
+    database.close()
+    assert len(videogames._price_listeners) == listeners
+
+
+def test_clients_are_saved_and_replaced_by_email(tmp_path):
+    with SQLiteDatabase(str(tmp_path / "shop.db")) as database:
+        client = Client("Ana", "ana@mail.com", "300", Address("Street 1", 110111, "Bogota"))
+        database.clients.save(client)
+        client.add_phone("301")
+        database.clients.save(client)
+        loaded = database.clients.get("ana@mail.com")
+        assert loaded.get_phones() == ["300", "301"]
+        assert loaded.get_addresses()[0].parts() == ("Street 1", 110111, "Bogota", "Colombia")
+        assert len(database.clients) == 1
+        assert database.clients.remove("ana@mail.com") and database.clients.get("ana@mail.com") is None
+
+
+def test_purchases_are_indexed_and_keys_are_unique(tmp_path):
+    with SQLiteDatabase(str(tmp_path / "shop.db")) as database:
+        purchases = database.purchases
+        assert purchases.append_many([purchase(1, key="a"), purchase(2, "bob@mail.com")]) == range(0, 2)
+        assert [found["date"] for found in purchases.by_email("ana@mail.com")] == ["2024-03-01 10:00:00"]
+        assert len(purchases.between("2024-03-01", "2024-03-03")) == 2
+        with pytest.raises(ValueError):
+            purchases.append(purchase(3, key="a"))
+        with pytest.raises(ValueError):
+            purchases.append_many([purchase(4, key="b"), purchase(5, key="b")])
+        assert len(purchases) == 2 and purchases.has_key("a") and not purchases.has_key("b")
@@ -0,0 +1,75 @@
+"""
+Tests for the indexes of the videogame catalog.
+
+This file is part of Workshop-SM-UD.
+
+Workshop-SM-UD is free software: you can redistribute it and/or 
+modify it under the terms of the GNU General Public License as 
+published by the Free Software Foundation, either version 3 of 
+the License, or (at your option) any later version.
+
+Workshop-SM-UD is distributed in the hope that it will be useful, 
+but WITHOUT ANY WARRANTY; without even the implied warranty of 
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU 
+General Public License for more details.
+
+You should have received a copy of the GNU General Public License 
+along with Workshop-SM-UD. If not, see <https://www.gnu.org/licenses/>. 
+"""
+import pytest
+
+from videogames import VideoGame
+from videogamescatalog import VideoGamesCatalog
+
+
+def make_game(code, price=10.0, definition="HD", category="Puzzle", year=2000):
+    return VideoGame(code, f"Game {code}", "test game", price, category, definition,
+                     "Ana", "Luis", year)
+
+
+def test_search_by_code_after_add_and_remove():
+    catalog = VideoGamesCatalog()
+    game = make_game(100)
+    catalog.add_videogame(game)
+    assert catalog.search_by_code(100) is game
+    assert catalog.remove_videogame(100) is game
+    assert catalog.search_by_code(100) is None
+    assert catalog.remove_videogame(100) is None
+
+
+def test_duplicate_code_is_rejected():
+    catalog = VideoGamesCatalog()
+    catalog.add_videogame(make_game(100))
+    with pytest.raises(ValueError):
+        catalog.add_videogame(make_game(100))
+    with pytest.raises(ValueError):
+        catalog.add_videogames([make_game(101), make_game(101)])
+    assert catalog.search_by_code(101) is None
+
+
+def test_search_combines_filters():
+    catalog = VideoGamesCatalog()
+    catalog.add_videogames([make_game(100, 20.0, "HD", year=1999),
+                            make_game(101, 30.0, "Standard", year=2001),
+                            make_game(102, 40.0, "HD", year=2003)])
+    found = catalog.search(category="Puzzle", definition="HD", min_price=15.0, max_year=2002)
+    assert [game.get_code() for game in found] == [100]
+    assert [game.get_code() for game in catalog.search(category="Puzzle", min_year=2001)] == [101, 102]
+
+
+def test_price_index_follows_price_changes():
+    catalog = VideoGamesCatalog()
+    game = make_game(100, 100.0, "HD")
+    catalog.add_videogame(game)
+    game.add_definition()
+    assert catalog.search(category="Puzzle", min_price=105.0) == [game]
+    assert catalog.search(category="Puzzle", max_price=100.0) == []
+    catalog.remove_videogame(100)
+    assert catalog.search(min_price=105.0, max_price=115.0) == []
+
+
+def test_search_without_filters_is_ordered_by_code():
+    catalog = VideoGamesCatalog()
+    catalog.add_videogames([make_game(102), make_game(100), make_game(101)])
+    codes = [game.get_code() for game in catalog.search()]
+    assert codes == sorted(codes) and codes[-3:] == [100, 101, 102]